@@ -1,57 +1,126 @@
-import json
+from __future__ import annotations
+
+import asyncio
 import logging
 import os
+import re
+import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Annotated, Optional
 
 from dotenv import load_dotenv
 from livekit.agents import (
     Agent,
+    AgentServer,
     AgentSession,
+    AgentStateChangedEvent,
+    FunctionTool,
     JobContext,
     JobProcess,
     MetricsCollectedEvent,
+    ModelSettings,
     RoomInputOptions,
+    RunContext,
+    UserInputTranscribedEvent,
     WorkerOptions,
     cli,
-    metrics,
-    tokenize,
     function_tool,
-    RunContext
+    llm,
+    metrics,
+    tts,
 )
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from pydantic import Field
+
+from context_compaction import ContextCompactor, compactor_from_env
+from faq_cache import FaqResultCache
+from faq_direct import DirectAnswerPolicy, policy_from_env
+from faq_prefetch import FaqPrefetcher, prefetcher_from_env
+from faq_search import FaqHit, build_faq_index
+from faq_store import FaqSnapshot, FaqStore, load_faq_file, normalize_faq_data
+from faq_tenants import registry_from_env, tenant_from_metadata
+from lead_checkpoint import LeadCheckpoint, recover_checkpoints
+from lead_dedupe import DedupingLeadStore, LeadIndex, index_path_for
+from lead_extractor import Extraction, LeadExtractor, extractor_from_env
+from lead_store import JsonDirLeadStore, new_lead_id, open_lead_store
+from lead_writer import LeadWriter
+from loop_watchdog import watchdog_from_env
+from model_warmup import warm_noise_cancellation, warm_turn_detector_on_start, warm_vad
+from pipeline import PipelineConfig, import_plugins
+from startup_profile import StepTimer
+from tts_cache import CachedTTS, cache_from_env, sentence_tokenizer
+from turn_metrics import FaqAnswerTimer, current_room, metrics_port, observe, timed_tool
+from usage_ledger import ledger_from_env
+from worker_load import admission_from_env
 
 logger = logging.getLogger("agent")
 
 load_dotenv(".env.local")
 
+TTS_VOICE = "en-US-matthew"
+TTS_STYLE = "Conversation"
+
+# The only recap sentence that never varies, so it is pre-synthesized along
+# with the FAQ answers (see tts_cache.py)
+RECAP_CLOSING = "I've saved all the details and someone from our team will follow up soon."
+
+# The default tenant's FAQ, used for any caller no other tenant claims
+DEFAULT_FAQ_PATH = Path(__file__).parent / "company_faq.json"
+
+# The lead fields the capture tools accept
+LEAD_FIELDS = ["name", "company", "email", "role", "use_case", "team_size", "timeline"]
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
 
 class Assistant(Agent):
-    def __init__(self, faq_data: dict) -> None:
+    def __init__(
+        self,
+        faq_data: dict | None = None,
+        faq_store: FaqStore | None = None,
+        lead_writer: LeadWriter | None = None,
+        lead_checkpoint: LeadCheckpoint | None = None,
+        direct_answers: DirectAnswerPolicy | None = None,
+        context_compactor: ContextCompactor | None = None,
+        lead_extractor: LeadExtractor | None = None,
+        faq_prefetch: FaqPrefetcher | None = None,
+    ) -> None:
+        # The store is normally loaded by the tenant registry and shared by every
+        # session of that tenant in the process; build one here if the agent is
+        # constructed standalone
+        if faq_store is None:
+            faq_data = normalize_faq_data(faq_data or {})
+            faq_store = FaqStore(faq_data, build_faq_index(faq_data.get("faqs", [])))
+        # The persona is the brand whose FAQ this is; an FAQ without a name
+        # takes the default tenant's
+        company = faq_store.snapshot.data.get("company_name") or load_faq_file(DEFAULT_FAQ_PATH).get("company_name")
         super().__init__(
-            instructions="""You are a friendly and professional Sales Development Representative (SDR) for Razorpay.
+            instructions=f"""You are a friendly and professional Sales Development Representative (SDR) for {company}.
             
             Your role is to:
-            1. Warmly greet visitors and introduce yourself as a Razorpay SDR
+            1. Warmly greet visitors and introduce yourself as a {company} SDR
             2. Ask what brought them here and what they're working on
             3. Understand their business needs and pain points
-            4. Answer their questions about Razorpay's products, features, and pricing using the FAQ tool
+            4. Answer their questions about {company}'s products, features, and pricing using the FAQ tool
             5. Naturally collect lead information during the conversation (name, company, email, role, use case, team size, timeline)
-            6. Keep the conversation focused on understanding their needs and how Razorpay can help
+            6. Keep the conversation focused on understanding their needs and how {company} can help
             
             Important guidelines:
             - Be conversational and natural, not robotic
             - Ask one question at a time, don't overwhelm the user
-            - Use the lookup_faq tool whenever they ask about Razorpay's products, features, pricing, or capabilities
-            - Use the save_lead_info tool to store information as you learn about them
+            - Use the lookup_faq tool whenever they ask about {company}'s products, features, pricing, or capabilities
+            - Use the save_lead_details tool to store information as you learn about them, with everything they shared in one call
             - Don't make up information - if you don't know something, check the FAQ or admit you need to find out
             - Keep responses concise and avoid complex formatting
             - When the user indicates they're done (says goodbye, thanks, that's all, etc.), use the generate_summary tool to wrap up
             
-            Your goal is to qualify leads and understand if Razorpay is a good fit for their business.""",
+            Your goal is to qualify leads and understand if {company} is a good fit for their business.""",
         )
-        self.faq_data = faq_data
+        self.faq_store = faq_store
+        # Lead records are written in the background so the tool never blocks
+        # the event loop on disk I/O
+        if lead_writer is None:
+            lead_writer = LeadWriter(JsonDirLeadStore(Path("leads")))
+        self.lead_writer = lead_writer
         self.lead_data = {
             "name": None,
             "company": None,
@@ -62,14 +131,53 @@ class Assistant(Agent):
             "timeline": None,
             "conversation_notes": []
         }
+        # How sure we are of each captured field: 1.0 for values the LLM saved
+        # with a tool, the pattern's confidence for values read off transcripts
+        self.lead_confidence: dict[str, float] = {}
+        self.lead_extractor = lead_extractor
+        # Every lead_data update is also logged to the checkpoint, so the lead
+        # survives a call that ends without generate_summary
+        self.lead_checkpoint = lead_checkpoint
+        if lead_checkpoint is not None:
+            self.lead_data["lead_id"] = lead_checkpoint.lead_id
+        # Confident FAQ hits are spoken as-is when this is set
+        self.direct_answers = direct_answers
+        self.faq_answer_timer = FaqAnswerTimer()
+        # Trims what each LLM request sees on long calls; the full history
+        # stays in the agent's chat context
+        self.context_compactor = context_compactor
+        # FAQ hits searched from the caller's transcripts before the LLM asks
+        self.faq_prefetch = faq_prefetch
+
+    async def llm_node(
+        self,
+        chat_ctx: llm.ChatContext,
+        tools: list[FunctionTool],
+        model_settings: ModelSettings,
+    ):
+        if self.context_compactor is not None:
+            # Extracted fields stay unconfirmed until the model saves them
+            unconfirmed = [field for field, confidence in self.lead_confidence.items() if confidence < 1.0]
+            chat_ctx = self.context_compactor.compact(chat_ctx, self.lead_data, unconfirmed)
+        async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
+            yield chunk
+
+    @property
+    def faq_data(self) -> dict:
+        return self.faq_store.snapshot.data
+
+    @property
+    def faq_cache(self) -> FaqResultCache:
+        return self.faq_store.cache
 
     @function_tool
+    @timed_tool
     async def lookup_faq(self, context: RunContext, query: str):
-        """Look up information about Razorpay from the company FAQ database.
+        """Look up information about the company from its FAQ.
         
         Use this tool whenever the user asks about:
-        - What Razorpay does
-        - Who Razorpay is for
+        - What the company does
+        - Who the company is for
         - Pricing and plans
         - Features and capabilities
         - Integration details
@@ -82,27 +190,98 @@ class Assistant(Agent):
         """
         logger.info(f"Looking up FAQ for query: {query}")
         
-        # Simple keyword-based search through FAQs
-        query_lower = query.lower()
-        relevant_faqs = []
-        
-        # Search through all FAQs
-        for faq in self.faq_data.get("faqs", []):
-            question_lower = faq["question"].lower()
-            answer_lower = faq["answer"].lower()
-            
-            # Check if query keywords appear in question or answer
-            if any(word in question_lower or word in answer_lower for word in query_lower.split()):
-                relevant_faqs.append(faq)
-        
-        if not relevant_faqs:
-            return f"I don't have specific information about '{query}' in our FAQ. Let me provide general information: {self.faq_data.get('description', '')}"
+        # Read the snapshot once so a concurrent reload can't mix old and new data
+        snapshot = self.faq_store.snapshot
+
+        # A confident, unambiguous hit is spoken directly, which saves the LLM
+        # round trip that would only rephrase it
+        if self.direct_answers is not None and context is not None:
+            hits, _ = self._faq_hits(snapshot, query)
+            hit = self.direct_answers.choose(query, hits)
+            if hit is not None:
+                return self._answer_directly(context, query, hit)
+
+        self.faq_answer_timer.start("llm", current_room())
+
+        # Repeat questions are answered from the process-wide cache. An empty
+        # cached response means the query is known to have no FAQ match.
+        cache = self.faq_store.cache
+        cache.ensure_version(snapshot.version)
+        cache_key = cache.normalize(query)
+        response = cache.get(cache_key)
+        if response is None:
+            hits, prefetched = self._faq_hits(snapshot, query)
+            response = self._format_faq_hits(query, hits)
+            # Prefetched hits were found for the caller's fuller question, so
+            # they aren't what this query alone finds
+            if not prefetched:
+                cache.put(cache_key, response)
+
+        if not response:
+            return f"I don't have specific information about '{query}' in our FAQ. Let me provide general information: {snapshot.data.get('description', '')}"
+
+        return response
+
+    def _answer_directly(self, context: RunContext, query: str, hit: FaqHit) -> None:
+        logger.info(f"Answering '{query}' directly from FAQ: {hit.faq['question']} (confidence {hit.confidence:.2f})")
+        self.faq_answer_timer.start("direct", current_room())
+
+        # Queued behind the current speech, which ends once the tool returns
+        context.session.say(self.direct_answers.spoken(hit.faq["answer"]))
+
+        # No output means no follow-up LLM request. If the LLM called other
+        # tools in the same step their outputs still get a reply.
+        return None
+
+    def _faq_hits(self, snapshot: FaqSnapshot, query: str) -> tuple[list[FaqHit], bool]:
+        """The hits for ``query``, and whether they were prefetched."""
+        # Ranked search over the index built in prewarm; hits below the index's
+        # confidence threshold are already dropped, so an empty result means
+        # nothing in the FAQ answers the question. The caller's question may
+        # have been searched already, while they were still speaking.
+        if self.faq_prefetch is not None:
+            hits = self.faq_prefetch.take(query, snapshot.version)
+            if hits is not None:
+                return hits, True
+        return snapshot.index.search(query, limit=2), False
+
+    def _format_faq_hits(self, query: str, hits: list[FaqHit]) -> str:
+        if not hits:
+            return ""
         
+        logger.info(f"FAQ match for '{query}': {hits[0].faq['question']} (confidence {hits[0].confidence:.2f})")
+
         # Return the most relevant FAQs (up to 2)
-        response = "\n\n".join([f"Q: {faq['question']}\nA: {faq['answer']}" for faq in relevant_faqs[:2]])
+        response = "\n\n".join([f"Q: {hit.faq['question']}\nA: {hit.faq['answer']}" for hit in hits])
         return response
 
+    def _update_lead(self, field: str, value, confidence: float = 1.0) -> None:
+        self.lead_data[field] = value
+        self.lead_confidence[field] = confidence
+        if self.lead_checkpoint is not None:
+            self.lead_checkpoint.record(field, value)
+
+    def note_transcript(self, transcript: str) -> list[Extraction]:
+        """Fill the lead fields the extractor finds in a final user transcript.
+
+        An extracted value never replaces one the LLM saved, or one extracted
+        with higher confidence.
+        """
+        if self.lead_extractor is None:
+            return []
+        applied = []
+        for found in self.lead_extractor.extract(transcript):
+            if found.confidence < self.lead_confidence.get(found.field, 0.0):
+                continue
+            if self.lead_data.get(found.field) == found.value:
+                continue
+            self._update_lead(found.field, found.value, found.confidence)
+            applied.append(found)
+            logger.info(f"Extracted lead info - {found.field}: {found.value} (confidence {found.confidence:.2f})")
+        return applied
+
     @function_tool
+    @timed_tool
     async def save_lead_info(self, context: RunContext, field: str, value: str):
         """Save information about the lead/prospect as you learn it during the conversation.
         
@@ -112,18 +291,71 @@ class Assistant(Agent):
             field: The type of information (must be one of: name, company, email, role, use_case, team_size, timeline)
             value: The actual information shared by the user
         """
-        valid_fields = ["name", "company", "email", "role", "use_case", "team_size", "timeline"]
+        valid_fields = LEAD_FIELDS
         
         if field not in valid_fields:
             logger.warning(f"Invalid field: {field}. Must be one of {valid_fields}")
             return f"Error: Invalid field. Must be one of: {', '.join(valid_fields)}"
+        if field == "email" and not EMAIL_PATTERN.fullmatch(value.strip()):
+            return f"Not saved: '{value}' doesn't look like an email address, so ask them to spell it"
         
-        self.lead_data[field] = value
+        self._update_lead(field, value)
         logger.info(f"Saved lead info - {field}: {value}")
         
         return f"Got it, I've noted down your {field}: {value}"
 
     @function_tool
+    @timed_tool
+    async def save_lead_details(
+        self,
+        context: RunContext,
+        # Defaults go in Field: LiveKit sets them on the field after it is
+        # built, which leaves the argument required under pydantic 2.12
+        name: Annotated[Optional[str], Field(default=None, description="The user's name")] = None,
+        company: Annotated[Optional[str], Field(default=None, description="The company they work for")] = None,
+        email: Annotated[Optional[str], Field(default=None, description="Their email address")] = None,
+        role: Annotated[Optional[str], Field(default=None, description="Their job title or role")] = None,
+        use_case: Annotated[Optional[str], Field(default=None, description="What they want to use the product for")] = None,
+        team_size: Annotated[Optional[str], Field(default=None, description="How big their team or company is")] = None,
+        timeline: Annotated[Optional[str], Field(default=None, description="When they plan to get started")] = None,
+        conversation_notes: Annotated[Optional[str], Field(default=None, description="Anything else worth remembering about their needs")] = None,
+    ):
+        """Save every piece of lead information the user just shared, in one call.
+
+        Use this tool instead of several save_lead_info calls whenever the user shares more than one detail at once (e.g. "I'm Priya, CTO at Acme, about 40 people"). Only pass the fields they actually mentioned.
+        """
+        values = {"name": name, "company": company, "email": email, "role": role, "use_case": use_case, "team_size": team_size, "timeline": timeline}
+
+        # Everything is validated before anything is saved, so one reply
+        # covers the whole batch
+        saved = {}
+        problems = []
+        for field in LEAD_FIELDS:
+            value = (values[field] or "").strip()
+            if not value:
+                continue
+            if field == "email" and not EMAIL_PATTERN.fullmatch(value):
+                problems.append(f"'{value}' doesn't look like an email address, so ask them to spell it")
+                continue
+            saved[field] = value
+        note = (conversation_notes or "").strip()
+
+        for field, value in saved.items():
+            self._update_lead(field, value)
+        if note:
+            self._update_lead("conversation_notes", [*self.lead_data["conversation_notes"], note])
+        logger.info(f"Saved lead info - {saved}" + (" and a note" if note else ""))
+
+        noted = [f"{field}: {value}" for field, value in saved.items()]
+        if note:
+            noted.append("the note")
+        reply = f"Got it, I've noted down {', '.join(noted)}." if noted else "Nothing new to note down."
+        if problems:
+            reply += " Not saved: " + "; ".join(problems) + "."
+        return reply
+
+    @function_tool
+    @timed_tool
     async def generate_summary(self, context: RunContext, conversation_summary: str):
         """Generate and save a summary of the conversation when the user is ready to end the call.
         
@@ -135,20 +367,16 @@ class Assistant(Agent):
         logger.info("Generating end-of-call summary")
         
         # Add conversation summary to lead data
-        self.lead_data["conversation_summary"] = conversation_summary
-        self.lead_data["timestamp"] = datetime.now().isoformat()
-        
-        # Save to JSON file
-        leads_dir = Path("leads")
-        leads_dir.mkdir(exist_ok=True)
+        self._update_lead("conversation_summary", conversation_summary)
+        self._update_lead("timestamp", datetime.now().isoformat())
+        # Unique per session, so a repeated summary updates the same lead
+        if "lead_id" not in self.lead_data:
+            self.lead_data["lead_id"] = new_lead_id()
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = leads_dir / f"lead_{timestamp}.json"
+        # Queue the write; the background writer saves it to the lead store
+        lead_id = await self.lead_writer.submit(self.lead_data)
         
-        with open(filename, "w") as f:
-            json.dump(self.lead_data, f, indent=2)
-        
-        logger.info(f"Lead data saved to {filename}")
+        logger.info(f"Lead {lead_id} queued for saving")
         
         # Generate verbal summary
         name = self.lead_data.get("name", "the prospect")
@@ -159,50 +387,121 @@ class Assistant(Agent):
         summary = f"Thank you for your time! To recap, I spoke with {name} from {company}. "
         summary += f"They're interested in {use_case}. "
         summary += f"Timeline: {timeline}. "
-        summary += "I've saved all the details and someone from our team will follow up soon."
+        summary += RECAP_CLOSING
         
         return summary
 
 
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
-    
-    # Load FAQ data
-    faq_path = Path(__file__).parent / "company_faq.json"
-    with open(faq_path, "r") as f:
-        proc.userdata["faq_data"] = json.load(f)
+    # Each step is timed and logged; `agent.py startup-profile` reports them
+    # along with the slowest imports
+    timer = StepTimer("prewarm")
+
+    # Provider plugins are only imported for the configured pipeline (see
+    # pipeline.py), here rather than when a call is waiting on them
+    pipeline = PipelineConfig.from_env()
+    proc.userdata["pipeline"] = pipeline
+    with timer.step("plugins"):
+        proc.userdata["plugin_import_timings"] = import_plugins(pipeline.modules())
+
+    with timer.step("vad"):
+        proc.userdata["vad"] = pipeline.load_vad()
     
-    logger.info("FAQ data loaded successfully")
+    # ONNX Runtime sets up a session on its first run, so the VAD is run over
+    # synthetic audio here rather than on the caller's first words (see
+    # model_warmup.py); the noise cancellation model is read into the page
+    # cache, and its options are built once and shared by every job
+    with timer.step("vad warm-up"):
+        warm_vad(proc.userdata["vad"])
+    with timer.step("noise cancellation"):
+        warm_noise_cancellation(pipeline.noise_cancellation)
+        proc.userdata["noise_canceller"] = pipeline.noise_canceller()
+
+    # TTS_CACHE=1 serves repeated sentences from synthesized audio on disk;
+    # the directory is shared by every job process on the host
+    proc.userdata["tts_cache"] = cache_from_env()
+
+    # FAQ knowledge is loaded per tenant (brand). A job process serves one
+    # call, so the tenants it should answer fast are loaded here, before the
+    # call, within FAQ_TENANT_CACHE_MB; others load when their call starts.
+    # Each tenant is loaded from its compiled artifact (`faq_artifact.py build`) when it is
+    # fresh, which is memory-mapped and shared by every job process on the host,
+    # and otherwise indexed from JSON; FAQ_SEARCH_MODE=semantic switches to the
+    # offline n-gram vector index, FAQ_FUZZY repairs misheard query words
+    # against the FAQ vocabulary, and FAQ_HOT_RELOAD=1 re-indexes edited
+    # entries without restarting the worker
+    registry = registry_from_env(DEFAULT_FAQ_PATH)
+    proc.userdata["faq_registry"] = registry
+
+    # The default tenant and FAQ_HOT_TENANTS are loaded up front
+    with timer.step("faq"):
+        registry.preload()
+
+    timer.log()
+    proc.userdata["startup_timings"] = timer.steps
 
 
 async def entrypoint(ctx: JobContext):
+    # The brand this call is for, named in the dispatch or room metadata
+    faq_registry = ctx.proc.userdata["faq_registry"]
+    tenant = faq_registry.resolve(tenant_from_metadata(ctx.job.metadata, ctx.job.room.metadata))
+
     # Logging setup
     # Add any other context you want in all log entries here
     ctx.log_context_fields = {
         "room": ctx.room.name,
+        "tenant": tenant,
     }
 
+    # LOOP_WATCHDOG=1 logs and counts anything that blocks this job's event
+    # loop, which also carries the call's audio, with its stack and the tool
+    # running at the time
+    watchdog = watchdog_from_env()
+    if watchdog is not None:
+        watchdog.start(room=ctx.room.name)
+        ctx.add_shutdown_callback(watchdog.stop)
+
+    # Loading a tenant that isn't resident yet reads and indexes its FAQ file,
+    # so it runs off the event loop
+    faq_store = await asyncio.to_thread(faq_registry.get, tenant)
+
+    # Text-to-speech (TTS) is your agent's voice, turning the LLM's text into speech that the user can hear
+    # See all available models as well as voice selections at https://docs.livekit.io/agents/models/tts/
+    pipeline = ctx.proc.userdata["pipeline"]
+    tts_cache = ctx.proc.userdata.get("tts_cache")
+    if tts_cache is None:
+        agent_tts = pipeline.tts(
+                voice=TTS_VOICE,
+                style=TTS_STYLE,
+                tokenizer=sentence_tokenizer(),
+                text_pacing=True
+            )
+    else:
+        # The cache works on whole sentences, so the adapter splits the LLM's
+        # text and synthesizes (or replays) one sentence at a time
+        agent_tts = tts.StreamAdapter(
+            tts=CachedTTS(
+                pipeline.tts(voice=TTS_VOICE, style=TTS_STYLE),
+                tts_cache,
+                voice=TTS_VOICE,
+                style=TTS_STYLE,
+            ),
+            sentence_tokenizer=sentence_tokenizer(),
+            text_pacing=True,
+        )
+
     # Set up a voice AI pipeline using OpenAI, Cartesia, AssemblyAI, and the LiveKit turn detector
     session = AgentSession(
         # Speech-to-text (STT) is your agent's ears, turning the user's speech into text that the LLM can understand
         # See all available models at https://docs.livekit.io/agents/models/stt/
-        stt=deepgram.STT(model="nova-3"),
+        stt=pipeline.stt(),
         # A Large Language Model (LLM) is your agent's brain, processing user input and generating a response
         # See all available models at https://docs.livekit.io/agents/models/llm/
-        llm=google.LLM(
-                model="gemini-2.5-flash",
-            ),
-        # Text-to-speech (TTS) is your agent's voice, turning the LLM's text into speech that the user can hear
-        # See all available models as well as voice selections at https://docs.livekit.io/agents/models/tts/
-        tts=murf.TTS(
-                voice="en-US-matthew", 
-                style="Conversation",
-                tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-                text_pacing=True
-            ),
+        llm=pipeline.llm(),
+        tts=agent_tts,
         # VAD and turn detection are used to determine when the user is speaking and when the agent should respond
         # See more at https://docs.livekit.io/agents/build/turns
-        turn_detection=MultilingualModel(),
+        turn_detection=pipeline.turn_detector(),
         vad=ctx.proc.userdata["vad"],
         # allow the LLM to generate a response while waiting for the end of turn
         # See more at https://docs.livekit.io/agents/build/audio/#preemptive-generation
@@ -223,17 +522,86 @@ async def entrypoint(ctx: JobContext):
     # For more information, see https://docs.livekit.io/agents/build/metrics/
     usage_collector = metrics.UsageCollector()
 
+    # The call's LLM tokens, TTS characters and STT audio are also appended to
+    # the usage ledger (usage/usage-<date>.csv) every USAGE_FLUSH_INTERVAL
+    # seconds; `usage_ledger.py report` sums them by room, date or model, with
+    # costs
+    usage_ledger = ledger_from_env(room=ctx.room.name, tenant=tenant)
+    if usage_ledger is not None:
+        usage_ledger.start()
+        ctx.add_shutdown_callback(usage_ledger.aclose)
+
     @session.on("metrics_collected")
     def _on_metrics_collected(ev: MetricsCollectedEvent):
         metrics.log_metrics(ev.metrics)
         usage_collector.collect(ev.metrics)
+        if usage_ledger is not None:
+            usage_ledger.collect(ev.metrics)
+        # Latency histograms served on the worker's /metrics (METRICS_PORT)
+        observe(ev.metrics, room=ctx.log_context_fields["room"])
 
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        faq_store.cache.log_stats()
+        if tts_cache is not None:
+            tts_cache.log_stats()
 
     ctx.add_shutdown_callback(log_usage)
 
+    # Lead records from generate_summary are written by a background task;
+    # flush it at shutdown so nothing queued is lost. LEAD_FSYNC=1 makes each
+    # batch durable before it is acknowledged. Opening the store creates its
+    # directory and schema, so it runs on a thread like the writes do.
+    lead_store_kind = os.getenv("LEAD_STORE", "sqlite")
+    lead_store_path = os.getenv("LEAD_STORE_PATH") or (
+        "leads/leads.db" if lead_store_kind == "sqlite" else "leads"
+    )
+    lead_store = await asyncio.to_thread(
+        open_lead_store,
+        lead_store_kind,
+        Path(lead_store_path),
+        fsync=os.getenv("LEAD_FSYNC") == "1",
+    )
+    # Repeat callers are merged into their existing lead rather than saved
+    # as a new one each call
+    if os.getenv("LEAD_DEDUPE", "1") == "1":
+        lead_index = LeadIndex(index_path_for(Path(lead_store_path)))
+        lead_store = DedupingLeadStore(lead_store, lead_index)
+    lead_writer = LeadWriter(lead_store)
+
+    # Captured fields are checkpointed to a per-session log as they arrive
+    # and compacted into the store at shutdown, so a lead is kept even if the
+    # caller hangs up before generate_summary. Logs left by crashed sessions
+    # are recovered first.
+    lead_checkpoint = None
+    if os.getenv("LEAD_CHECKPOINT", "1") == "1":
+        checkpoint_dir = Path(os.getenv("LEAD_CHECKPOINT_DIR") or "leads/wal")
+        recovered = await asyncio.to_thread(
+            recover_checkpoints, checkpoint_dir, lead_store
+        )
+        if recovered:
+            logger.info(f"Recovered {recovered} lead(s) from abandoned checkpoints")
+        lead_id = new_lead_id()
+        # Opens and locks the log file
+        lead_checkpoint = await asyncio.to_thread(
+            LeadCheckpoint,
+            checkpoint_dir / f"{lead_id}.wal",
+            lead_id,
+            room=ctx.room.name,
+            fsync=os.getenv("LEAD_FSYNC") == "1",
+        )
+
+    # Shutdown callbacks run concurrently, so the lead steps are chained here:
+    # queued summaries land first, then the checkpoint is compacted over them
+    async def close_leads():
+        await lead_writer.flush()
+        if lead_checkpoint is not None:
+            await lead_checkpoint.aclose(lead_store)
+        await lead_writer.aclose()
+
+    ctx.add_shutdown_callback(close_leads)
+
     # # Add a virtual avatar to the session, if desired
     # # For other providers, see https://docs.livekit.io/agents/models/avatar/
     # avatar = hedra.AvatarSession(
@@ -242,16 +610,50 @@ async def entrypoint(ctx: JobContext):
     # # Start the avatar and wait for it to join
     # await avatar.start(session, room=ctx.room)
 
-    # Get FAQ data from prewarm
-    faq_data = ctx.proc.userdata.get("faq_data", {})
-    
+    # FAQ_PREFETCH=0 turns off searching the FAQ from the caller's transcripts
+    faq_prefetch = prefetcher_from_env(room=ctx.room.name)
+    if faq_prefetch is not None:
+        async def close_faq_prefetch():
+            faq_prefetch.log_stats()
+
+        ctx.add_shutdown_callback(close_faq_prefetch)
+
+    assistant = Assistant(
+        faq_store=faq_store,
+        lead_writer=lead_writer,
+        lead_checkpoint=lead_checkpoint,
+        # FAQ_DIRECT_ANSWER=1 speaks confident FAQ answers without the LLM
+        direct_answers=policy_from_env(),
+        # Only the last CONTEXT_MAX_TURNS turns are sent to the LLM in full
+        context_compactor=compactor_from_env(),
+        # Emails, team sizes and timelines in the caller's words are captured
+        # even on turns where the LLM doesn't call a lead tool
+        lead_extractor=extractor_from_env(),
+        faq_prefetch=faq_prefetch,
+    )
+
+    @session.on("user_input_transcribed")
+    def _on_user_input_transcribed(ev: UserInputTranscribedEvent):
+        # Interim transcripts too, so the search is done by the time the
+        # caller stops speaking; it takes well under a millisecond
+        if faq_prefetch is not None:
+            faq_prefetch.observe(ev.transcript, faq_store.snapshot)
+        if ev.is_final:
+            assistant.note_transcript(ev.transcript)
+
+    # Ends the timing of the last FAQ lookup, however it was answered
+    @session.on("agent_state_changed")
+    def _on_agent_state_changed(ev: AgentStateChangedEvent):
+        if ev.new_state == "speaking":
+            assistant.faq_answer_timer.answer_started()
+
     # Start the session, which initializes the voice pipeline and warms up the models
     await session.start(
-        agent=Assistant(faq_data=faq_data),
+        agent=assistant,
         room=ctx.room,
         room_input_options=RoomInputOptions(
-            # For telephony applications, use `BVCTelephony` for best results
-            noise_cancellation=noise_cancellation.BVC(),
+            # For telephony applications, use NOISE_CANCELLATION=bvc-telephony for best results
+            noise_cancellation=ctx.proc.userdata["noise_canceller"],
         ),
     )
 
@@ -260,4 +662,33 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    # startup-profile sits next to the LiveKit CLI's own commands (start, dev, ...)
+    if sys.argv[1:2] == ["startup-profile"]:
+        from startup_profile import main as profile_startup
+
+        profile_startup(sys.argv[2:])
+        sys.exit()
+
+    # The worker process itself only needs the plugins that register models or
+    # files with it; the job processes import the rest in prewarm
+    pipeline = PipelineConfig.from_env()
+    import_plugins(pipeline.main_process_modules(download_files=sys.argv[1:2] == ["download-files"]))
+
+    # The worker reports itself full on CPU or MAX_SESSIONS
+    # (see worker_load.py) and turns away jobs offered while full, so the
+    # dispatcher sends them to a less loaded worker
+    admission = admission_from_env()
+    server = AgentServer.from_server_options(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            request_fnc=admission.request,
+            load_fnc=admission.load,
+            load_threshold=admission.threshold,
+            prometheus_port=metrics_port(),
+        )
+    )
+    # The turn detector's inference process lives as long as the worker, so
+    # its first prediction is made once here rather than by a caller's turn
+    warm_turn_detector_on_start(server, pipeline)
+    cli.run_app(server)
@@ -0,0 +1,187 @@
+"""Compaction of the chat context sent to the LLM on long calls.
+
+Every user turn, reply and tool result stays in the agent's chat context,
+including the two full FAQ entries each ``lookup_faq`` returns, so prompt
+tokens (and with them time to first token) grow with the length of the
+call. ``ContextCompactor`` builds a smaller copy for each LLM request;
+the agent's own history is left untouched:
+
+- at most the last ``max_turns`` user turns (and everything after them)
+  are kept, after the instructions;
+- tool outputs from before the current turn are replaced by a short
+  reference, e.g. the questions an FAQ lookup matched;
+- the lead fields captured so far are folded into one structured note, so
+  nothing the caller shared is lost when their turn leaves the window.
+  Fields only read off a transcript are marked unconfirmed in it.
+
+Gemini caches the longest prompt prefix it has seen recently, and cached
+tokens are billed at a tenth of the price (see ``usage_ledger.py``). So
+the compacted context changes as little as possible at its head:
+
+- the window is trimmed in blocks of half of ``max_turns``. Its start stays
+  put for several requests instead of moving one turn per request.
+- the lead note, which changes whenever a field is captured, goes right
+  before the latest user turn rather than after the instructions, and as
+  a user-role item: Gemini's provider format lifts every system message
+  into ``system_instruction``, the very head of the prompt.
+
+The estimated size of the full and compacted context is logged for every
+request; the actual prompt tokens are exported as
+``sdr_agent_llm_prompt_tokens`` (see ``turn_metrics.py``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from livekit.agents import llm
+
+logger = logging.getLogger("agent")
+
+# Roughly what LLM tokenizers average on English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(items: list[llm.ChatItem]) -> int:
+    """Approximate prompt size of ``items``."""
+    chars = 0
+    for item in items:
+        if item.type == "message":
+            chars += len(item.text_content or "")
+        elif item.type == "function_call":
+            chars += len(item.name) + len(item.arguments)
+        elif item.type == "function_call_output":
+            chars += len(item.output)
+    return chars // CHARS_PER_TOKEN
+
+
+def _reference(output: llm.FunctionCallOutput) -> str:
+    if output.name == "lookup_faq":
+        questions = [
+            line.removeprefix("Q: ")
+            for line in output.output.splitlines()
+            if line.startswith("Q: ")
+        ]
+        if questions:
+            matched = "; ".join(f'"{q}"' for q in questions)
+            return (
+                f"[Earlier FAQ lookup matched {matched}. Look it up again for details.]"
+            )
+    return f"[Earlier {output.name} output omitted ({len(output.output)} characters)]"
+
+
+def lead_note(lead_data: dict, unconfirmed: Iterable[str] = ()) -> str | None:
+    """The captured lead fields as JSON, or None if there are none. Fields
+    in ``unconfirmed`` (read off a transcript rather than saved by the model)
+    are listed apart, for the model to confirm with the caller."""
+    unconfirmed = set(unconfirmed)
+    captured = {
+        field: value
+        for field, value in lead_data.items()
+        if value not in (None, "", []) and field not in ("lead_id", "timestamp")
+    }
+    if not captured:
+        return None
+    confirmed = {f: v for f, v in captured.items() if f not in unconfirmed}
+    heard = {f: v for f, v in captured.items() if f in unconfirmed}
+    parts = []
+    if confirmed:
+        parts.append(
+            "Lead details already captured (don't ask for these again): "
+            f"{json.dumps(confirmed)}"
+        )
+    if heard:
+        parts.append(
+            "Lead details heard but not confirmed (confirm them with the "
+            f"caller and save them): {json.dumps(heard)}"
+        )
+    return "\n".join(parts)
+
+
+@dataclass
+class CompactionStats:
+    items: int
+    kept_items: int
+    tokens: int
+    kept_tokens: int
+
+
+class ContextCompactor:
+    """Builds the compacted context for one LLM request."""
+
+    def __init__(self, max_turns: int = 8, max_tool_output_chars: int = 160) -> None:
+        self.max_turns = max_turns
+        self.max_tool_output_chars = max_tool_output_chars
+        self.last_stats: CompactionStats | None = None
+
+    def compact(
+        self,
+        chat_ctx: llm.ChatContext,
+        lead_data: dict,
+        unconfirmed: Iterable[str] = (),
+    ) -> llm.ChatContext:
+        items = chat_ctx.items
+        # The instructions come first; everything after them is conversation
+        start = 0
+        while start < len(items) and _is_system(items[start]):
+            start += 1
+        preamble, conversation = items[:start], items[start:]
+
+        user_turns = [
+            i
+            for i, item in enumerate(conversation)
+            if item.type == "message" and item.role == "user"
+        ]
+        if len(user_turns) > self.max_turns:
+            # Drop whole blocks of turns, so the window start (and the cached
+            # prompt prefix) only moves every ``block`` requests
+            block = max(self.max_turns // 2, 1)
+            dropped = -(-(len(user_turns) - self.max_turns) // block) * block
+            first = user_turns[dropped]
+            conversation = conversation[first:]
+            user_turns = [i - first for i in user_turns[dropped:]]
+        current_turn = user_turns[-1] if user_turns else 0
+
+        kept: list[llm.ChatItem] = list(preamble)
+        note = lead_note(lead_data, unconfirmed)
+        for i, item in enumerate(conversation):
+            if i == current_turn and note is not None:
+                # A user-role item: providers move system messages to the
+                # head of the prompt (Gemini's system_instruction)
+                kept.append(llm.ChatMessage(role="user", content=[note]))
+            if (
+                i < current_turn
+                and item.type == "function_call_output"
+                and len(item.output) > self.max_tool_output_chars
+            ):
+                item = item.model_copy(update={"output": _reference(item)})
+            kept.append(item)
+
+        self.last_stats = CompactionStats(
+            items=len(items),
+            kept_items=len(kept),
+            tokens=estimate_tokens(items),
+            kept_tokens=estimate_tokens(kept),
+        )
+        logger.info(
+            f"LLM context: {self.last_stats.kept_items} of {self.last_stats.items} "
+            f"items, ~{self.last_stats.kept_tokens} of ~{self.last_stats.tokens} tokens"
+        )
+        return llm.ChatContext(kept)
+
+
+def _is_system(item: llm.ChatItem) -> bool:
+    return item.type == "message" and item.role in ("system", "developer")
+
+
+def compactor_from_env() -> ContextCompactor | None:
+    """The compactor configured by ``CONTEXT_MAX_TURNS`` (default 8), or None
+    if it is 0."""
+    max_turns = int(os.getenv("CONTEXT_MAX_TURNS") or 8)
+    if max_turns <= 0:
+        return None
+    return ContextCompactor(max_turns=max_turns)
@@ -0,0 +1,354 @@
+"""Compiled, memory-mapped FAQ knowledge artifact.
+
+Building the FAQ indexes means parsing JSON, tokenizing every entry and
+allocating a few Python objects per posting, and every job process of a
+worker does it again in ``prewarm``. The build step below does that work
+once and writes the result as a flat binary file::
+
+    uv run src/faq_artifact.py build
+
+``load_artifact`` opens the file with ``mmap`` and wraps its sections in
+zero-copy NumPy views, so job processes on the same host share a single
+page-cache copy and startup costs a header parse instead of an index build.
+
+Layout (all integers little-endian)::
+
+    magic      8 bytes   b"FAQKB001"
+    size       uint32    length of the JSON header that follows
+    header     JSON      corpus metadata and section table
+    sections   ...       each 8-byte aligned, offsets relative to the
+                         first aligned byte after the header:
+      strings           UTF-8 questions, answers and terms, concatenated
+      entries           uint32 (n, 4)  question offset/length, answer offset/length
+      terms             uint32 (t, 2)  term offset/length, sorted by term
+      term_offsets      uint32 (t + 1) start of each term's postings
+      term_max_impact   float32 (t)    best impact of each term
+      posting_entries   uint32 (p)     entry ids
+      posting_impacts   float32 (p)    precomputed BM25 impacts
+      idf, vectors      float32        semantic index, optional
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import mmap
+import struct
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from faq_search import (
+    FaqHit,
+    FaqIndex,
+    SearchIndex,
+    bm25_idf,
+    calibrated_confidence,
+    tokenize,
+)
+from faq_store import load_faq_file
+
+logger = logging.getLogger("agent")
+
+MAGIC = b"FAQKB001"
+_ALIGNMENT = 8
+
+
+def source_digest(path: Path) -> str:
+    """Hash of the FAQ JSON file an artifact was compiled from."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def compile_artifact(
+    source: Path,
+    output: Path,
+    semantic: bool = True,
+    k1: float = 1.5,
+    b: float = 0.75,
+) -> None:
+    """Compile the FAQ JSON file at ``source`` into an artifact at ``output``."""
+    data = load_faq_file(source)
+    faqs = data.get("faqs", [])
+
+    strings = bytearray()
+
+    def add_string(text: str) -> tuple[int, int]:
+        encoded = text.encode()
+        offset = len(strings)
+        strings.extend(encoded)
+        return offset, len(encoded)
+
+    entries = np.array(
+        [
+            add_string(faq.get("question", "")) + add_string(faq.get("answer", ""))
+            for faq in faqs
+        ],
+        dtype=np.uint32,
+    ).reshape(len(faqs), 4)
+
+    index = FaqIndex(faqs, k1=k1, b=b)
+    terms, term_offsets, term_max_impact = [], [0], []
+    posting_entries: list[int] = []
+    posting_impacts: list[float] = []
+    for term, impacts in index.term_impacts():
+        terms.append(add_string(term))
+        for entry_id in sorted(impacts):
+            posting_entries.append(entry_id)
+            posting_impacts.append(impacts[entry_id])
+        term_offsets.append(len(posting_entries))
+        term_max_impact.append(max(impacts.values()))
+
+    sections = {
+        "strings": np.frombuffer(bytes(strings), dtype=np.uint8),
+        "entries": entries,
+        "terms": np.array(terms, dtype=np.uint32).reshape(len(terms), 2),
+        "term_offsets": np.array(term_offsets, dtype=np.uint32),
+        "term_max_impact": np.array(term_max_impact, dtype=np.float32),
+        "posting_entries": np.array(posting_entries, dtype=np.uint32),
+        "posting_impacts": np.array(posting_impacts, dtype=np.float32),
+    }
+    if semantic:
+        from faq_vectors import SemanticFaqIndex
+
+        vectors = SemanticFaqIndex(faqs)
+        sections["idf"] = vectors.idf
+        sections["vectors"] = vectors.matrix
+
+    header = {
+        "source_sha256": source_digest(source),
+        "entries": len(faqs),
+        "metadata": {key: value for key, value in data.items() if key != "faqs"},
+        "sections": {},
+    }
+    # Offsets are relative to the first aligned byte after the header
+    offset = 0
+    for name, array in sections.items():
+        header["sections"][name] = {
+            "offset": offset,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+        offset = _align(offset + array.nbytes)
+    encoded_header = json.dumps(header).encode()
+    data_start = _align(len(MAGIC) + 4 + len(encoded_header))
+
+    tmp = output.with_suffix(output.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(encoded_header)))
+        f.write(encoded_header)
+        for name, array in sections.items():
+            f.seek(data_start + header["sections"][name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    # Replace atomically so running workers never map a half-written file
+    tmp.replace(output)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class CompiledEntries(Sequence):
+    """FAQ entries decoded on demand from the artifact's string table."""
+
+    def __init__(self, strings: memoryview, entries: np.ndarray) -> None:
+        self._strings = strings
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        q_off, q_len, a_off, a_len = (int(v) for v in self._entries[i])
+        return {
+            "question": str(self._strings[q_off : q_off + q_len], "utf-8"),
+            "answer": str(self._strings[a_off : a_off + a_len], "utf-8"),
+        }
+
+
+class CompiledFaqIndex:
+    """BM25 search straight over the artifact's memory-mapped postings.
+
+    Scores and confidences match ``FaqIndex`` built from the same file.
+    Updates (hot reload) fall back to building an in-memory ``FaqIndex``.
+    """
+
+    def __init__(self, artifact: FaqArtifact, min_confidence: float = 0.0) -> None:
+        self.min_confidence = min_confidence
+        self._faqs = artifact.faqs
+        self._strings = artifact.strings
+        self._terms = artifact.sections["terms"]
+        self._term_offsets = artifact.sections["term_offsets"]
+        self._term_max_impact = artifact.sections["term_max_impact"]
+        self._posting_entries = artifact.sections["posting_entries"]
+        self._posting_impacts = artifact.sections["posting_impacts"]
+
+    def __len__(self) -> int:
+        return len(self._faqs)
+
+    def _term(self, i: int) -> bytes:
+        offset, length = self._terms[i]
+        return bytes(self._strings[offset : offset + length])
+
+    def _find(self, term: str) -> int | None:
+        # Binary search over the sorted term table, reading terms lazily from
+        # the mapping rather than building a dict in every process
+        key = term.encode()
+        low, high = 0, len(self._terms)
+        while low < high:
+            mid = (low + high) // 2
+            if self._term(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(self._terms) and self._term(low) == key:
+            return low
+        return None
+
+    def _idf(self, term: str) -> float:
+        i = self._find(term)
+        df = 0 if i is None else int(self._term_offsets[i + 1] - self._term_offsets[i])
+        return bm25_idf(len(self._faqs), df)
+
+    def search(self, query: str, limit: int = 2) -> list[FaqHit]:
+        """Return up to ``limit`` entries matching ``query``, best first."""
+        n = len(self._faqs)
+        scores = np.zeros(n, dtype=np.float32)
+        best_possible = 0.0
+        matched = False
+        terms = set(tokenize(query))
+        for term in terms:
+            i = self._find(term)
+            if i is None:
+                # Same ceiling FaqIndex uses for terms absent from the corpus
+                best_possible += bm25_idf(n, 0)
+                continue
+            start, end = self._term_offsets[i], self._term_offsets[i + 1]
+            scores[self._posting_entries[start:end]] += self._posting_impacts[start:end]
+            best_possible += float(self._term_max_impact[i])
+            matched = True
+        if not matched or limit <= 0:
+            return []
+
+        limit = min(limit, n)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        hits = []
+        for row in top:
+            if scores[row] <= 0:
+                continue
+            faq = self._faqs[int(row)]
+            coverage = min(float(scores[row]) / best_possible, 1.0)
+            confidence = calibrated_confidence(coverage, terms, faq, self._idf)
+            hits.append(FaqHit(faq, float(scores[row]), confidence))
+        return [hit for hit in hits if hit.confidence >= self.min_confidence]
+
+    def with_changes(self, added: Iterable[dict], removed: Iterable[dict]) -> FaqIndex:
+        """Apply a hot-reload diff by materialising an in-memory ``FaqIndex``."""
+        return FaqIndex(
+            list(self._faqs), min_confidence=self.min_confidence
+        ).with_changes(added, removed)
+
+
+class FaqArtifact:
+    """A memory-mapped compiled artifact."""
+
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a compiled FAQ artifact")
+        (header_length,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._mmap[start : start + header_length])
+        data_start = _align(start + header_length)
+
+        self.sections: dict[str, np.ndarray] = {}
+        for name, section in self.header["sections"].items():
+            dtype = np.dtype(section["dtype"])
+            shape = tuple(section["shape"])
+            self.sections[name] = np.frombuffer(
+                self._mmap,
+                dtype=dtype,
+                count=math.prod(shape),
+                offset=data_start + section["offset"],
+            ).reshape(shape)
+        self.strings = memoryview(self.sections["strings"])
+        self.faqs = CompiledEntries(self.strings, self.sections["entries"])
+
+    @property
+    def source_sha256(self) -> str:
+        return self.header["source_sha256"]
+
+    def faq_data(self) -> dict:
+        """The FAQ document, with ``faqs`` decoded lazily from the artifact."""
+        return {**self.header["metadata"], "faqs": self.faqs}
+
+    def build_index(
+        self, mode: str = "keyword", min_confidence: float | None = None
+    ) -> SearchIndex:
+        options = {} if min_confidence is None else {"min_confidence": min_confidence}
+        if mode == "keyword":
+            return CompiledFaqIndex(self, **options)
+        if mode == "semantic":
+            if "vectors" not in self.sections:
+                raise ValueError("FAQ artifact was compiled without vectors")
+            from faq_vectors import SemanticFaqIndex
+
+            return SemanticFaqIndex.from_arrays(
+                self.faqs, self.sections["vectors"], self.sections["idf"], **options
+            )
+        raise ValueError(f"Unknown FAQ search mode: {mode!r}")
+
+
+def load_artifact(path: Path, source: Path | None = None) -> FaqArtifact | None:
+    """Map the artifact at ``path``, or return None if it is missing, invalid
+    or was compiled from a different version of ``source``."""
+    if not path.exists():
+        return None
+    try:
+        artifact = FaqArtifact(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring FAQ artifact {path}: {e}")
+        return None
+    if source is not None and artifact.source_sha256 != source_digest(source):
+        logger.warning(
+            f"FAQ artifact {path} is stale, rebuild it with `faq_artifact.py build`"
+        )
+        return None
+    return artifact
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile the FAQ knowledge artifact")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile the FAQ JSON into an artifact")
+    build.add_argument(
+        "--source", type=Path, default=Path(__file__).parent / "company_faq.json"
+    )
+    build.add_argument(
+        "--output", type=Path, help="defaults to the source path with .faqkb"
+    )
+    build.add_argument(
+        "--no-vectors",
+        action="store_true",
+        help="skip the semantic search vectors to keep the artifact small",
+    )
+    args = parser.parse_args(argv)
+
+    output = args.output or args.source.with_suffix(".faqkb")
+    compile_artifact(args.source, output, semantic=not args.no_vectors)
+    print(
+        f"Compiled {len(FaqArtifact(output).faqs)} FAQ entries from {args.source} "
+        f"into {output} ({output.stat().st_size} bytes)"
+    )
+
+
+if __name__ == "__main__":
+    main()
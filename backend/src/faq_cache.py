@@ -0,0 +1,102 @@
+"""Process-wide cache of formatted ``lookup_faq`` responses.
+
+Most callers ask the same handful of questions (pricing, free tier, UPI,
+integration), phrased slightly differently each time. Queries are reduced
+to the sorted set of their search terms, so "What's the pricing?" and
+"pricing, what is it" share one entry and skip both the index search and
+the response formatting.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from faq_search import tokenize
+
+# Same logger as ``metrics.log_metrics`` so cache counters land next to the
+# pipeline metrics
+metrics_logger = logging.getLogger("livekit.agents")
+
+
+class FaqResultCache:
+    """Bounded LRU cache with a per-entry time to live.
+
+    The cache is shared by every session in a job process, so it must be
+    invalidated whenever the FAQ data it was filled from changes.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Cache key for ``query``: case, punctuation, word order and
+        stopwords don't matter."""
+        return " ".join(sorted(set(tokenize(query))))
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry, e.g. after the FAQ data was reloaded."""
+        self._entries.clear()
+
+    def ensure_version(self, version: int) -> None:
+        """Invalidate the cache if it was filled from another FAQ version."""
+        if version != self.version:
+            self.invalidate()
+            self.version = version
+
+    def log_stats(self, logger: logging.Logger | None = None) -> None:
+        lookups = self.hits + self.misses
+        (logger or metrics_logger).info(
+            "FAQ cache metrics",
+            extra={
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 2) if lookups else 0.0,
+                "size": len(self._entries),
+            },
+        )
@@ -0,0 +1,95 @@
+"""Speak confident FAQ answers directly instead of through the LLM.
+
+An FAQ question normally costs two LLM round trips before any audio plays:
+one to emit the ``lookup_faq`` call and one to rephrase the returned
+"Q:/A:" text. When the best hit is good enough, ``lookup_faq`` can instead
+have the session speak the stored answer (cut to whole sentences within a
+spoken-length budget) and return no output, so no second LLM request is
+made.
+
+A hit qualifies when all of these hold:
+
+- its confidence is at least ``min_confidence``
+- it beats the runner-up by ``min_margin``: queries made only of generic
+  words ("What does Razorpay do?") match several entries about equally
+  well, and those are left to the LLM. When the index returned no
+  runner-up (it was under the index's threshold), the margin is measured
+  against 0 and the two floors below decide
+- its raw score is at least ``min_score``, so one rare word matched in
+  passing ("team" in the support answer) is not enough evidence. For BM25
+  that is about two query terms' worth; semantic scores are already
+  calibrated by the index's threshold, so the floor is 0 in that mode
+- the entry contains at least ``min_matched`` of the query's search terms
+
+Opt in with ``FAQ_DIRECT_ANSWER=1``; every lookup is counted per path in
+``sdr_agent_faq_answers_total`` and timed to the first audio of its answer
+in ``sdr_agent_faq_answer_delay_seconds``, so the two paths can be compared.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+
+from faq_search import FaqHit, tokenize
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class DirectAnswerPolicy:
+    min_confidence: float = 0.8
+    min_margin: float = 0.2
+    min_score: float = 3.0
+    min_matched: float = 0.75
+    max_chars: int = 300
+    """Spoken answers are cut to whole sentences within this many
+    characters (the first sentence is always kept); 0 disables the cut."""
+
+    def choose(self, query: str, hits: list[FaqHit]) -> FaqHit | None:
+        """The hit for ``query`` to answer with directly, if any."""
+        if not hits:
+            return None
+        best = hits[0]
+        runner_up = hits[1].confidence if len(hits) > 1 else 0.0
+        if best.confidence < self.min_confidence or best.score < self.min_score:
+            return None
+        if best.confidence - runner_up < self.min_margin:
+            return None
+        terms = set(tokenize(query))
+        entry = tokenize(f"{best.faq.get('question', '')} {best.faq.get('answer', '')}")
+        if not terms or len(terms & set(entry)) < self.min_matched * len(terms):
+            return None
+        return best
+
+    def spoken(self, answer: str) -> str:
+        """``answer`` cut to the spoken-length budget."""
+        if not self.max_chars or len(answer) <= self.max_chars:
+            return answer
+        sentences = _SENTENCE_END.split(answer.strip())
+        kept = sentences[0]
+        for sentence in sentences[1:]:
+            if len(kept) + 1 + len(sentence) > self.max_chars:
+                break
+            kept += " " + sentence
+        return kept
+
+
+def policy_from_env() -> DirectAnswerPolicy | None:
+    """The policy configured by the ``FAQ_DIRECT_*`` variables, or None if
+    direct answers are off."""
+    if os.getenv("FAQ_DIRECT_ANSWER") != "1":
+        return None
+    defaults = DirectAnswerPolicy()
+    if os.getenv("FAQ_SEARCH_MODE") == "semantic":
+        defaults.min_score = 0.0
+    return DirectAnswerPolicy(
+        min_confidence=float(
+            os.getenv("FAQ_DIRECT_MIN_CONFIDENCE") or defaults.min_confidence
+        ),
+        min_margin=float(os.getenv("FAQ_DIRECT_MIN_MARGIN") or defaults.min_margin),
+        min_score=float(os.getenv("FAQ_DIRECT_MIN_SCORE") or defaults.min_score),
+        min_matched=float(os.getenv("FAQ_DIRECT_MIN_MATCHED") or defaults.min_matched),
+        max_chars=int(os.getenv("FAQ_DIRECT_MAX_CHARS") or defaults.max_chars),
+    )
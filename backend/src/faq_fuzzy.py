@@ -0,0 +1,325 @@
+"""Query repair for FAQ search, against the FAQ's own vocabulary.
+
+The caller's question reaches ``lookup_faq`` as the STT heard it: "razor
+pay" for Razorpay, "you pee eye" for UPI, "pricng" for pricing. Those words
+are not in the index, so the search misses and the agent falls back to the
+generic company description. ``FuzzyFaqIndex`` searches the query as heard
+first. Only when that finds nothing, or nothing as sure as
+``TRUSTED_CONFIDENCE``, does ``QueryExpander`` rewrite it for a second
+search, one position at a time, trying in order:
+
+- the alias table: a phrase mapped to the word the FAQ uses for it ("cost"
+  to "pricing"), which replaces the phrase, so the rewrite is scored on
+  the FAQ's word alone. The table is ``DEFAULT_ALIASES`` plus the JSON
+  file named by ``FAQ_ALIASES``
+- spelled-out letters ("you pee eye", "u p i") joined into an acronym
+- two or three words joined into one ("razor pay")
+- an unknown word replaced by the FAQ term with the same phonetic key, or
+  else the one sharing the most character trigrams, as long as it is a
+  letter or so in four away ("pricng" for pricing, but not "refunds" for
+  funds)
+
+A rewrite is only made when it lands on a term the FAQ actually contains,
+words the index already knows are left alone and no term is searched
+twice, and the rewrite's hits are only used when they beat those of the
+query as heard. The vocabulary's trigram and phonetic-key indexes are
+built once per FAQ snapshot, and each word's repair is cached, so
+expanding a query costs a few dictionary lookups.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+from faq_search import _TOKEN_RE, STOPWORDS, FaqHit, SearchIndex, _stem
+
+# Phrases callers use for what the FAQ calls something else. Keys are
+# matched on whole words, lowercased; FAQ_ALIASES adds to or overrides them.
+DEFAULT_ALIASES = {
+    "cost": "pricing",
+    "how much": "pricing",
+    "expensive": "pricing",
+    "cheap": "pricing",
+    "safe": "secure",
+    "hook up": "integrate",
+    "customer care": "support",
+    "help desk": "support",
+}
+
+# How letters come out of an STT when a caller spells an acronym
+LETTER_NAMES = {
+    **{letter: letter for letter in "abcdefghijklmnopqrstuvwxyz"},
+    "ay": "a", "bee": "b", "be": "b", "see": "c", "sea": "c", "cee": "c",
+    "dee": "d", "ee": "e", "ef": "f", "eff": "f", "gee": "g", "aitch": "h",
+    "eye": "i", "jay": "j", "kay": "k", "el": "l", "ell": "l", "em": "m",
+    "en": "n", "oh": "o", "pee": "p", "pea": "p", "cue": "q", "queue": "q",
+    "are": "r", "ar": "r", "es": "s", "ess": "s", "tee": "t", "tea": "t",
+    "you": "u", "vee": "v", "ex": "x", "why": "y", "zee": "z", "zed": "z",
+}  # fmt: skip
+
+# Letters that sound alike once transcribed, folded to one code
+_PHONETIC_FOLD = str.maketrans("bdgzvjq", "ptksfkk")
+_PHONETIC_DIGRAPHS = (
+    ("ph", "f"), ("ck", "k"), ("sch", "sk"), ("gh", "g"), ("kn", "n"),
+    ("wr", "r"), ("qu", "kw"), ("x", "ks"),
+)  # fmt: skip
+# Words shorter than this are too ambiguous to correct
+MIN_FUZZY_LENGTH = 4
+# A spelled correction may change one letter in four
+LETTERS_PER_EDIT = 4
+# Hits at least this confident are kept without trying a rewrite
+TRUSTED_CONFIDENCE = 0.6
+MAX_JOIN = 3
+_CACHE_SIZE = 4096
+
+
+def phonetic_key(word: str) -> str:
+    """A rough sound-alike key: vowels after the first letter dropped and
+    consonants that ASR confuses folded together."""
+    word = word.lower()
+    for digraph, replacement in _PHONETIC_DIGRAPHS:
+        word = word.replace(digraph, replacement)
+    codes = []
+    for i, ch in enumerate(word):
+        if ch in "aeiouy":
+            code = "a" if i == 0 else ""
+        elif ch in "hw":
+            code = ch if i == 0 else ""
+        elif ch == "c":
+            code = "s" if word[i + 1 : i + 2] in ("e", "i", "y") else "k"
+        elif ch.isalpha():
+            code = ch.translate(_PHONETIC_FOLD)
+        else:
+            code = ""
+        if code and (not codes or codes[-1] != code):
+            codes.append(code)
+    return "".join(codes)
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f"${term}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between ``a`` and ``b``."""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        previous = current
+    return previous[-1]
+
+
+def faq_words(faqs: Iterable[dict]) -> Counter[str]:
+    """Every searchable word of ``faqs``, counted."""
+    words: Counter[str] = Counter()
+    for faq in faqs:
+        text = f"{faq.get('question', '')} {faq.get('answer', '')}".lower()
+        words.update(w for w in _TOKEN_RE.findall(text) if w not in STOPWORDS)
+    return words
+
+
+def load_aliases(path: str | Path | None = None) -> dict[str, str]:
+    """``DEFAULT_ALIASES`` with the JSON object at ``path`` applied on top."""
+    aliases = dict(DEFAULT_ALIASES)
+    if path:
+        with open(path) as f:
+            aliases.update(json.load(f))
+    return {" ".join(_TOKEN_RE.findall(k.lower())): v for k, v in aliases.items()}
+
+
+class QueryExpander:
+    """Rewrites misheard words in a query to terms of the FAQ vocabulary."""
+
+    def __init__(
+        self,
+        words: Counter[str],
+        aliases: dict[str, str] | None = None,
+        min_similarity: float = 0.6,
+    ) -> None:
+        self.words = words
+        self.aliases = load_aliases() if aliases is None else aliases
+        self.min_similarity = min_similarity
+        self._max_alias = max((len(k.split()) for k in self.aliases), default=0)
+        # Each stem is searched as the FAQ's most common spelling of it, which
+        # tokenizes back to that stem
+        self._surface: dict[str, str] = {}
+        for word, _ in words.most_common():
+            self._surface.setdefault(_stem(word), word)
+        self._trigrams: dict[str, set[str]] = {}
+        self._by_trigram: dict[str, list[str]] = {}
+        self._by_key: dict[str, list[str]] = {}
+        for term in self._surface:
+            if len(term) < MIN_FUZZY_LENGTH:
+                continue
+            grams = trigrams(term)
+            self._trigrams[term] = grams
+            for gram in grams:
+                self._by_trigram.setdefault(gram, []).append(term)
+            self._by_key.setdefault(phonetic_key(term), []).append(term)
+        self._cache: dict[str, tuple[str | None, str | None]] = {}
+
+    def __contains__(self, word: str) -> bool:
+        return word in STOPWORDS or _stem(word) in self._surface
+
+    def correct(self, word: str, sound_alike: bool = False) -> str | None:
+        """The FAQ word ``word`` was probably meant to be, if it isn't one;
+        with ``sound_alike`` only a word with the same phonetic key."""
+        stem = _stem(word)
+        if stem in self._surface:
+            return self._surface[stem]
+        if len(stem) < MIN_FUZZY_LENGTH or stem.isdigit():
+            return None
+        matches = self._cache.get(stem)
+        if matches is None:
+            if len(self._cache) >= _CACHE_SIZE:
+                self._cache.clear()
+            matches = self._cache[stem] = self._closest(stem)
+        alike, spelled = matches
+        if sound_alike or alike is not None:
+            return alike
+        # Sharing trigrams isn't enough on its own: "funds" shares most of
+        # "refunds" but is another word
+        if spelled is not None and edit_distance(word, spelled) > max(
+            1, len(word) // LETTERS_PER_EDIT
+        ):
+            return None
+        return spelled
+
+    def _closest(self, stem: str) -> tuple[str | None, str | None]:
+        """The closest sound-alike and the closest by spelling alone."""
+        grams = trigrams(stem)
+        shared: Counter[str] = Counter()
+        for gram in grams:
+            shared.update(self._by_trigram.get(gram, ()))
+
+        def similarity(term: str) -> float:
+            return 2 * shared[term] / (len(grams) + len(self._trigrams[term]))
+
+        # A sound-alike is trusted with less spelling in common than a typo
+        alike = max(
+            self._by_key.get(phonetic_key(stem), ()), key=similarity, default=None
+        )
+        if alike is not None and similarity(alike) < self.min_similarity / 2:
+            alike = None
+        spelled = max(shared, key=similarity, default=None)
+        if spelled is not None and similarity(spelled) < self.min_similarity:
+            spelled = None
+        return (
+            self._surface[alike] if alike is not None else None,
+            self._surface[spelled] if spelled is not None else None,
+        )
+
+    def _alias(self, words: list[str], i: int) -> tuple[int, str] | None:
+        for n in range(min(self._max_alias, len(words) - i), 0, -1):
+            replacement = self.aliases.get(" ".join(words[i : i + n]))
+            if replacement is not None:
+                return n, replacement
+        return None
+
+    def _acronym(self, words: list[str], i: int) -> tuple[int, str] | None:
+        letters = []
+        for word in words[i:]:
+            letter = LETTER_NAMES.get(word)
+            if letter is None:
+                break
+            letters.append(letter)
+        for n in range(len(letters), 1, -1):
+            stem = _stem("".join(letters[:n]))
+            if stem in self._surface:
+                return n, self._surface[stem]
+        return None
+
+    def _join(self, words: list[str], i: int) -> tuple[int, str] | None:
+        for n in range(min(MAX_JOIN, len(words) - i), 1, -1):
+            span = words[i : i + n]
+            joined = "".join(span)
+            stem = _stem(joined)
+            if stem in self._surface:
+                return n, self._surface[stem]
+            # A word split in two still sounds the same; only misheard words
+            # are joined this way, never a phrase of known ones
+            if any(word not in self for word in span):
+                match = self.correct(joined, sound_alike=True)
+                if match is not None:
+                    return n, match
+        return None
+
+    def expand(self, query: str) -> str:
+        """``query`` with its misheard words rewritten to FAQ terms."""
+        words = _TOKEN_RE.findall(query.lower())
+        out: dict[str, None] = {}
+        i = 0
+        while i < len(words):
+            found = (
+                self._alias(words, i) or self._acronym(words, i) or self._join(words, i)
+            )
+            if found is not None:
+                n, replacement = found
+            else:
+                n, word = 1, words[i]
+                replacement = word if word in self else self.correct(word) or word
+            # An alias can repeat a term the query already has ("how much
+            # does it cost"), which would weigh it twice
+            out.update(dict.fromkeys(replacement.split()))
+            i += n
+        return " ".join(out)
+
+
+class FuzzyFaqIndex:
+    """A ``SearchIndex`` that expands queries before searching ``index``."""
+
+    def __init__(
+        self,
+        index: SearchIndex,
+        faqs: Iterable[dict],
+        aliases: dict[str, str] | None = None,
+        words: Counter[str] | None = None,
+        trusted_confidence: float = TRUSTED_CONFIDENCE,
+    ) -> None:
+        self.index = index
+        self.aliases = aliases
+        self.trusted_confidence = trusted_confidence
+        self.words = faq_words(faqs) if words is None else words
+        self.expander = QueryExpander(self.words, aliases)
+
+    @property
+    def min_confidence(self) -> float:
+        return self.index.min_confidence
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def search(self, query: str, limit: int = 2) -> list[FaqHit]:
+        hits = self.index.search(query, limit)
+        if hits and hits[0].confidence >= self.trusted_confidence:
+            return hits
+        expanded = self.expander.expand(query)
+        if expanded == " ".join(_TOKEN_RE.findall(query.lower())):
+            return hits
+        repaired = self.index.search(expanded, limit)
+        if repaired and (not hits or repaired[0].confidence > hits[0].confidence):
+            return repaired
+        return hits
+
+    def with_changes(
+        self, added: Iterable[dict], removed: Iterable[dict]
+    ) -> FuzzyFaqIndex:
+        """The updated index, with the vocabulary of the changed entries."""
+        added, removed = list(added), list(removed)
+        words = self.words + faq_words(added)
+        words.subtract(faq_words(removed))
+        return FuzzyFaqIndex(
+            self.index.with_changes(added, removed),
+            (),
+            self.aliases,
+            words=+words,
+            trusted_confidence=self.trusted_confidence,
+        )
@@ -0,0 +1,121 @@
+"""Speculative FAQ retrieval from the caller's transcripts.
+
+``lookup_faq`` only runs once the LLM has read the whole turn and emitted
+a tool call, although the caller's question has been in the STT's interim
+transcripts since they asked it. ``FaqPrefetcher`` searches the FAQ index
+for each new interim or final transcript as it arrives and keeps the hits
+for the session. The LLM's query is usually the caller's question cut
+down to its topic ("payment methods" for "what payment methods do you
+support"), so when every search term of the query is in a prefetched
+transcript, ``lookup_faq`` takes that transcript's hits instead of
+searching again; of several, the one with the fewest other terms.
+
+Those hits answer the caller's question, not necessarily the query, so
+``lookup_faq`` doesn't store them in ``FaqCache`` under the query's terms.
+A search takes well under a millisecond, so it runs inline in the
+transcript callback, and a transcript with the same search terms as one
+already prefetched is skipped. Hits are tied to the FAQ snapshot they
+were found in, and a reload makes them stale. Lookups are counted as hits
+or misses, with the search time each hit saved, in
+``FAQ_PREFETCH_LOOKUPS`` and ``FAQ_PREFETCH_SAVED``, and summarized in the
+log at the end of the call.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from faq_search import FaqHit, tokenize
+from faq_store import FaqSnapshot
+from turn_metrics import FAQ_PREFETCH_LOOKUPS, FAQ_PREFETCH_SAVED
+
+logger = logging.getLogger("agent")
+
+
+@dataclass
+class _Prefetched:
+    hits: list[FaqHit]
+    version: int
+    search_seconds: float
+
+
+class FaqPrefetcher:
+    """Per-session cache of FAQ hits for the caller's recent transcripts."""
+
+    def __init__(self, room: str = "", max_entries: int = 16) -> None:
+        self.room = room
+        self.max_entries = max_entries
+        self.prefetches = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries: OrderedDict[frozenset[str], _Prefetched] = OrderedDict()
+
+    def observe(self, transcript: str, snapshot: FaqSnapshot) -> None:
+        """Search the FAQ for ``transcript`` and keep the hits."""
+        terms = frozenset(tokenize(transcript))
+        if not terms:
+            return
+        entry = self._entries.get(terms)
+        if entry is not None and entry.version == snapshot.version:
+            return
+        start = time.perf_counter()
+        try:
+            hits = snapshot.index.search(transcript, 2)
+        except Exception:
+            logger.exception(f"FAQ prefetch failed for {transcript!r}")
+            return
+        self._entries[terms] = _Prefetched(
+            hits, snapshot.version, time.perf_counter() - start
+        )
+        self._entries.move_to_end(terms)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.prefetches += 1
+
+    def take(self, query: str, version: int) -> list[FaqHit] | None:
+        """The prefetched hits of the transcript in FAQ snapshot ``version``
+        that has every search term of ``query`` and the fewest others, or
+        None if there is none."""
+        terms = frozenset(tokenize(query))
+        entry = None
+        extra = 0
+        # Latest first, so later transcripts (more of the question) win ties
+        for entry_terms, candidate in reversed(self._entries.items()):
+            if candidate.version != version or not terms or not terms <= entry_terms:
+                continue
+            if entry is None or len(entry_terms) - len(terms) < extra:
+                entry, extra = candidate, len(entry_terms) - len(terms)
+        if entry is None:
+            self.misses += 1
+            FAQ_PREFETCH_LOOKUPS.labels(self.room, "miss").inc()
+            return None
+        self.hits += 1
+        self.saved_seconds += entry.search_seconds
+        FAQ_PREFETCH_LOOKUPS.labels(self.room, "hit").inc()
+        FAQ_PREFETCH_SAVED.labels(self.room).observe(entry.search_seconds)
+        return entry.hits
+
+    def log_stats(self) -> None:
+        lookups = self.hits + self.misses
+        logger.info(
+            "FAQ prefetch metrics",
+            extra={
+                "prefetches": self.prefetches,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 2) if lookups else 0.0,
+                "saved_ms": round(self.saved_seconds * 1000, 2),
+            },
+        )
+
+
+def prefetcher_from_env(room: str) -> FaqPrefetcher | None:
+    """The session's prefetcher, unless ``FAQ_PREFETCH=0``."""
+    if os.getenv("FAQ_PREFETCH", "1") != "1":
+        return None
+    return FaqPrefetcher(room=room)
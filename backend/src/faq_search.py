@@ -0,0 +1,321 @@
+"""Keyword search over the company FAQ.
+
+The FAQ corpus is tokenized once per job process (in ``prewarm``) into an
+inverted index, so a ``lookup_faq`` call only touches the postings of the
+terms in the query instead of rescanning every question and answer.
+Results are ranked with Okapi BM25.
+"""
+
+from __future__ import annotations
+
+import copy
+import heapq
+import math
+import re
+from collections.abc import Callable, Iterable, Iterator
+from typing import NamedTuple, Protocol
+
+# Common English function words plus the filler that shows up in spoken
+# questions ("can you tell me about ..."). They carry no signal for ranking
+# and would otherwise produce huge postings lists. The trailing fragments are
+# what's left of contractions ("what's", "don't") after splitting. "who" and
+# "for" are kept on purpose: "who is this for" is a real question in the FAQ.
+_STOPWORDS_TEXT = """
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down
+    during each few from further had has have having he her here hers him
+    his how i if in into is it its itself just know let like me more most my
+    no nor not of off on once only or other our ours out over own please same
+    she should so some such tell than that the their theirs them then there
+    these they this those through to too under until up us very want was we
+    were what when where which while why will with would you your
+    yours
+    d ll m re s t ve
+"""
+STOPWORDS = frozenset(_STOPWORDS_TEXT.split())
+
+# Share of a keyword hit's confidence that rests on the query matching the
+# entry's question rather than just a word somewhere in its answer
+QUESTION_WEIGHT = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word: str) -> str:
+    """Strip the most common English suffixes so "prices" matches "pricing"."""
+    if len(word) <= 3:
+        return word
+    if word.endswith(("sses", "ies")):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and stem."""
+    return [
+        _stem(word) for word in _TOKEN_RE.findall(text.lower()) if word not in STOPWORDS
+    ]
+
+
+def bm25_idf(n: int, df: int) -> float:
+    """BM25 IDF of a term found in ``df`` of ``n`` entries."""
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+def calibrated_confidence(
+    coverage: float, terms: set[str], faq: dict, idf: Callable[[str], float]
+) -> float:
+    """Confidence of a keyword hit on ``faq`` for a query of ``terms``.
+
+    ``coverage`` is the hit's score against the best the query's terms could
+    reach, which is 1.0 for the top entry of any one-word query ("team"
+    finds the support entry through its answer). It is discounted by the
+    IDF-weighted share of the entry's question terms the query doesn't
+    have, so only a query that asks the entry's question is fully trusted.
+    """
+    question = set(tokenize(faq.get("question", "")))
+    total = sum(idf(term) for term in question)
+    asked = sum(idf(term) for term in question & terms) / total if total else 0.0
+    return coverage * (1 - QUESTION_WEIGHT + QUESTION_WEIGHT * asked)
+
+
+def faq_key(faq: dict) -> tuple[str, str]:
+    """Identity of an FAQ entry; editing either field makes it a new entry."""
+    return faq.get("question", ""), faq.get("answer", "")
+
+
+class FaqHit(NamedTuple):
+    faq: dict
+    score: float
+    # How sure the index is that the entry answers the query, in [0, 1].
+    # Unlike ``score`` this is comparable across queries and index types.
+    confidence: float
+
+
+class SearchIndex(Protocol):
+    """What the agent needs from an FAQ index, whichever kind it is."""
+
+    min_confidence: float
+
+    def __len__(self) -> int: ...
+
+    def search(self, query: str, limit: int = 2) -> list[FaqHit]: ...
+
+    def with_changes(
+        self, added: Iterable[dict], removed: Iterable[dict]
+    ) -> SearchIndex: ...
+
+
+class FaqIndex:
+    """Inverted index over FAQ entries with BM25 ranking.
+
+    Each entry is indexed on its question and answer; question terms are
+    counted twice since the question is the best summary of what the entry
+    is about.
+
+    A hit's confidence starts from its score relative to the best score any
+    entry could reach for each query term, so query words absent from the
+    corpus pull it down, and is then calibrated by how much of the entry's
+    question the query asks (``calibrated_confidence``). Hits below
+    ``min_confidence`` are dropped.
+    """
+
+    def __init__(
+        self,
+        faqs: Iterable[dict],
+        k1: float = 1.5,
+        b: float = 0.75,
+        min_confidence: float = 0.0,
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.min_confidence = min_confidence
+        self._faqs: dict[int, dict] = {}
+        self._ids: dict[tuple[str, str], list[int]] = {}
+        self._doc_lengths: dict[int, int] = {}
+        self._postings: dict[str, dict[int, int]] = {}
+        self._norms: dict[int, float] = {}
+        self._impacts: dict[str, dict[int, float]] = {}
+        self._max_impacts: dict[str, float] = {}
+        self._total_length = 0
+        self._next_id = 0
+
+        for faq in faqs:
+            self._index(faq)
+        self._refresh_norms()
+
+    def __len__(self) -> int:
+        return len(self._faqs)
+
+    @staticmethod
+    def _terms(faq: dict) -> list[str]:
+        question = tokenize(faq.get("question", ""))
+        return question + question + tokenize(faq.get("answer", ""))
+
+    def _index(self, faq: dict) -> int:
+        doc_id = self._next_id
+        self._next_id += 1
+
+        terms = self._terms(faq)
+        self._faqs[doc_id] = faq
+        self._ids.setdefault(faq_key(faq), []).append(doc_id)
+        self._doc_lengths[doc_id] = len(terms)
+        self._total_length += len(terms)
+
+        counts: dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        return doc_id
+
+    def _unindex(self, faq: dict) -> None:
+        doc_ids = self._ids.get(faq_key(faq))
+        if not doc_ids:
+            return
+        doc_id = doc_ids.pop()
+        if not doc_ids:
+            del self._ids[faq_key(faq)]
+
+        for term in set(self._terms(faq)):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        del self._faqs[doc_id]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def with_changes(self, added: Iterable[dict], removed: Iterable[dict]) -> FaqIndex:
+        """Return a copy of the index with ``removed`` entries dropped and
+        ``added`` entries indexed.
+
+        Only the entries that changed are tokenized; postings of untouched
+        terms are shared with this index, which is left as it was, so
+        sessions still searching it never see a half-applied update.
+        """
+        added, removed = list(added), list(removed)
+        index = copy.copy(self)
+        index._faqs = dict(self._faqs)
+        index._ids = dict(self._ids)
+        index._doc_lengths = dict(self._doc_lengths)
+        index._postings = dict(self._postings)
+        index._impacts = {}
+        index._max_impacts = {}
+
+        # Copy-on-write: only the postings lists that are about to change
+        for faq in added + removed:
+            if faq_key(faq) in self._ids:
+                index._ids[faq_key(faq)] = list(self._ids[faq_key(faq)])
+            for term in set(self._terms(faq)):
+                if term in self._postings:
+                    index._postings[term] = dict(self._postings[term])
+
+        for faq in removed:
+            index._unindex(faq)
+        for faq in added:
+            index._index(faq)
+        index._refresh_norms()
+        return index
+
+    def _refresh_norms(self) -> None:
+        # The length normalisation part of the BM25 denominator only depends
+        # on the document, so it is computed up front rather than per query.
+        avg_length = self._total_length / len(self._faqs) if self._faqs else 0.0
+        self._norms = {
+            doc_id: self.k1 * (1 - self.b + self.b * length / avg_length)
+            if avg_length
+            else self.k1
+            for doc_id, length in self._doc_lengths.items()
+        }
+        self._impacts.clear()
+        self._max_impacts.clear()
+
+    def _idf(self, term: str) -> float:
+        return bm25_idf(len(self._faqs), len(self._postings.get(term, ())))
+
+    def _term_impacts(self, term: str) -> dict[int, float] | None:
+        # A term's BM25 contribution to each document doesn't depend on the
+        # rest of the query, so it is computed on first use and reused.
+        impacts = self._impacts.get(term)
+        if impacts is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            idf = self._idf(term)
+            k1 = self.k1
+            norms = self._norms
+            impacts = {
+                doc_id: idf * tf * (k1 + 1) / (tf + norms[doc_id])
+                for doc_id, tf in postings.items()
+            }
+            self._impacts[term] = impacts
+            self._max_impacts[term] = max(impacts.values())
+        return impacts
+
+    def term_impacts(self) -> Iterator[tuple[str, dict[int, float]]]:
+        """Yield every term with its BM25 impact per entry, in term order.
+
+        Entry ids are positions in the list the index was built from, as
+        long as it hasn't been updated with ``with_changes``.
+        """
+        for term in sorted(self._postings):
+            yield term, self._term_impacts(term)
+
+    def search(self, query: str, limit: int = 2) -> list[FaqHit]:
+        """Return up to ``limit`` entries matching ``query``, best first."""
+        scores: dict[int, float] = {}
+        best_possible = 0.0
+        terms = set(tokenize(query))
+        for term in terms:
+            impacts = self._term_impacts(term)
+            if impacts is None:
+                # An unknown term would have the highest possible IDF
+                best_possible += self._idf(term)
+                continue
+            best_possible += self._max_impacts[term]
+            if not scores:
+                scores = dict(impacts)
+                continue
+            for doc_id, impact in impacts.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + impact
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        hits = [
+            FaqHit(
+                self._faqs[doc_id],
+                score,
+                calibrated_confidence(
+                    min(score / best_possible, 1.0),
+                    terms,
+                    self._faqs[doc_id],
+                    self._idf,
+                ),
+            )
+            for doc_id, score in best
+        ]
+        return [hit for hit in hits if hit.confidence >= self.min_confidence]
+
+
+def build_faq_index(
+    faqs: Iterable[dict],
+    mode: str = "keyword",
+    min_confidence: float | None = None,
+) -> SearchIndex:
+    """Build the FAQ index for ``mode``: "keyword" (BM25) or "semantic"."""
+    options = {} if min_confidence is None else {"min_confidence": min_confidence}
+    if mode == "keyword":
+        return FaqIndex(faqs, **options)
+    if mode == "semantic":
+        # Imported lazily so the keyword mode never pays for NumPy
+        from faq_vectors import SemanticFaqIndex
+
+        return SemanticFaqIndex(faqs, **options)
+    raise ValueError(f"Unknown FAQ search mode: {mode!r}")
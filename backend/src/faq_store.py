@@ -0,0 +1,186 @@
+"""Live FAQ knowledge shared by the sessions of a job process.
+
+``FaqStore`` holds the FAQ data and its search index as one immutable
+snapshot. ``FaqReloader`` watches the FAQ file from a background thread
+and, when it changes, builds the next snapshot from the current one by
+re-indexing only the entries that were added, edited or removed. The new
+snapshot is published with a single reference assignment, so a lookup
+always sees a data/index pair that belongs together and never waits on a
+reload.
+
+FAQ files come in two layouts; ``load_faq_file`` normalizes both to the
+``company_faq.json`` one (see ``normalize_faq_data``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from faq_cache import FaqResultCache
+from faq_search import SearchIndex, faq_key
+
+logger = logging.getLogger("agent")
+
+
+def normalize_faq_data(data: dict) -> dict:
+    """``data`` in the ``company_faq.json`` layout.
+
+    ``razorpay_faq.json`` keeps the company details under ``company_info``
+    and the entries under ``faq``; those are moved to the top level and to
+    ``faqs``. Data that already has ``faqs`` is returned unchanged.
+    """
+    if "faqs" in data:
+        return data
+    info = dict(data.get("company_info", {}))
+    if "name" in info:
+        info["company_name"] = info.pop("name")
+    rest = {k: v for k, v in data.items() if k not in ("company_info", "faq")}
+    return {**info, **rest, "faqs": data.get("faq", [])}
+
+
+def load_faq_file(path: Path) -> dict:
+    """Parse the FAQ file at ``path`` into the normalized layout."""
+    with open(path) as f:
+        return normalize_faq_data(json.load(f))
+
+
+class FaqSnapshot(NamedTuple):
+    data: dict
+    index: SearchIndex
+    # Bumped on every reload so caches derived from older data can tell
+    version: int = 0
+
+
+class FaqStore:
+    """Current FAQ snapshot plus the response cache derived from it.
+
+    The cache is only touched from the event loop: ``replace`` just bumps
+    the snapshot version and lookups drop stale cache entries when they
+    first see the new one.
+    """
+
+    def __init__(
+        self,
+        data: dict,
+        index: SearchIndex,
+        cache: FaqResultCache | None = None,
+    ) -> None:
+        self._snapshot = FaqSnapshot(data, index)
+        self.cache = cache if cache is not None else FaqResultCache()
+
+    @property
+    def snapshot(self) -> FaqSnapshot:
+        return self._snapshot
+
+    def replace(self, data: dict, index: SearchIndex) -> None:
+        self._snapshot = FaqSnapshot(data, index, self._snapshot.version + 1)
+
+
+def diff_faqs(old: list[dict], new: list[dict]) -> tuple[list[dict], list[dict]]:
+    """Return the ``(added, removed)`` entries between two FAQ lists.
+
+    An edited entry shows up as its old version removed and its new version
+    added; reordering the file is not a change.
+    """
+    old_counts = Counter(faq_key(faq) for faq in old)
+    new_counts = Counter(faq_key(faq) for faq in new)
+    return _take(new, new_counts - old_counts), _take(old, old_counts - new_counts)
+
+
+def _take(faqs: list[dict], counts: Counter) -> list[dict]:
+    taken = []
+    for faq in faqs:
+        key = faq_key(faq)
+        if counts[key] > 0:
+            counts[key] -= 1
+            taken.append(faq)
+    return taken
+
+
+class FaqReloader:
+    """Polls the FAQ file and applies changes to a ``FaqStore``.
+
+    The file's mtime and size are checked every ``interval`` seconds; the
+    file is only parsed when they change. A file that fails to parse (for
+    example while an editor is still writing it) is retried on the next
+    poll and the current snapshot stays in place.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        store: FaqStore,
+        userdata: dict[str, Any] | None = None,
+        interval: float = 2.0,
+    ) -> None:
+        self.path = path
+        self.store = store
+        self.userdata = userdata
+        self.interval = interval
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> bool:
+        """Reload the file if it changed since the last check.
+
+        Returns True when a new snapshot was published.
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+
+        try:
+            data = load_faq_file(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not reload {self.path}, keeping current FAQ: {e}")
+            return False
+        self._signature = signature
+
+        current = self.store.snapshot
+        added, removed = diff_faqs(current.data.get("faqs", []), data.get("faqs", []))
+        index = current.index
+        if added or removed:
+            index = index.with_changes(added, removed)
+        self.store.replace(data, index)
+        if self.userdata is not None:
+            self.userdata["faq_data"] = data
+
+        logger.info(
+            f"FAQ reloaded from {self.path}: {len(added)} added, {len(removed)} removed"
+        )
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("FAQ reload failed")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="faq-reloader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
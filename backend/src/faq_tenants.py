@@ -0,0 +1,258 @@
+"""FAQ knowledge per tenant, for workers that serve several brands.
+
+Each tenant (brand) has its own FAQ file. Which one a call uses comes from
+the ``tenant`` key of the job's dispatch metadata, or of the room's
+metadata, both JSON; calls without one, or naming a tenant the worker
+doesn't know, get the default tenant (``company_faq.json``).
+
+A LiveKit job process runs one call and exits, so nothing a process loads
+for one call is there for the next. What makes a tenant fast is therefore
+loading it before the call:
+
+- ``prewarm`` runs while the process is idle in the pool and loads the
+  default tenant plus the ones listed in ``FAQ_HOT_TENANTS``
+  (``FaqTenantRegistry.preload``).
+- any other tenant is loaded when its call starts, from its compiled
+  artifact when there is a fresh one. The artifact is memory-mapped, so its
+  pages are shared by every process on the host and stay in the page cache
+  between calls. Otherwise the tenant is parsed and indexed from its JSON
+  file, which is the slow path a hot or compiled tenant avoids.
+
+Preloading stops at the memory budget (``FAQ_TENANT_CACHE_MB``), and a
+tenant loaded past it evicts the least recently used ones. A session
+already using an evicted store keeps its own reference, so eviction never
+pulls the knowledge out from under a session.
+
+Tenants are the FAQ files in ``FAQ_TENANTS_DIR``, named after the file:
+``acme_faq.json`` (or ``acme.json``) serves tenant "acme", and
+``acme_faq.faqkb`` next to it is its compiled artifact.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+
+from faq_artifact import load_artifact
+from faq_fuzzy import FuzzyFaqIndex, load_aliases
+from faq_search import build_faq_index
+from faq_store import FaqReloader, FaqStore, load_faq_file
+
+logger = logging.getLogger("agent")
+
+DEFAULT_TENANT = "default"
+
+# Parsed JSON plus its keyword index measured at about 7x the size of the
+# source file; semantic vectors are counted separately, from their arrays
+INDEX_BYTES_PER_SOURCE_BYTE = 8
+
+
+def tenant_from_metadata(*metadata: str | None) -> str | None:
+    """The ``tenant`` named by the first of the JSON ``metadata`` strings
+    that names one."""
+    for raw in metadata:
+        if not raw:
+            continue
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(value, dict) and value.get("tenant"):
+            return str(value["tenant"])
+    return None
+
+
+def discover_tenants(directory: Path) -> dict[str, Path]:
+    """The FAQ files in ``directory``, by tenant name."""
+    return {
+        path.stem.removesuffix("_faq"): path
+        for path in sorted(directory.glob("*.json"))
+    }
+
+
+@dataclass
+class _Tenant:
+    store: FaqStore
+    size: int
+    reloader: FaqReloader | None = None
+
+
+class FaqTenantRegistry:
+    """Loads tenants' FAQ stores up front or on demand, within a budget.
+
+    ``get`` may block on loading a tenant, so call it from a thread when on
+    the event loop. It is safe to call from several threads at once: a
+    tenant is loaded once, by the first caller, and other tenants are
+    served meanwhile.
+    """
+
+    def __init__(
+        self,
+        sources: dict[str, Path],
+        default: str = DEFAULT_TENANT,
+        max_bytes: int = 512 * 1024 * 1024,
+        search_mode: str = "keyword",
+        min_confidence: float | None = None,
+        reload_interval: float | None = None,
+        fuzzy: bool = False,
+        aliases: dict[str, str] | None = None,
+        hot: list[str] | None = None,
+    ) -> None:
+        if default not in sources:
+            raise ValueError(f"No FAQ file for the default tenant {default!r}")
+        self.sources = sources
+        self.default = default
+        self.max_bytes = max_bytes
+        self.search_mode = search_mode
+        self.min_confidence = min_confidence
+        # Hot reload (FAQ_HOT_RELOAD) watches the files of resident tenants
+        self.reload_interval = reload_interval
+        # Query repair (FAQ_FUZZY) for words the STT misheard
+        self.fuzzy = fuzzy
+        self.aliases = aliases
+        # Tenants preloaded next to the default one (FAQ_HOT_TENANTS)
+        self.hot = [name for name in hot or () if name in sources]
+        self.loads = 0
+        self.evictions = 0
+        self._tenants: OrderedDict[str, _Tenant] = OrderedDict()
+        self._loading: dict[str, Future[FaqStore]] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant in self._tenants
+
+    def resident_bytes(self) -> int:
+        return sum(tenant.size for tenant in self._tenants.values())
+
+    def resolve(self, tenant: str | None) -> str:
+        """``tenant`` if it has an FAQ file, otherwise the default tenant."""
+        if tenant is None:
+            return self.default
+        if tenant not in self.sources:
+            logger.warning(f"Unknown FAQ tenant {tenant!r}, using {self.default!r}")
+            return self.default
+        return tenant
+
+    def preload(self) -> None:
+        """Load the default and hot tenants, while they fit the budget."""
+        for name in [self.default, *self.hot]:
+            if name != self.default and self.resident_bytes() >= self.max_bytes:
+                logger.warning(
+                    f"FAQ tenant {name!r} not preloaded: over FAQ_TENANT_CACHE_MB"
+                )
+                continue
+            self.get(name)
+
+    def get(self, tenant: str | None = None) -> FaqStore:
+        """The FAQ store of ``tenant`` (resolved with ``resolve``)."""
+        name = self.resolve(tenant)
+        with self._lock:
+            loaded = self._tenants.get(name)
+            if loaded is not None:
+                self._tenants.move_to_end(name)
+                return loaded.store
+            pending = self._loading.get(name)
+            if pending is None:
+                pending = self._loading[name] = Future()
+                loading = True
+            else:
+                loading = False
+        if not loading:
+            return pending.result()
+
+        # Loaded outside the lock, so other tenants aren't held up
+        try:
+            loaded = self._load(name)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[name]
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[name]
+            self._tenants[name] = loaded
+            self._evict()
+        pending.set_result(loaded.store)
+        return loaded.store
+
+    def _load(self, name: str) -> _Tenant:
+        path = self.sources[name]
+        artifact = load_artifact(path.with_suffix(".faqkb"), source=path)
+        if artifact is not None and (
+            self.search_mode != "semantic" or "vectors" in artifact.sections
+        ):
+            # Mapped from the page cache, and shared with the other processes
+            data = artifact.faq_data()
+            index = artifact.build_index(self.search_mode, self.min_confidence)
+            size = os.path.getsize(path.with_suffix(".faqkb"))
+        else:
+            data = load_faq_file(path)
+            index = build_faq_index(
+                data.get("faqs", []),
+                mode=self.search_mode,
+                min_confidence=self.min_confidence,
+            )
+            size = os.path.getsize(path) * INDEX_BYTES_PER_SOURCE_BYTE
+            matrix = getattr(index, "matrix", None)
+            if matrix is not None:
+                size += matrix.nbytes
+        if self.fuzzy:
+            index = FuzzyFaqIndex(index, data.get("faqs", []), self.aliases)
+
+        store = FaqStore(data, index)
+        reloader = None
+        if self.reload_interval is not None:
+            reloader = FaqReloader(path, store, interval=self.reload_interval)
+            reloader.start()
+        self.loads += 1
+        logger.info(
+            f"FAQ tenant {name!r} loaded from {path} ({len(index)} entries indexed, "
+            f"~{size / 1024 / 1024:.1f} MB)"
+        )
+        return _Tenant(store, size, reloader)
+
+    def _evict(self) -> None:
+        # The tenant just loaded stays even if it alone is over the budget
+        while len(self._tenants) > 1 and self.resident_bytes() > self.max_bytes:
+            name, tenant = self._tenants.popitem(last=False)
+            if tenant.reloader is not None:
+                tenant.reloader.stop()
+            self.evictions += 1
+            logger.info(f"FAQ tenant {name!r} evicted")
+
+
+def registry_from_env(default_source: Path) -> FaqTenantRegistry:
+    """The registry configured by ``FAQ_TENANTS_DIR``, ``FAQ_HOT_TENANTS``,
+    ``FAQ_TENANT_CACHE_MB`` and the ``FAQ_*`` search, query repair and reload
+    variables.
+
+    ``default_source`` is the FAQ file of the default tenant.
+    """
+    tenants_dir = os.getenv("FAQ_TENANTS_DIR")
+    sources = discover_tenants(Path(tenants_dir)) if tenants_dir else {}
+    sources[DEFAULT_TENANT] = default_source
+    min_confidence = os.getenv("FAQ_MIN_CONFIDENCE")
+    return FaqTenantRegistry(
+        sources,
+        max_bytes=int(float(os.getenv("FAQ_TENANT_CACHE_MB") or 512) * 1024 * 1024),
+        search_mode=os.getenv("FAQ_SEARCH_MODE", "keyword"),
+        min_confidence=float(min_confidence) if min_confidence else None,
+        reload_interval=(
+            float(os.getenv("FAQ_RELOAD_INTERVAL", "2"))
+            if os.getenv("FAQ_HOT_RELOAD") == "1"
+            else None
+        ),
+        fuzzy=os.getenv("FAQ_FUZZY", "1") == "1",
+        aliases=load_aliases(os.getenv("FAQ_ALIASES") or None),
+        hot=[
+            name.strip()
+            for name in os.getenv("FAQ_HOT_TENANTS", "").split(",")
+            if name.strip()
+        ],
+    )
@@ -0,0 +1,210 @@
+"""Offline semantic-ish FAQ retrieval with hashed character n-grams.
+
+Every FAQ entry is turned into a TF-IDF vector over character n-grams,
+hashed into a fixed number of buckets so no vocabulary has to be stored.
+Character n-grams are robust to inflections, compound words and small
+transcription errors ("integrate" / "integration", "razor pay"), and the
+whole thing runs locally without an embedding service.
+
+Questions and answers are vectorised separately (a short query is much
+closer to a short question than to a paragraph-long answer), L2-normalised
+and stacked into one matrix when the index is built in ``prewarm``. Scoring
+a query is then a single matrix-vector product. Cosine similarity alone
+punishes a short query against a long answer ("upi" against the payment
+methods paragraph scores 0.1, as low as an off-topic question), so each
+row's cosine is combined with how much of the query's n-gram weight the row
+contains, as their geometric mean. An entry's score is the better of its
+question and answer scores, in [0, 1].
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+import zlib
+from collections import Counter
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from faq_search import STOPWORDS, FaqHit, faq_key
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    words = [word for word in _WORD_RE.findall(text.lower()) if word not in STOPWORDS]
+    return " " + " ".join(words) + " "
+
+
+class HashedNgramVectorizer:
+    """Maps text to sparse bags of hashed character n-grams.
+
+    ``zlib.crc32`` is used instead of ``hash()`` because the built-in string
+    hash is salted per process, and vectors must be comparable across the
+    job processes that share a worker.
+    """
+
+    def __init__(self, dim: int = 2048, ngram_range: tuple[int, int] = (3, 5)) -> None:
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def bucket_counts(self, text: str) -> dict[int, int]:
+        text = _normalize(text)
+        counts: dict[int, int] = {}
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(text) - n + 1):
+                gram = text[i : i + n]
+                if gram.count(" ") > 1:
+                    continue
+                bucket = zlib.crc32(gram.encode()) % self.dim
+                counts[bucket] = counts.get(bucket, 0) + 1
+        return counts
+
+    def transform(self, text: str, idf: np.ndarray) -> np.ndarray:
+        """Return the L2-normalised, IDF-weighted vector for ``text``."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for bucket, count in self.bucket_counts(text).items():
+            # Sublinear TF so a repeated phrase doesn't dominate the vector
+            vector[bucket] = 1.0 + np.log(count)
+        vector *= idf
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticFaqIndex:
+    """Cosine-similarity retrieval over a precomputed FAQ vector matrix.
+
+    ``FaqHit.confidence`` is the entry's score; hits below ``min_confidence``
+    are dropped so callers can fall back to a generic answer instead of
+    reading out something unrelated. The default threshold is tuned on the
+    bundled FAQ: every word of its vocabulary finds an entry above it (the
+    lowest score is 0.3), while off-topic questions stay at 0.23 or below.
+    """
+
+    def __init__(
+        self,
+        faqs: Iterable[dict],
+        dim: int = 2048,
+        min_confidence: float = 0.25,
+    ) -> None:
+        self.vectorizer = HashedNgramVectorizer(dim=dim)
+        self.min_confidence = min_confidence
+        self._faqs = list(faqs)
+
+        texts = [faq.get("question", "") for faq in self._faqs]
+        texts += [faq.get("answer", "") for faq in self._faqs]
+        counts = [self.vectorizer.bucket_counts(text) for text in texts]
+
+        # Smoothed IDF over buckets, computed from the whole corpus. The floor
+        # is small so n-grams found in nearly every entry (the brand name)
+        # barely count, and can't rank "What does Razorpay do?" above pricing
+        # for "razorpay pricing"
+        df = np.zeros(dim, dtype=np.float32)
+        for entry in counts:
+            df[list(entry)] += 1
+        self.idf = (np.log((1 + len(counts)) / (1 + df)) + 0.1).astype(np.float32)
+
+        # Rows [0, n) are questions and rows [n, 2n) the matching answers
+        self.matrix = np.zeros((len(counts), dim), dtype=np.float32)
+        for row, entry in enumerate(counts):
+            if entry:
+                self.matrix[row, list(entry)] = 1.0 + np.log(list(entry.values()))
+        self.matrix *= self.idf
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        np.divide(self.matrix, norms, out=self.matrix, where=norms > 0)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        faqs: Sequence[dict],
+        matrix: np.ndarray,
+        idf: np.ndarray,
+        min_confidence: float = 0.25,
+    ) -> SemanticFaqIndex:
+        """Wrap precomputed vectors, e.g. memory-mapped from a compiled artifact."""
+        index = cls.__new__(cls)
+        index.vectorizer = HashedNgramVectorizer(dim=len(idf))
+        index.min_confidence = min_confidence
+        index._faqs = faqs
+        index.idf = idf
+        index.matrix = matrix
+        return index
+
+    def __len__(self) -> int:
+        return len(self._faqs)
+
+    def with_changes(
+        self, added: Iterable[dict], removed: Iterable[dict]
+    ) -> SemanticFaqIndex:
+        """Return a copy of the index with ``removed`` entries dropped and
+        ``added`` entries vectorised.
+
+        Rows of unchanged entries are reused and only new entries are
+        vectorised, against the IDF of the last full build. When more than a
+        quarter of the corpus changes the index is rebuilt from scratch so the
+        IDF stays representative.
+        """
+        added = list(added)
+        pending = Counter(faq_key(faq) for faq in removed)
+        keep = []
+        for row, faq in enumerate(self._faqs):
+            key = faq_key(faq)
+            if pending[key] > 0:
+                pending[key] -= 1
+                continue
+            keep.append(row)
+
+        faqs = [self._faqs[row] for row in keep] + added
+        changed = len(added) + len(self._faqs) - len(keep)
+        if changed * 4 > len(self._faqs):
+            return SemanticFaqIndex(
+                faqs, dim=self.vectorizer.dim, min_confidence=self.min_confidence
+            )
+
+        n = len(self._faqs)
+        rows = np.array(keep, dtype=np.intp)
+        index = copy.copy(self)
+        index._faqs = faqs
+        index.matrix = np.vstack(
+            [
+                self.matrix[rows],
+                self._vectors(faq.get("question", "") for faq in added),
+                self.matrix[n + rows],
+                self._vectors(faq.get("answer", "") for faq in added),
+            ]
+        )
+        return index
+
+    def _vectors(self, texts: Iterable[str]) -> np.ndarray:
+        vectors = [self.vectorizer.transform(text, self.idf) for text in texts]
+        if not vectors:
+            return np.zeros((0, self.vectorizer.dim), dtype=np.float32)
+        return np.stack(vectors)
+
+    def search(self, query: str, limit: int = 2) -> list[FaqHit]:
+        """Return up to ``limit`` entries above ``min_confidence``, best first."""
+        n = len(self._faqs)
+        if not n or limit <= 0:
+            return []
+        vector = self.vectorizer.transform(query, self.idf)
+        buckets = np.flatnonzero(vector)
+        if not buckets.size:
+            return []
+        similarities = np.maximum(self.matrix @ vector, 0.0)
+        weights = vector[buckets]
+        contained = (self.matrix[:, buckets] > 0) @ weights / weights.sum()
+        row_scores = np.sqrt(similarities * contained)
+        scores = np.maximum(row_scores[:n], row_scores[n:])
+
+        limit = min(limit, n)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [
+            FaqHit(self._faqs[row], float(scores[row]), float(scores[row]))
+            for row in top
+            if scores[row] >= self.min_confidence
+        ]
@@ -0,0 +1,173 @@
+"""Write-ahead checkpointing of in-progress lead data.
+
+``Assistant.lead_data`` only reaches the lead store when ``generate_summary``
+runs, so a caller who hangs up without saying goodbye, or a job process that
+dies mid-call, would lose every field captured so far. Each session instead
+appends its field updates to a small JSON-lines log::
+
+    {"lead_id": "...", "room": "...", "started": "..."}   # header
+    {"field": "name", "value": "Priya", "at": "..."}
+    {"field": "email", "value": "priya@acme.com", "at": "..."}
+
+Updates are buffered and appended together after a short delay, so a burst
+of ``save_lead_info`` calls costs one write. At shutdown the log is replayed
+into a lead record, saved to the store under the session's ``lead_id`` and
+deleted. Logs left behind by a process that died are recovered the same
+way by ``recover_checkpoints``.
+
+The log stays locked (``flock``) while its session is alive, which is how
+recovery tells abandoned logs from ones still in use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any
+
+from lead_store import Lead, LeadStore
+
+logger = logging.getLogger("agent")
+
+
+class LeadCheckpoint:
+    """Per-session write-ahead log of ``lead_data`` updates."""
+
+    def __init__(
+        self,
+        path: Path,
+        lead_id: str,
+        room: str | None = None,
+        delay: float = 0.5,
+        fsync: bool = False,
+    ) -> None:
+        self.path = path
+        self.lead_id = lead_id
+        self.delay = delay
+        self.fsync = fsync
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Lock the log before it gets its ``.wal`` name, so recovery never
+        # mistakes a brand-new log for an abandoned one
+        tmp = path.with_name(path.name + ".tmp")
+        # Held open, and locked, until the session closes the log
+        self._file: IO[str] | None = open(tmp, "a")  # noqa: SIM115
+        fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        tmp.replace(path)
+        self._pending = [
+            _line(lead_id=lead_id, room=room, started=datetime.now().isoformat())
+        ]
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
+    def record(self, field: str, value: Any) -> None:
+        """Log an update to ``field``; it is written after ``delay`` seconds
+        together with any other updates made in the meantime."""
+        self._pending.append(
+            _line(field=field, value=value, at=datetime.now().isoformat())
+        )
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(
+                self._flush_later(), name="lead-checkpoint"
+            )
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write every buffered update to the log now."""
+        async with self._flush_lock:
+            if not self._pending or self._file is None:
+                return
+            lines, self._pending = self._pending, []
+            await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: list[str]) -> None:
+        self._file.writelines(lines)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    async def aclose(self, store: LeadStore) -> Lead | None:
+        """Flush the log, compact it into a lead record saved to ``store``
+        and delete it. Returns the saved record, if anything was captured."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+        await self.flush()
+        if self._file is None:
+            return None
+        try:
+            return await asyncio.to_thread(compact_checkpoint, self.path, store)
+        finally:
+            # Closing the file releases the lock
+            self._file.close()
+            self._file = None
+
+
+def _line(**record: Any) -> str:
+    return json.dumps(record) + "\n"
+
+
+def replay_checkpoint(path: Path) -> Lead | None:
+    """Rebuild the lead record logged at ``path``, or None if no field was
+    captured. A torn last line from a crash is ignored."""
+    lead: Lead = {}
+    lead_id = path.stem
+    last_update = None
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "field" in entry:
+                lead[entry["field"]] = entry["value"]
+                last_update = entry["at"]
+            elif "lead_id" in entry:
+                lead_id = entry["lead_id"]
+    if last_update is None:
+        return None
+    lead.setdefault("conversation_notes", [])
+    lead.setdefault("timestamp", last_update)
+    lead["lead_id"] = lead_id
+    return lead
+
+
+def compact_checkpoint(path: Path, store: LeadStore) -> Lead | None:
+    """Save the lead logged at ``path`` to ``store`` and delete the log."""
+    lead = replay_checkpoint(path)
+    if lead is not None:
+        store.save([lead])
+        logger.info(f"Lead {lead['lead_id']} saved from checkpoint {path.name}")
+    path.unlink(missing_ok=True)
+    return lead
+
+
+def recover_checkpoints(checkpoint_dir: Path, store: LeadStore) -> int:
+    """Compact logs abandoned by dead sessions; returns how many were found.
+
+    Logs still locked by a running session are left alone.
+    """
+    recovered = 0
+    for path in sorted(checkpoint_dir.glob("*.wal")):
+        try:
+            with open(path) as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                compact_checkpoint(path, store)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not recover lead checkpoint {path}: {e}")
+            continue
+        recovered += 1
+    return recovered
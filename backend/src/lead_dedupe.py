@@ -0,0 +1,245 @@
+"""Cross-session lead deduplication.
+
+A repeat caller used to produce a new, mostly empty lead every call.
+``DedupingLeadStore`` wraps the lead store and files each session under one
+canonical lead per person, found through ``LeadIndex``: an in-memory map
+from identity keys (normalized email; normalized name plus company) to lead
+ids, so matching a session is a dict lookup rather than a query.
+
+A merged lead keeps every contributing session under ``sessions`` and its
+top-level fields are recomputed from them oldest first: later non-null
+values win and notes accumulate. Saving the same session again (the
+summary, then the shutdown checkpoint) replaces that session instead of
+merging it twice. Once filed, a session stays with its lead.
+
+The index is an append-only JSON-lines file next to the store. Every save
+first reads whatever other job processes appended since the last one.
+
+An existing ``leads/`` directory can be deduplicated into a store in one
+streaming pass::
+
+    uv run src/lead_dedupe.py leads/ leads/leads.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import re
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from pathlib import Path
+
+from lead_store import (
+    Lead,
+    LeadStore,
+    SqliteLeadStore,
+    iter_lead_files,
+    normalize_email,
+)
+
+logger = logging.getLogger("agent")
+
+_COMPANY_SUFFIXES = {
+    "co",
+    "company",
+    "corp",
+    "corporation",
+    "inc",
+    "limited",
+    "llc",
+    "llp",
+    "ltd",
+    "private",
+    "pvt",
+}
+
+
+def _words(text: str | None) -> list[str]:
+    return re.findall(r"[a-z0-9]+", (text or "").casefold())
+
+
+def identity_keys(lead: Lead) -> list[str]:
+    """Keys under which ``lead`` can be recognised in a later session."""
+    keys = []
+    email = normalize_email(lead.get("email"))
+    if email:
+        keys.append(f"email:{email}")
+    name = " ".join(_words(lead.get("name")))
+    company = " ".join(
+        word for word in _words(lead.get("company")) if word not in _COMPANY_SUFFIXES
+    )
+    if name and company:
+        keys.append(f"name:{name}|{company}")
+    return keys
+
+
+def merge_session(existing: Lead | None, session: Lead, lead_id: str) -> Lead:
+    """Fold ``session`` into the canonical lead ``existing`` (if any)."""
+    sessions: dict[str, Lead] = {}
+    if existing is not None:
+        for previous in existing.get("sessions", [existing]):
+            sessions[previous["lead_id"]] = previous
+    session = {k: v for k, v in session.items() if k != "sessions"}
+    sessions[session["lead_id"]] = session
+
+    ordered = sorted(sessions.values(), key=lambda s: s.get("timestamp") or "")
+    lead: Lead = {}
+    for s in ordered:
+        for field, value in s.items():
+            if value is not None or field not in lead:
+                lead[field] = value
+    lead["conversation_notes"] = [
+        note for s in ordered for note in s.get("conversation_notes") or []
+    ]
+    lead["lead_id"] = lead_id
+    if len(ordered) > 1:
+        lead["sessions"] = ordered
+    return lead
+
+
+class LeadIndex:
+    """Identity keys and session ids mapped to canonical lead ids."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._ids: dict[str, str] = {}
+        self._offset = 0
+        self._unsaved: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def refresh(self) -> None:
+        """Read entries appended to the index file since the last refresh."""
+        if self.path is None or not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being appended by another process
+                self._offset += len(line)
+                entry = json.loads(line)
+                self._ids.setdefault(entry["key"], entry["lead_id"])
+
+    def resolve(self, lead: Lead) -> str | None:
+        """The canonical lead ``lead`` belongs to, if it is already known."""
+        for key in [f"id:{lead['lead_id']}", *identity_keys(lead)]:
+            if key in self._ids:
+                return self._ids[key]
+        return None
+
+    def add(self, lead_id: str, keys: Iterable[str]) -> None:
+        """Map unclaimed ``keys`` to ``lead_id``; keys keep their first lead."""
+        for key in keys:
+            if key not in self._ids:
+                self._ids[key] = lead_id
+                self._unsaved.append(json.dumps({"key": key, "lead_id": lead_id}))
+
+    def flush(self) -> None:
+        """Append new entries to the index file in a single write."""
+        if self.path is None or not self._unsaved:
+            self._unsaved.clear()
+            return
+        data = "".join(line + "\n" for line in self._unsaved).encode()
+        self._unsaved.clear()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The next refresh reads these back (a no-op, they are already in
+        # memory) along with anything other processes appended before them
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+
+def index_path_for(store_path: Path) -> Path:
+    """Where the index of the store at ``store_path`` lives."""
+    if store_path.suffix:
+        return store_path.with_suffix(".index.jsonl")
+    return store_path / "index.jsonl"
+
+
+class DedupingLeadStore:
+    """A ``LeadStore`` that merges sessions of the same person into one lead."""
+
+    def __init__(self, store: LeadStore, index: LeadIndex) -> None:
+        self.store = store
+        self.index = index
+        self._lock = threading.Lock()
+
+    def save(self, leads: Sequence[Lead]) -> None:
+        with self._lock:
+            self.index.refresh()
+            merged: dict[str, Lead] = {}
+            for session in leads:
+                lead_id = self.index.resolve(session) or session["lead_id"]
+                existing = merged.get(lead_id) or self.store.get(lead_id)
+                lead = merge_session(existing, session, lead_id)
+                merged[lead_id] = lead
+                if lead_id != session["lead_id"]:
+                    logger.info(f"Lead {session['lead_id']} merged into {lead_id}")
+                self.index.add(
+                    lead_id, [f"id:{session['lead_id']}", *identity_keys(lead)]
+                )
+            self.store.save(list(merged.values()))
+            self.index.flush()
+
+    def get(self, lead_id: str) -> Lead | None:
+        with self._lock:
+            self.index.refresh()
+            lead_id = self.index.resolve({"lead_id": lead_id}) or lead_id
+        return self.store.get(lead_id)
+
+    def by_email(self, email: str) -> list[Lead]:
+        return self.store.by_email(email)
+
+    def by_company(self, company: str) -> list[Lead]:
+        return self.store.by_company(company)
+
+    def between(self, start: datetime | None, end: datetime | None) -> list[Lead]:
+        return self.store.between(start, end)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def _batched(leads: Iterable[Lead], size: int) -> Iterator[list[Lead]]:
+    iterator = iter(leads)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Deduplicate a directory of lead files into a SQLite store"
+    )
+    parser.add_argument("leads_dir", type=Path)
+    parser.add_argument("database", type=Path)
+    parser.add_argument(
+        "--index", type=Path, help="defaults to the database path with .index.jsonl"
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    index = LeadIndex(args.index or index_path_for(args.database))
+    store = DedupingLeadStore(SqliteLeadStore(args.database), index)
+    sessions = 0
+    lead_ids = set()
+    try:
+        # Files are read lazily and committed a batch at a time, so memory
+        # stays bounded by the index rather than the number of files
+        for batch in _batched(iter_lead_files(args.leads_dir), args.batch_size):
+            store.save(batch)
+            sessions += len(batch)
+            lead_ids.update(index.resolve(session) for session in batch)
+    finally:
+        store.close()
+    print(
+        f"Filed {sessions} session(s) from {args.leads_dir} as {len(lead_ids)} lead(s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
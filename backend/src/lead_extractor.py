@@ -0,0 +1,131 @@
+"""Lead fields read straight off the caller's transcripts.
+
+Some lead details have a shape a pattern can recognize: an email address,
+a team size ("about 40 people"), a timeline ("next quarter"). Capturing them
+used to depend on the LLM deciding to call a lead tool on that turn.
+``LeadExtractor`` runs precompiled patterns over each final user transcript
+and ``Assistant.note_transcript`` fills the fields they find, so they are
+captured even when the model forgets the tool, and the compacted context
+tells the model they are already known.
+
+Every extraction carries a confidence, and those under ``min_confidence``
+are dropped. An email the STT spelled out ("priya at acme dot com") only
+counts right after "my email is" or, once the caller has mentioned their
+email, "it's"; a head count only counts as their team size when it is about
+their team or company ("we're 40 people", not "2 people on the call"); and
+a timeline phrase only counts as the caller's buying timeline when it comes
+with a word like "start" or "launch". A value the LLM saved with a tool is
+treated as confirmed and is never overwritten by an extraction, and the
+extracted ones are listed to the model as unconfirmed, so it still checks
+them with the caller.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+
+EMAIL = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+# "my email is priya dot sharma at acme dot co dot in", as an STT writes a
+# spoken address. The address has to follow the words that introduce it, so
+# "I used to work at google dot com" is not read as an email
+SPOKEN_EMAIL = re.compile(
+    r"\b((?:e-?mail|mail id)(?:\s+(?:address|id))?(?:\s+is|['\u2019]s)"
+    r"|it(?:['\u2019]s|\s+is)|that(?:['\u2019]s|\s+is))\s+"
+    r"([a-z0-9]+(?:\s+(?:dot|underscore|dash)\s+[a-z0-9]+)*)\s+at\s+"
+    r"([a-z0-9-]+(?:\s+dot\s+[a-z0-9-]+)+)\b",
+    re.IGNORECASE,
+)
+EMAIL_MENTION = re.compile(r"\b(?:e-?mail|mail id|address)\b", re.IGNORECASE)
+_SIZE_QUALIFIER = (
+    r"(?:(?:about|around|roughly|nearly|almost|over|under|maybe|like)\s+)?"
+)
+_HEADCOUNT = (
+    rf"{_SIZE_QUALIFIER}\d[\d,]*\+?\s*"
+    r"(?:people|employees|engineers|developers|devs|staff|members|folks)"
+)
+# A head count only counts when it is the caller's team or company: "we're
+# about 40 people", "a team of 12", "a 40-person startup". The value is the
+# size itself (group 1, 2 or 3)
+TEAM_SIZE = re.compile(
+    r"\b(?:we(?:['\u2019]re|\s+are|['\u2019]ve\s+got|\s+have|\s+employ)"
+    r"|our\s+(?:team|company)\s+(?:is|has))\s+(?:a\s+|only\s+|just\s+)?"
+    rf"({_HEADCOUNT})\b"
+    r"(?!\s+(?:on|in|joining)\s+(?:the|this)\s+(?:call|meeting))"
+    r"|\b((?:team|company|staff|headcount)\s+of\s+"
+    rf"{_SIZE_QUALIFIER}\d[\d,]*\+?)\b"
+    r"|\b(\d[\d,]*[\s-]*person\s+(?:team|company|startup|org))\b",
+    re.IGNORECASE,
+)
+TIMELINE = re.compile(
+    r"\b(?:(?:next|this|the coming)\s+(?:week|month|quarter|year)"
+    r"|in\s+(?:\d+|a|one|two|three|four|six|a few|a couple of)\s+"
+    r"(?:days?|weeks?|months?)"
+    r"|(?:by|before|in)\s+(?:q[1-4]|the\s+(?:first|second|third|fourth)\s+quarter)"
+    r"|(?:by|before)\s+(?:january|february|march|april|may|june|july|august|"
+    r"september|october|november|december)"
+    r"|(?:by\s+)?(?:the\s+)?end\s+of\s+(?:the\s+)?(?:week|month|quarter|year)"
+    r"|asap|as soon as possible|right away|immediately)\b",
+    re.IGNORECASE,
+)
+# A timeline phrase is about the purchase when the caller talks about starting
+TIMELINE_INTENT = re.compile(
+    r"\b(?:start|begin|launch|go live|roll out|rollout|implement|integrate|"
+    r"switch|migrate|move|onboard|get going|get started|sign up|buy|purchase|"
+    r"plan|planning|looking to|want to|hoping to|need (?:it|this))",
+    re.IGNORECASE,
+)
+
+_SPOKEN_SEPARATORS = {"dot": ".", "underscore": "_", "dash": "-"}
+
+
+@dataclass
+class Extraction:
+    field: str
+    value: str
+    confidence: float
+
+
+def _spoken_email(match: re.Match) -> str:
+    local, domain = match.group(2), match.group(3)
+    words = re.split(r"\s+", f"{local} @ {domain}".lower())
+    return "".join(_SPOKEN_SEPARATORS.get(word, word) for word in words)
+
+
+class LeadExtractor:
+    """Finds lead fields in a transcript with precompiled patterns."""
+
+    def __init__(self, min_confidence: float = 0.8) -> None:
+        self.min_confidence = min_confidence
+
+    def extract(self, text: str) -> list[Extraction]:
+        """The lead fields in ``text`` with at least ``min_confidence``; the
+        last mention of a field wins."""
+        found: dict[str, Extraction] = {}
+        for match in EMAIL.finditer(text):
+            found["email"] = Extraction("email", match.group(0).lower(), 0.95)
+        if "email" not in found:
+            for match in SPOKEN_EMAIL.finditer(text):
+                # "it's ... at ... dot com" is only trusted as their email
+                # when they said so first ("my email? it's ...")
+                mentioned = EMAIL_MENTION.search(text, 0, match.start(2))
+                confidence = 0.85 if mentioned else 0.6
+                found["email"] = Extraction("email", _spoken_email(match), confidence)
+        for match in TEAM_SIZE.finditer(text):
+            size = next(group for group in match.groups() if group)
+            found["team_size"] = Extraction("team_size", size, 0.85)
+        for match in TIMELINE.finditer(text):
+            confidence = 0.85 if TIMELINE_INTENT.search(text) else 0.6
+            found["timeline"] = Extraction("timeline", match.group(0), confidence)
+        return [e for e in found.values() if e.confidence >= self.min_confidence]
+
+
+def extractor_from_env() -> LeadExtractor | None:
+    """The extractor configured by ``LEAD_EXTRACTION`` (on by default) and
+    ``LEAD_EXTRACT_MIN_CONFIDENCE``, or None when it is off."""
+    if os.getenv("LEAD_EXTRACTION", "1") != "1":
+        return None
+    return LeadExtractor(
+        min_confidence=float(os.getenv("LEAD_EXTRACT_MIN_CONFIDENCE") or 0.8)
+    )
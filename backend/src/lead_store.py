@@ -0,0 +1,289 @@
+"""Storage backends for lead records.
+
+Every lead record carries a ``lead_id`` (sortable, starts with the capture
+time) and an ISO ``timestamp``. Backends implement the ``LeadStore``
+protocol; ``SqliteLeadStore`` is the default and indexes leads by
+timestamp, email and company so lookups don't scan the whole history.
+``JsonDirLeadStore`` keeps the original one-file-per-lead layout.
+
+The module doubles as a CLI to import the old ``leads/*.json`` files and
+query the store::
+
+    uv run src/lead_store.py migrate leads/ leads/leads.db
+    uv run src/lead_store.py query leads/leads.db --email priya@acme.com
+    uv run src/lead_store.py query leads/leads.db --since 2025-11-01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Protocol
+
+logger = logging.getLogger("agent")
+
+Lead = dict[str, Any]
+
+
+def new_lead_id(now: datetime | None = None) -> str:
+    """Unique, time-ordered lead id, e.g. ``20251126_010020_761346_9f3a``."""
+    now = now or datetime.now()
+    return f"{now:%Y%m%d_%H%M%S_%f}_{secrets.token_hex(2)}"
+
+
+def normalize_email(email: str | None) -> str | None:
+    return email.strip().lower() if email else None
+
+
+class LeadStore(Protocol):
+    def save(self, leads: Sequence[Lead]) -> None:
+        """Insert or replace ``leads`` (keyed by ``lead_id``) as one batch."""
+
+    def get(self, lead_id: str) -> Lead | None: ...
+
+    def by_email(self, email: str) -> list[Lead]: ...
+
+    def by_company(self, company: str) -> list[Lead]: ...
+
+    def between(self, start: datetime | None, end: datetime | None) -> list[Lead]:
+        """Leads with ``start <= timestamp < end``, oldest first."""
+
+    def close(self) -> None: ...
+
+
+class SqliteLeadStore:
+    """Leads in an embedded SQLite database.
+
+    Each ``save`` is one transaction, so a batch of leads costs one commit
+    (and one fsync when ``fsync`` is enabled). The connection is shared
+    between the writer thread and readers, guarded by a lock.
+    """
+
+    def __init__(self, path: Path, fsync: bool = False) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS leads (
+                lead_id TEXT PRIMARY KEY,
+                timestamp TEXT,
+                email TEXT,
+                company TEXT,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS leads_timestamp ON leads (timestamp);
+            CREATE INDEX IF NOT EXISTS leads_email ON leads (email);
+            CREATE INDEX IF NOT EXISTS leads_company ON leads (company);
+            """
+        )
+
+    @staticmethod
+    def _row(lead: Lead) -> tuple:
+        company = lead.get("company")
+        return (
+            lead["lead_id"],
+            lead.get("timestamp"),
+            normalize_email(lead.get("email")),
+            company.strip().lower() if company else None,
+            json.dumps(lead),
+        )
+
+    def save(self, leads: Sequence[Lead]) -> None:
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO leads VALUES (?, ?, ?, ?, ?)",
+                [self._row(lead) for lead in leads],
+            )
+
+    def insert_missing(self, leads: Iterable[Lead]) -> int:
+        """Insert leads whose id isn't stored yet; returns how many were new."""
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO leads VALUES (?, ?, ?, ?, ?)",
+                (self._row(lead) for lead in leads),
+            )
+            return self._db.total_changes - before
+
+    def _select(self, where: str, params: Sequence[Any]) -> list[Lead]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT record FROM leads WHERE {where} ORDER BY timestamp", params
+            ).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def get(self, lead_id: str) -> Lead | None:
+        leads = self._select("lead_id = ?", (lead_id,))
+        return leads[0] if leads else None
+
+    def by_email(self, email: str) -> list[Lead]:
+        return self._select("email = ?", (normalize_email(email),))
+
+    def by_company(self, company: str) -> list[Lead]:
+        return self._select("company = ?", (company.strip().lower(),))
+
+    def between(self, start: datetime | None, end: datetime | None) -> list[Lead]:
+        clauses, params = ["timestamp IS NOT NULL"], []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end.isoformat())
+        return self._select(" AND ".join(clauses), params)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JsonDirLeadStore:
+    """One pretty-printed JSON file per lead, ``lead_<lead_id>.json``.
+
+    Queries scan and parse every file; use ``SqliteLeadStore`` for anything
+    beyond a handful of leads.
+    """
+
+    def __init__(self, leads_dir: Path, fsync: bool = False) -> None:
+        self.leads_dir = leads_dir
+        self.fsync = fsync
+
+    def _path(self, lead_id: str) -> Path:
+        return self.leads_dir / f"lead_{lead_id}.json"
+
+    def save(self, leads: Sequence[Lead]) -> None:
+        self.leads_dir.mkdir(parents=True, exist_ok=True)
+        for lead in leads:
+            path = self._path(lead["lead_id"])
+            with open(path, "w") as f:
+                json.dump(lead, f, indent=2)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        # One directory fsync makes the whole batch's file entries durable
+        if self.fsync:
+            dir_fd = os.open(self.leads_dir, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def __iter__(self) -> Iterator[Lead]:
+        yield from iter_lead_files(self.leads_dir)
+
+    def get(self, lead_id: str) -> Lead | None:
+        path = self._path(lead_id)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return {"lead_id": lead_id, **json.load(f)}
+
+    def by_email(self, email: str) -> list[Lead]:
+        email = normalize_email(email)
+        return [lead for lead in self if normalize_email(lead.get("email")) == email]
+
+    def by_company(self, company: str) -> list[Lead]:
+        company = company.strip().lower()
+        return [
+            lead
+            for lead in self
+            if (lead.get("company") or "").strip().lower() == company
+        ]
+
+    def between(self, start: datetime | None, end: datetime | None) -> list[Lead]:
+        leads = [lead for lead in self if _in_range(lead.get("timestamp"), start, end)]
+        return sorted(leads, key=lambda lead: lead["timestamp"])
+
+    def close(self) -> None:
+        pass
+
+
+def _in_range(
+    timestamp: str | None, start: datetime | None, end: datetime | None
+) -> bool:
+    if timestamp is None:
+        return False
+    if start is not None and timestamp < start.isoformat():
+        return False
+    return end is None or timestamp < end.isoformat()
+
+
+def iter_lead_files(leads_dir: Path) -> Iterator[Lead]:
+    """Stream the leads in a directory of ``lead_*.json`` files.
+
+    Files written before lead ids existed get the id from their name, so
+    ``lead_20251126_010020.json`` becomes ``20251126_010020``.
+    """
+    for path in sorted(leads_dir.glob("lead_*.json")):
+        try:
+            with open(path) as f:
+                lead = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable lead file {path}: {e}")
+            continue
+        lead.setdefault("lead_id", path.stem.removeprefix("lead_"))
+        yield lead
+
+
+def open_lead_store(kind: str, path: Path, fsync: bool = False) -> LeadStore:
+    """Open a ``"sqlite"`` store at the database ``path`` or a ``"json"``
+    store in the directory ``path``."""
+    if kind == "sqlite":
+        return SqliteLeadStore(path, fsync=fsync)
+    if kind == "json":
+        return JsonDirLeadStore(path, fsync=fsync)
+    raise ValueError(f"Unknown lead store: {kind!r}")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the lead store")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser(
+        "migrate", help="import leads/*.json files into a SQLite store"
+    )
+    migrate.add_argument("leads_dir", type=Path)
+    migrate.add_argument("database", type=Path)
+
+    query = commands.add_parser("query", help="print matching leads as JSON lines")
+    query.add_argument("database", type=Path)
+    query.add_argument("--email")
+    query.add_argument("--company")
+    query.add_argument("--since", type=datetime.fromisoformat)
+    query.add_argument("--until", type=datetime.fromisoformat)
+
+    args = parser.parse_args(argv)
+    store = SqliteLeadStore(args.database)
+    try:
+        if args.command == "migrate":
+            imported = store.insert_missing(iter_lead_files(args.leads_dir))
+            print(f"Imported {imported} new lead(s) from {args.leads_dir}")
+        elif args.email:
+            leads = store.by_email(args.email)
+        elif args.company:
+            leads = store.by_company(args.company)
+        else:
+            leads = store.between(args.since, args.until)
+
+        if args.command == "query":
+            for lead in leads:
+                print(json.dumps(lead))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
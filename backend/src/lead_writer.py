@@ -0,0 +1,89 @@
+"""Background persistence of lead records.
+
+Tools run on the same event loop that carries the session's audio, so they
+must not block on disk I/O. ``LeadWriter`` takes lead records from
+``generate_summary`` through a bounded queue and saves them to a
+``LeadStore`` in batches on a worker thread; the tool only waits when the
+queue is full, which pushes back on callers instead of buffering without
+limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import copy
+import logging
+from typing import Any
+
+from lead_store import LeadStore
+
+logger = logging.getLogger("agent")
+
+
+class LeadWriter:
+    """Queue lead records and save them to ``store`` off the event loop.
+
+    Records are saved in batches of up to ``batch_size``, so a burst of
+    leads shares one store transaction (and its fsync).
+    """
+
+    def __init__(
+        self,
+        store: LeadStore,
+        max_queue: int = 100,
+        batch_size: int = 32,
+    ) -> None:
+        self.store = store
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop."""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run(), name="lead-writer")
+
+    async def submit(self, record: dict[str, Any]) -> str:
+        """Queue ``record`` to be saved and return its ``lead_id``.
+
+        The record is copied, so the caller can keep mutating its own dict.
+        """
+        self.start()
+        await self._queue.put(copy.deepcopy(record))
+        return record["lead_id"]
+
+    async def flush(self) -> None:
+        """Wait until every queued record has been saved."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def aclose(self) -> None:
+        """Flush pending records, stop the writer task and close the store."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self.store.close()
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception:
+                logger.exception(f"Failed to save {len(batch)} lead record(s)")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list[dict[str, Any]]) -> None:
+        self.store.save(batch)
+        for record in batch:
+            logger.info(f"Lead {record['lead_id']} saved")
@@ -0,0 +1,328 @@
+"""Offline load test: many concurrent sessions of the real ``Assistant``.
+
+Each session is a real ``AgentSession`` wired to the stand-in plugins from
+``stub_plugins.py`` instead of Deepgram, Gemini and Murf, so nothing leaves
+the host and results are repeatable. A scripted caller speaks lines that
+exercise every tool (``lookup_faq``, ``save_lead_details``,
+``save_lead_info``, ``generate_summary``), waits for each reply to finish playing, and moves
+on. Leads are written to a throwaway lead store the way ``entrypoint``
+writes them.
+
+Every concurrency level runs in fresh worker processes, so memory figures
+aren't inflated by earlier levels::
+
+    uv run src/load_test.py --sessions 1,10,25,50
+    uv run src/load_test.py --sessions 100 --processes 4 --output results.json
+
+For each level it reports completed turns per second, turn latency (end of
+the caller's speech to the first audio of the reply) percentiles,
+event-loop lag percentiles and the peak RSS of the worker processes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from livekit.agents import AgentSession
+
+from agent import Assistant
+from faq_direct import DirectAnswerPolicy
+from faq_search import build_faq_index
+from faq_store import FaqStore
+from lead_checkpoint import LeadCheckpoint
+from lead_dedupe import DedupingLeadStore, LeadIndex, index_path_for
+from lead_store import LeadStore, SqliteLeadStore, new_lead_id
+from lead_writer import LeadWriter
+from stub_plugins import (
+    ScriptedCaller,
+    SimulatedSpeaker,
+    StubLLM,
+    StubSTT,
+    StubTTS,
+    Turn,
+)
+
+FAQ_PATH = Path(__file__).parent / "company_faq.json"
+
+
+@dataclass
+class LoadConfig:
+    stt_delay: float = 0.1
+    llm_ttft: float = 0.3
+    llm_tokens_per_second: float = 50.0
+    tts_ttfb: float = 0.2
+    speech_seconds: float = 1.0
+    """How long the caller speaks each line."""
+    endpointing_delay: float = 0.5
+    """Silence after a final transcript before the turn is considered over."""
+    pause: float = 0.5
+    """Caller's silence between the end of a reply and their next line."""
+    playback_speed: float = 1.0
+    """Values above 1 play replies back faster than real time."""
+    ramp: float = 1.0
+    """Session starts are spread evenly over this many seconds."""
+    timeout: float = 30.0
+    faq_direct: bool = False
+    """Speak confident FAQ answers without a second LLM request."""
+
+
+@dataclass
+class LevelResult:
+    sessions: int
+    turns: int = 0
+    timeouts: int = 0
+    elapsed: float = 0.0
+    turn_latencies: list[float] = field(default_factory=list)
+    loop_lag: list[float] = field(default_factory=list)
+    peak_rss_mb: float = 0.0
+
+    def merge(self, other: LevelResult) -> None:
+        self.turns += other.turns
+        self.timeouts += other.timeouts
+        self.elapsed = max(self.elapsed, other.elapsed)
+        self.turn_latencies += other.turn_latencies
+        self.loop_lag += other.loop_lag
+        self.peak_rss_mb += other.peak_rss_mb
+
+    def summary(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "turns": self.turns,
+            "timeouts": self.timeouts,
+            "turns_per_second": round(self.turns / self.elapsed, 2)
+            if self.elapsed
+            else 0.0,
+            "turn_latency_ms": _percentiles(self.turn_latencies),
+            "loop_lag_ms": _percentiles(self.loop_lag),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+        }
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def at(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1)
+
+    return {"p50": at(0.5), "p95": at(0.95), "p99": at(0.99), "max": at(1.0)}
+
+
+def conversation(i: int) -> list[Turn]:
+    """The scripted call of session ``i``; every tool is used at least once."""
+    name, company, email = f"Caller {i}", f"Company {i}", f"caller{i}@example.com"
+    return [
+        Turn("Hi there"),
+        Turn(
+            "What does Razorpay do?",
+            [("lookup_faq", {"query": "What does Razorpay do?"})],
+        ),
+        Turn(
+            f"I'm {name} from {company}",
+            [("save_lead_details", {"name": name, "company": company})],
+        ),
+        Turn(
+            f"My email is {email}",
+            [("save_lead_info", {"field": "email", "value": email})],
+        ),
+        Turn(
+            "What are the pricing details?",
+            [("lookup_faq", {"query": "What are the pricing details?"})],
+        ),
+        Turn(
+            "That's all, thanks",
+            [
+                (
+                    "generate_summary",
+                    {"conversation_summary": "Asked about the product and pricing."},
+                )
+            ],
+        ),
+    ]
+
+
+async def _run_session(
+    i: int,
+    config: LoadConfig,
+    faq_store: FaqStore,
+    lead_store: LeadStore,
+    lead_writer: LeadWriter,
+    checkpoint_dir: Path,
+    result: LevelResult,
+) -> None:
+    script = conversation(i)
+    caller = ScriptedCaller(speech_seconds=config.speech_seconds)
+    speaker = SimulatedSpeaker(speed=config.playback_speed)
+    session = AgentSession(
+        stt=StubSTT(caller, delay=config.stt_delay),
+        llm=StubLLM(
+            script,
+            ttft=config.llm_ttft,
+            tokens_per_second=config.llm_tokens_per_second,
+        ),
+        tts=StubTTS(ttfb=config.tts_ttfb),
+        turn_detection="stt",
+        min_endpointing_delay=config.endpointing_delay,
+        # The simulated speaker can't pause, so there is nothing to resume
+        resume_false_interruption=False,
+    )
+    session.input.audio = caller
+    session.output.audio = speaker
+
+    lead_id = new_lead_id()
+    checkpoint = LeadCheckpoint(
+        checkpoint_dir / f"{lead_id}.wal", lead_id, room=f"load-test-{i}"
+    )
+    await session.start(
+        Assistant(
+            faq_store=faq_store,
+            lead_writer=lead_writer,
+            lead_checkpoint=checkpoint,
+            direct_answers=DirectAnswerPolicy() if config.faq_direct else None,
+        )
+    )
+    try:
+        for turn in script:
+            await asyncio.sleep(config.pause)
+            caller.say(turn.text)
+            try:
+                started = await asyncio.wait_for(speaker.replies.get(), config.timeout)
+            except asyncio.TimeoutError:
+                result.timeouts += 1
+                break
+            result.turn_latencies.append(started - caller.speech_ended_at)
+            await speaker.wait_for_playout()
+            result.turns += 1
+    finally:
+        await session.aclose()
+        await checkpoint.aclose(lead_store)
+
+
+async def _monitor_loop_lag(samples: list[float], interval: float = 0.05) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - start - interval))
+
+
+async def run_sessions(
+    sessions: int, config: LoadConfig, first_session: int = 0
+) -> LevelResult:
+    """Run ``sessions`` concurrent scripted calls on the current event loop."""
+    result = LevelResult(sessions=sessions)
+    with open(FAQ_PATH) as f:
+        faq_data = json.load(f)
+    faq_store = FaqStore(faq_data, build_faq_index(faq_data.get("faqs", [])))
+
+    with tempfile.TemporaryDirectory(prefix="load-test-") as tmp:
+        leads_db = Path(tmp) / "leads.db"
+        lead_store = DedupingLeadStore(
+            SqliteLeadStore(leads_db), LeadIndex(index_path_for(leads_db))
+        )
+        lead_writer = LeadWriter(lead_store)
+        monitor = asyncio.create_task(_monitor_loop_lag(result.loop_lag))
+
+        async def start_session(i: int) -> None:
+            await asyncio.sleep(config.ramp * i / sessions)
+            await _run_session(
+                first_session + i,
+                config,
+                faq_store,
+                lead_store,
+                lead_writer,
+                Path(tmp) / "wal",
+                result,
+            )
+
+        start = time.perf_counter()
+        await asyncio.gather(*(start_session(i) for i in range(sessions)))
+        result.elapsed = time.perf_counter() - start
+        monitor.cancel()
+        await lead_writer.aclose()
+
+    # ru_maxrss is in kilobytes on Linux
+    result.peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def _run_in_process(
+    sessions: int, config: LoadConfig, first_session: int
+) -> LevelResult:
+    return asyncio.run(run_sessions(sessions, config, first_session))
+
+
+def run_level(sessions: int, processes: int, config: LoadConfig) -> LevelResult:
+    """Run one concurrency level, spreading sessions over fresh processes."""
+    processes = max(1, min(processes, sessions))
+    shares = [
+        sessions // processes + (p < sessions % processes) for p in range(processes)
+    ]
+    result = LevelResult(sessions=sessions)
+    with ProcessPoolExecutor(processes, mp_context=mp.get_context("spawn")) as pool:
+        futures = [
+            pool.submit(_run_in_process, share, config, sum(shares[:p]))
+            for p, share in enumerate(shares)
+        ]
+        for future in futures:
+            result.merge(future.result())
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    defaults = LoadConfig()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sessions",
+        default="1,10,25",
+        help="comma-separated concurrency levels to run, in order",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1, help="worker processes per level"
+    )
+    for name, value in asdict(defaults).items():
+        flag = f"--{name.replace('_', '-')}"
+        if isinstance(value, bool):
+            parser.add_argument(
+                flag, action=argparse.BooleanOptionalAction, default=value
+            )
+        else:
+            parser.add_argument(flag, type=float, default=value)
+    parser.add_argument("--output", type=Path, help="also write results as JSON")
+    args = parser.parse_args(argv)
+    config = LoadConfig(**{name: getattr(args, name) for name in asdict(defaults)})
+
+    summaries = []
+    print(
+        f"{'sessions':>8} {'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'lag p99':>8} {'lag max':>8} {'RSS MB':>8} {'timeouts':>8}"
+    )
+    for level in (int(n) for n in args.sessions.split(",")):
+        summary = run_level(level, args.processes, config).summary()
+        summaries.append(summary)
+        latency, lag = summary["turn_latency_ms"], summary["loop_lag_ms"]
+        print(
+            f"{level:>8} {summary['turns_per_second']:>8} "
+            f"{latency.get('p50', '-'):>8} {latency.get('p95', '-'):>8} "
+            f"{latency.get('p99', '-'):>8} {lag.get('p99', '-'):>8} "
+            f"{lag.get('max', '-'):>8} {summary['peak_rss_mb']:>8} "
+            f"{summary['timeouts']:>8}"
+        )
+
+    if args.output:
+        args.output.write_text(
+            json.dumps({"config": asdict(config), "levels": summaries}, indent=2)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Detects code that blocks the job's event loop, and names it.
+
+The event loop of a job process also carries the call's audio, so any
+synchronous work on it (file I/O in a tool, a large JSON parse, a slow
+callback) stalls speech in both directions. ``LoopWatchdog`` finds those
+stalls with two parts:
+
+- a heartbeat task on the loop, which sleeps for a short interval and
+  measures how late it wakes up. That lateness is the loop lag, and a wake-up
+  later than the threshold closes a stall.
+- a watcher thread, which sees the heartbeat go quiet while the loop is
+  still blocked and captures the loop thread's stack at that moment, so the
+  report shows the code holding the loop rather than whatever ran after it.
+
+Each stall is attributed to the function tool whose task was running when it
+was captured (tools are tracked by ``tool_running``, which ``timed_tool``
+applies) and to the job's room. It is logged with that context as
+structured fields, and counted in ``LOOP_STALLS`` and ``LOOP_STALL_DURATION``.
+
+Opt in with ``LOOP_WATCHDOG=1``; ``LOOP_WATCHDOG_THRESHOLD_MS`` (default
+100) sets the lag that counts as a stall.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger("agent")
+
+STALL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LOOP_STALLS = Counter(
+    "sdr_agent_loop_stalls",
+    "Times the job's event loop was blocked past the watchdog threshold",
+    ["room", "tool"],
+)
+LOOP_STALL_DURATION = Histogram(
+    "sdr_agent_loop_stall_seconds",
+    "How long each detected event loop stall lasted",
+    ["room", "tool"],
+    buckets=STALL_BUCKETS,
+)
+
+# The function tool each task is running; read from the watcher thread
+_tool_tasks: weakref.WeakKeyDictionary[asyncio.Task, str] = weakref.WeakKeyDictionary()
+
+
+@contextmanager
+def tool_running(name: str) -> Iterator[None]:
+    """Mark the current task as running the tool ``name``."""
+    task = asyncio.current_task()
+    if task is None:
+        yield
+        return
+    previous = _tool_tasks.get(task)
+    _tool_tasks[task] = name
+    try:
+        yield
+    finally:
+        if previous is None:
+            _tool_tasks.pop(task, None)
+        else:
+            _tool_tasks[task] = previous
+
+
+@dataclass
+class Stall:
+    duration: float
+    room: str
+    tool: str
+    stack: str | None
+
+
+@dataclass
+class _Capture:
+    beat: float
+    tool: str
+    stack: str
+
+
+class LoopWatchdog:
+    """Watches the running event loop for stalls over ``threshold`` seconds."""
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.02) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.room = ""
+        self.stalls: list[Stall] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._beat = time.monotonic()
+        self._capture: _Capture | None = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat: asyncio.Task | None = None
+        self._watcher: threading.Thread | None = None
+
+    def start(self, room: str = "") -> None:
+        """Start watching the running loop; call from the loop."""
+        self.room = room
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        self._watcher = threading.Thread(
+            target=self._watch, daemon=True, name="sdr_agent_loop_watchdog"
+        )
+        self._watcher.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._heartbeat
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = now - before - self.interval
+            with self._lock:
+                beat, self._beat = self._beat, now
+                capture, self._capture = self._capture, None
+            if lag >= self.threshold:
+                if capture is not None and capture.beat != beat:
+                    capture = None  # left over from an earlier beat
+                self._report(lag, capture)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                beat = self._beat
+                if self._capture is not None and self._capture.beat == beat:
+                    continue  # this stall's stack is already captured
+            if time.monotonic() - beat < self.threshold:
+                continue
+            capture = self._capture_loop(beat)
+            if capture is not None:
+                with self._lock:
+                    if self._beat == beat:
+                        self._capture = capture
+
+    def _capture_loop(self, beat: float) -> _Capture | None:
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return None
+        task = asyncio.current_task(self._loop)
+        tool = _tool_tasks.get(task, "") if task is not None else ""
+        return _Capture(beat, tool, "".join(traceback.format_stack(frame)))
+
+    def _report(self, duration: float, capture: _Capture | None) -> None:
+        tool = capture.tool if capture is not None else ""
+        stall = Stall(duration, self.room, tool, capture.stack if capture else None)
+        self.stalls.append(stall)
+        LOOP_STALLS.labels(self.room, tool or "none").inc()
+        LOOP_STALL_DURATION.labels(self.room, tool or "none").observe(duration)
+        logger.warning(
+            f"Event loop blocked for {duration * 1000:.0f} ms"
+            + (f" in tool {tool}" if tool else ""),
+            extra={
+                "loop_stall_ms": round(duration * 1000),
+                "tool": tool or None,
+                "stack": stall.stack,
+            },
+        )
+
+
+def watchdog_from_env() -> LoopWatchdog | None:
+    """The watchdog enabled by ``LOOP_WATCHDOG=1``, or None."""
+    if os.getenv("LOOP_WATCHDOG") != "1":
+        return None
+    threshold_ms = float(os.getenv("LOOP_WATCHDOG_THRESHOLD_MS") or 100)
+    return LoopWatchdog(threshold=threshold_ms / 1000)
@@ -0,0 +1,124 @@
+"""Warm the local models before the first call needs them.
+
+Loading a model is only half of its cold start: ONNX Runtime allocates and
+plans on the first ``run`` of a session, and model files come off disk the
+first time they are read. Without a warm-up, the first utterance of a call
+pays for both.
+
+- ``warm_vad`` runs the Silero session, which ``prewarm`` loads once and
+  every session of the process shares, over a second of synthetic audio
+  (silence, then a voiced tone).
+- ``warm_noise_cancellation`` reads the noise cancellation model into the
+  page cache. The model itself runs inside the LiveKit native filter, which
+  only starts with the room's audio track, so reading it is as far as a
+  warm-up can go; the options object is built once and reused by every job.
+- ``warm_turn_detector`` runs one end-of-turn prediction. The turn detector
+  runs in the worker's shared inference process, which lives as long as
+  the worker and whose ``initialize`` only loads the model, so the first
+  prediction of every worker would pay ONNX Runtime's first-run cost.
+  ``warm_turn_detector_on_start`` runs it once, from the worker's main
+  process as soon as the inference process is up, rather than from a job:
+  a job process serves one call, so a warm-up there would cost every call
+  an extra inference.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from livekit.agents import llm
+
+logger = logging.getLogger("agent")
+
+# The model file each NOISE_CANCELLATION mode loads
+NOISE_CANCELLATION_MODELS = {"bvc": "bvc", "bvc-telephony": "bvct"}
+
+
+def synthetic_audio(sample_rate: int, seconds: float = 1.0) -> np.ndarray:
+    """Half silence, half a voiced tone (a 140 Hz fundamental with a few
+    harmonics, amplitude-modulated like syllables), as float32 samples."""
+    t = np.arange(int(sample_rate * seconds), dtype=np.float32) / sample_rate
+    voiced = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 6))
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+    audio = 0.3 * voiced * envelope
+    audio[: len(audio) // 2] = 0
+    return audio.astype(np.float32)
+
+
+def warm_vad(vad: Any, seconds: float = 1.0) -> int:
+    """Run ``vad``'s shared ONNX session over synthetic audio, returning how
+    many windows were inferred.
+
+    A ``VADStream`` needs a running event loop, which ``prewarm`` doesn't
+    have, so this runs the session through the same ``OnnxModel`` wrapper
+    the streams use.
+    """
+    from livekit.plugins.silero import onnx_model
+
+    model = onnx_model.OnnxModel(
+        onnx_session=vad._onnx_session, sample_rate=vad._opts.sample_rate
+    )
+    audio = synthetic_audio(model.sample_rate, seconds)
+    window = model.window_size_samples
+    windows = len(audio) // window
+    for i in range(windows):
+        model(audio[i * window : (i + 1) * window])
+    return windows
+
+
+def warm_noise_cancellation(mode: str) -> int:
+    """Read the model of noise cancellation ``mode`` into the page cache,
+    returning its size in bytes (0 when noise cancellation is off)."""
+    if mode == "none":
+        return 0
+    plugin = importlib.import_module("livekit.plugins.noise_cancellation.plugin")
+    path = Path(plugin.model_path(NOISE_CANCELLATION_MODELS[mode]))
+    with open(path, "rb") as f:
+        while f.read(1024 * 1024):
+            pass
+    return path.stat().st_size
+
+
+async def warm_turn_detector(turn_detector: Any) -> float | None:
+    """Run one end-of-turn prediction, returning how long it took (None if
+    it failed, which only costs the first turn its warm start)."""
+    chat_ctx = llm.ChatContext()
+    chat_ctx.add_message(role="assistant", content="Hi! What brought you here today?")
+    chat_ctx.add_message(role="user", content="I wanted to ask about your pricing.")
+    start = time.perf_counter()
+    try:
+        await turn_detector.predict_end_of_turn(chat_ctx, timeout=None)
+    except Exception as e:
+        logger.warning(f"Turn detector warm-up failed: {e!r}")
+        return None
+    elapsed = time.perf_counter() - start
+    logger.info(f"Turn detector warmed up in {elapsed * 1000:.0f} ms")
+    return elapsed
+
+
+def warm_turn_detector_on_start(server: Any, pipeline: Any) -> None:
+    """Warm ``pipeline``'s turn detector once, in the inference process of
+    ``server`` (an ``AgentServer``), as soon as the worker has started."""
+    if pipeline.turn_detection != "multilingual":
+        return
+    warmups: set[asyncio.Task] = set()
+
+    def on_started() -> None:
+        # The executor has no public accessor; it is None when no plugin
+        # registered an inference runner
+        executor = getattr(server, "_inference_executor", None)
+        if executor is None:
+            return
+        task = asyncio.ensure_future(
+            warm_turn_detector(pipeline.turn_detector(inference_executor=executor))
+        )
+        warmups.add(task)
+        task.add_done_callback(warmups.discard)
+
+    server.on("worker_started", on_started)
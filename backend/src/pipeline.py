@@ -0,0 +1,188 @@
+"""Voice pipeline components, resolved from configuration.
+
+Importing every provider plugin at the top of ``agent.py`` made the worker
+and each job process pay for all of them (the Google plugin alone takes
+about two seconds) before doing anything useful, whether a provider was
+used or not. ``PipelineConfig`` names the providers, and each plugin is
+imported only when a component is built from it, or up front in
+``prewarm`` with ``import_plugins``:
+
+- ``STT_PROVIDER``: ``deepgram`` (default) or ``assemblyai``; ``STT_MODEL``
+- ``LLM_PROVIDER``: ``google``; ``LLM_MODEL``
+- ``TTS_PROVIDER``: ``murf``
+- ``TURN_DETECTION``: ``multilingual`` (the LiveKit turn detector model,
+  default), ``vad`` or ``stt``
+- ``NOISE_CANCELLATION``: ``bvc`` (default), ``bvc-telephony`` or ``none``
+
+Plugins have to be imported on the main thread, and some are needed in
+the worker's main process too: the turn detector registers the model the
+worker's shared inference process runs, and ``download-files`` fetches
+the files of the plugins imported when it runs. ``main_process_modules``
+lists those.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any
+
+logger = logging.getLogger("agent")
+
+STT_PLUGINS = {
+    "deepgram": "livekit.plugins.deepgram",
+    "assemblyai": "livekit.plugins.assemblyai",
+}
+LLM_PLUGINS = {"google": "livekit.plugins.google"}
+TTS_PLUGINS = {"murf": "livekit.plugins.murf"}
+VAD_PLUGIN = "livekit.plugins.silero"
+TURN_DETECTOR_PLUGIN = "livekit.plugins.turn_detector.multilingual"
+NOISE_CANCELLATION_PLUGIN = "livekit.plugins.noise_cancellation"
+
+DEFAULT_STT_MODELS = {"deepgram": "nova-3"}
+DEFAULT_LLM_MODELS = {"google": "gemini-2.5-flash"}
+
+TURN_DETECTION_MODES = ("multilingual", "vad", "stt")
+NOISE_CANCELLATION_MODES = ("bvc", "bvc-telephony", "none")
+
+
+def _module(plugins: dict[str, str], provider: str, kind: str) -> str:
+    try:
+        return plugins[provider]
+    except KeyError:
+        raise ValueError(
+            f"Unknown {kind} provider {provider!r}, expected one of {sorted(plugins)}"
+        ) from None
+
+
+def import_plugins(modules: list[str]) -> dict[str, float]:
+    """Import ``modules``, returning the seconds each took (0 if it was
+    already imported)."""
+    timings = {}
+    for module in modules:
+        start = time.perf_counter()
+        importlib.import_module(module)
+        timings[module] = time.perf_counter() - start
+    return timings
+
+
+@dataclass
+class PipelineConfig:
+    stt_provider: str = "deepgram"
+    stt_model: str | None = None
+    llm_provider: str = "google"
+    llm_model: str | None = None
+    tts_provider: str = "murf"
+    turn_detection: str = "multilingual"
+    noise_cancellation: str = "bvc"
+
+    def __post_init__(self) -> None:
+        # Fail at startup rather than on the first call
+        for plugins, provider, kind in (
+            (STT_PLUGINS, self.stt_provider, "STT"),
+            (LLM_PLUGINS, self.llm_provider, "LLM"),
+            (TTS_PLUGINS, self.tts_provider, "TTS"),
+        ):
+            _module(plugins, provider, kind)
+        if self.turn_detection not in TURN_DETECTION_MODES:
+            raise ValueError(
+                f"Unknown turn detection {self.turn_detection!r}, "
+                f"expected one of {TURN_DETECTION_MODES}"
+            )
+        if self.noise_cancellation not in NOISE_CANCELLATION_MODES:
+            raise ValueError(
+                f"Unknown noise cancellation {self.noise_cancellation!r}, "
+                f"expected one of {NOISE_CANCELLATION_MODES}"
+            )
+
+    @classmethod
+    def from_env(cls) -> PipelineConfig:
+        defaults = cls()
+        return cls(
+            stt_provider=os.getenv("STT_PROVIDER") or defaults.stt_provider,
+            stt_model=os.getenv("STT_MODEL") or None,
+            llm_provider=os.getenv("LLM_PROVIDER") or defaults.llm_provider,
+            llm_model=os.getenv("LLM_MODEL") or None,
+            tts_provider=os.getenv("TTS_PROVIDER") or defaults.tts_provider,
+            turn_detection=os.getenv("TURN_DETECTION") or defaults.turn_detection,
+            noise_cancellation=(
+                os.getenv("NOISE_CANCELLATION") or defaults.noise_cancellation
+            ),
+        )
+
+    def modules(self) -> list[str]:
+        """Every plugin module this pipeline uses."""
+        modules = [
+            VAD_PLUGIN,
+            _module(STT_PLUGINS, self.stt_provider, "STT"),
+            _module(LLM_PLUGINS, self.llm_provider, "LLM"),
+            _module(TTS_PLUGINS, self.tts_provider, "TTS"),
+        ]
+        if self.turn_detection == "multilingual":
+            modules.append(TURN_DETECTOR_PLUGIN)
+        if self.noise_cancellation != "none":
+            modules.append(NOISE_CANCELLATION_PLUGIN)
+        return modules
+
+    def main_process_modules(self, download_files: bool = False) -> list[str]:
+        """The plugin modules the worker's main process has to import."""
+        if download_files:
+            return self.modules()
+        if self.turn_detection == "multilingual":
+            return [TURN_DETECTOR_PLUGIN]
+        return []
+
+    def load_vad(self) -> Any:
+        return importlib.import_module(VAD_PLUGIN).VAD.load()
+
+    def stt(self) -> Any:
+        plugin = _plugin(STT_PLUGINS, self.stt_provider, "STT")
+        model = self.stt_model or DEFAULT_STT_MODELS.get(self.stt_provider)
+        return plugin.STT(model=model) if model else plugin.STT()
+
+    def llm(self) -> Any:
+        plugin = _plugin(LLM_PLUGINS, self.llm_provider, "LLM")
+        model = self.llm_model or DEFAULT_LLM_MODELS.get(self.llm_provider)
+        return plugin.LLM(model=model) if model else plugin.LLM()
+
+    def tts(self, **options: Any) -> Any:
+        """The TTS, with provider-specific ``options`` (voice, style, ...)."""
+        return _plugin(TTS_PLUGINS, self.tts_provider, "TTS").TTS(**options)
+
+    def turn_detector(self, inference_executor: Any = None) -> Any:
+        """The ``turn_detection`` argument of ``AgentSession``.
+
+        The model normally reaches the inference process through the job it
+        runs in; ``inference_executor`` binds it to that executor instead,
+        for use outside a job (the worker's own warm-up).
+        """
+        if self.turn_detection != "multilingual":
+            return self.turn_detection
+        model_class = importlib.import_module(TURN_DETECTOR_PLUGIN).MultilingualModel
+        if inference_executor is None:
+            return model_class()
+        # MultilingualModel doesn't take an executor, but its base class does;
+        # the per-language thresholds only matter to a session
+        model = model_class.__new__(model_class)
+        super(model_class, model).__init__(
+            model_type="multilingual",
+            inference_executor=inference_executor,
+            load_languages=False,
+        )
+        return model
+
+    def noise_canceller(self) -> Any | None:
+        if self.noise_cancellation == "none":
+            return None
+        plugin = importlib.import_module(NOISE_CANCELLATION_PLUGIN)
+        if self.noise_cancellation == "bvc-telephony":
+            return plugin.BVCTelephony()
+        return plugin.BVC()
+
+
+def _plugin(plugins: dict[str, str], provider: str, kind: str) -> ModuleType:
+    return importlib.import_module(_module(plugins, provider, kind))
@@ -0,0 +1,170 @@
+"""Where a cold job process spends its time before it can take a call.
+
+Run next to the LiveKit CLI commands::
+
+    uv run src/agent.py startup-profile
+
+This starts a fresh interpreter with ``python -X importtime``, imports
+``agent`` and runs ``prewarm`` as a new job process would, then reports
+the slowest of the agent module's imports, the time of each ``prewarm``
+step and how long each plugin of the configured pipeline took to import.
+``prewarm`` times its steps with ``StepTimer``, which also logs them on
+every worker start.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+logger = logging.getLogger("agent")
+
+# Written to stderr after importing agent; -X importtime doesn't nest the
+# imports prewarm makes from inside functions, so they are timed directly
+PHASE_MARKER = "startup-profile: prewarm"
+
+_CHILD = f"""
+import sys, time
+start = time.perf_counter()
+import agent
+import_seconds = time.perf_counter() - start
+import json
+print({PHASE_MARKER!r}, file=sys.stderr, flush=True)
+
+from livekit.agents import JobExecutorType, JobProcess
+proc = JobProcess(executor_type=JobExecutorType.PROCESS, user_arguments=None, http_proxy=None)
+start = time.perf_counter()
+agent.prewarm(proc)
+print(json.dumps({{
+    "import_seconds": import_seconds,
+    "prewarm_seconds": time.perf_counter() - start,
+    "prewarm_steps": proc.userdata["startup_timings"],
+    "plugin_imports": proc.userdata["plugin_import_timings"],
+}}))
+"""
+
+
+class StepTimer:
+    """Wall-clock time of the named steps of a startup phase."""
+
+    def __init__(self, phase: str) -> None:
+        self.phase = phase
+        self.steps: dict[str, float] = {}
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.perf_counter() - start
+
+    def log(self) -> None:
+        steps = ", ".join(f"{name} {t:.2f}s" for name, t in self.steps.items())
+        logger.info(f"{self.phase} took {sum(self.steps.values()):.2f}s ({steps})")
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """The ``-X importtime`` lines of ``stderr`` up to ``PHASE_MARKER``."""
+    imports = []
+    for line in stderr.splitlines():
+        if line == PHASE_MARKER:
+            break
+        if not line.startswith("import time:"):
+            continue
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2][1:]
+        module = name.lstrip()
+        imports.append(
+            ImportTime(
+                module=module,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+                depth=(len(name) - len(module)) // 2,
+            )
+        )
+    return imports
+
+
+def slowest_imports(imports: list[ImportTime], top: int) -> list[ImportTime]:
+    """The ``top`` slowest of ``agent`` and the modules it imports directly
+    (deeper imports are counted in their importer's cumulative time)."""
+    candidates = [i for i in imports if i.depth <= 1]
+    return sorted(candidates, key=lambda i: i.cumulative_us, reverse=True)[:top]
+
+
+def profile(top: int = 10) -> dict:
+    """Profile a cold start in a fresh interpreter."""
+    src = str(Path(__file__).parent)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            _CHILD,
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Profiled startup failed:\n{result.stderr[-2000:]}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    imports = slowest_imports(parse_importtime(result.stderr), top)
+    return {**timings, "imports": [asdict(i) for i in imports]}
+
+
+def format_report(report: dict) -> str:
+    lines = [f"Importing agent: {report['import_seconds'] * 1000:.0f} ms"]
+    lines += [
+        f"  {i['cumulative_us'] / 1000:>9.1f} ms  {'  ' * i['depth']}{i['module']}"
+        for i in report["imports"]
+    ]
+    lines.append(f"Running prewarm: {report['prewarm_seconds'] * 1000:.0f} ms")
+    for name, seconds in report["prewarm_steps"].items():
+        lines.append(f"  {seconds * 1000:>9.1f} ms  {name}")
+        if name == "plugins":
+            lines += [
+                f"  {plugin_seconds * 1000:>9.1f} ms    {module}"
+                for module, plugin_seconds in report["plugin_imports"].items()
+            ]
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="agent.py startup-profile",
+        description="Report import and prewarm times of a cold job process",
+    )
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args(argv)
+
+    report = profile(top=args.top)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Deterministic local stand-ins for the STT, LLM and TTS plugins.
+
+They let a real ``AgentSession`` run the real ``Assistant`` without Deepgram,
+Gemini or Murf, e.g. for load tests (``load_test.py``) and tests. Each
+stand-in sleeps for a configurable latency and produces canned output:
+
+- ``ScriptedCaller`` is the user: an ``AudioInput`` that streams 20 ms
+  frames in real time, "speaking" each scripted line as a burst of
+  non-silent frames.
+- ``StubSTT`` turns each burst back into the caller's line, emitting the
+  final transcript ``delay`` seconds after the speech ends.
+- ``StubLLM`` answers a user line by calling the tool the script assigned
+  to it, and answers a tool result by reading back its first sentence.
+- ``StubTTS`` returns silent PCM, ``seconds_per_char`` long, after ``ttfb``.
+- ``SimulatedSpeaker`` is the audio output: it plays captured audio back in
+  (optionally accelerated) real time and records when each reply started.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from livekit import rtc
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    APIConnectOptions,
+    llm,
+    stt,
+    tts,
+)
+from livekit.agents.types import NOT_GIVEN, NotGivenOr
+from livekit.agents.utils import AudioBuffer
+from livekit.agents.voice.io import AudioInput, AudioOutput, AudioOutputCapabilities
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+_SAMPLES_PER_FRAME = SAMPLE_RATE * FRAME_MS // 1000
+_SILENCE = bytes(_SAMPLES_PER_FRAME * 2)
+_SPEECH = b"\x00\x10" * _SAMPLES_PER_FRAME
+
+_ids = itertools.count()
+
+
+def _request_id(prefix: str) -> str:
+    return f"{prefix}_{next(_ids)}"
+
+
+@dataclass
+class Turn:
+    """One scripted user line and the tool calls the stub LLM answers it with."""
+
+    text: str
+    calls: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+
+
+class ScriptedCaller(AudioInput):
+    """Audio input that speaks scripted lines, one per ``say`` call."""
+
+    def __init__(self, speech_seconds: float = 1.0) -> None:
+        super().__init__(label="ScriptedCaller")
+        self.speech_seconds = speech_seconds
+        self.transcripts: deque[str] = deque()
+        self._speech_frames = 0
+        self._next_frame = 0.0
+        self.speech_ended_at: float | None = None
+
+    def say(self, text: str) -> None:
+        """Start speaking ``text``; the transcript is handed to the STT."""
+        self.transcripts.append(text)
+        self._speech_frames = max(1, round(self.speech_seconds * 1000 / FRAME_MS))
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        # Pace frames like a live microphone
+        now = time.perf_counter()
+        self._next_frame = max(self._next_frame, now) + FRAME_MS / 1000
+        await asyncio.sleep(self._next_frame - now)
+        data = _SILENCE
+        if self._speech_frames:
+            data = _SPEECH
+            self._speech_frames -= 1
+            if not self._speech_frames:
+                self.speech_ended_at = time.perf_counter()
+        return rtc.AudioFrame(data, SAMPLE_RATE, 1, _SAMPLES_PER_FRAME)
+
+
+class StubSTT(stt.STT):
+    def __init__(self, caller: ScriptedCaller, delay: float = 0.1) -> None:
+        super().__init__(
+            capabilities=stt.STTCapabilities(streaming=True, interim_results=False)
+        )
+        self.caller = caller
+        self.delay = delay
+
+    def transcript_event(self) -> stt.SpeechEvent:
+        """The caller's next transcript as a final transcript event."""
+        text = self.caller.transcripts.popleft() if self.caller.transcripts else ""
+        return stt.SpeechEvent(
+            type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+            request_id=_request_id("stt"),
+            alternatives=[stt.SpeechData(language="en", text=text, confidence=1.0)],
+        )
+
+    async def _recognize_impl(
+        self,
+        buffer: AudioBuffer,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> stt.SpeechEvent:
+        await asyncio.sleep(self.delay)
+        return self.transcript_event()
+
+    def stream(
+        self,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> stt.RecognizeStream:
+        return _StubRecognizeStream(stt=self, conn_options=conn_options)
+
+
+class _StubRecognizeStream(stt.RecognizeStream):
+    async def _run(self) -> None:
+        speaking = False
+        async for frame in self._input_ch:
+            if isinstance(frame, self._FlushSentinel):
+                continue
+            voiced = any(frame.data[:4])
+            if voiced and not speaking:
+                speaking = True
+                self._event_ch.send_nowait(
+                    stt.SpeechEvent(type=stt.SpeechEventType.START_OF_SPEECH)
+                )
+            elif not voiced and speaking:
+                speaking = False
+                await asyncio.sleep(self._stt.delay)
+                self._event_ch.send_nowait(self._stt.transcript_event())
+                self._event_ch.send_nowait(
+                    stt.SpeechEvent(type=stt.SpeechEventType.END_OF_SPEECH)
+                )
+
+
+class StubLLM(llm.LLM):
+    def __init__(
+        self,
+        script: list[Turn],
+        ttft: float = 0.3,
+        tokens_per_second: float = 50.0,
+    ) -> None:
+        super().__init__()
+        self.turns = {turn.text: turn for turn in script}
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.requests: list[llm.ChatContext] = []
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> llm.LLMStream:
+        self.requests.append(chat_ctx.copy())
+        return _StubLLMStream(
+            self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options
+        )
+
+
+class _StubLLMStream(llm.LLMStream):
+    def _reply(self) -> tuple[str, list[llm.FunctionToolCall]]:
+        last = self._chat_ctx.items[-1] if self._chat_ctx.items else None
+        if isinstance(last, llm.FunctionCallOutput):
+            first_sentence = re.split(r"(?<=[.!?])\s", last.output.strip(), maxsplit=1)[
+                0
+            ]
+            return first_sentence.removeprefix("Q: ") or "Done.", []
+        if isinstance(last, llm.ChatMessage) and last.role == "user":
+            turn = self._llm.turns.get(last.text_content or "")
+            if turn is not None and turn.calls:
+                return "", [
+                    llm.FunctionToolCall(
+                        name=name,
+                        arguments=json.dumps(arguments),
+                        call_id=_request_id("call"),
+                    )
+                    for name, arguments in turn.calls
+                ]
+        return "Hi! I'm the Razorpay assistant, how can I help?", []
+
+    async def _run(self) -> None:
+        request_id = _request_id("llm")
+        text, tool_calls = self._reply()
+        await asyncio.sleep(self._llm.ttft)
+        if tool_calls:
+            self._event_ch.send_nowait(
+                llm.ChatChunk(
+                    id=request_id,
+                    delta=llm.ChoiceDelta(role="assistant", tool_calls=tool_calls),
+                )
+            )
+        words = text.split(" ") if text else []
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(1 / self._llm.tokens_per_second)
+            self._event_ch.send_nowait(
+                llm.ChatChunk(
+                    id=request_id,
+                    delta=llm.ChoiceDelta(
+                        role="assistant", content=f" {word}" if i else word
+                    ),
+                )
+            )
+        self._event_ch.send_nowait(
+            llm.ChatChunk(
+                id=request_id,
+                usage=llm.CompletionUsage(
+                    completion_tokens=len(words) + len(tool_calls),
+                    prompt_tokens=len(self._chat_ctx.items),
+                    total_tokens=len(words) + len(self._chat_ctx.items),
+                ),
+            )
+        )
+
+
+class StubTTS(tts.TTS):
+    def __init__(
+        self,
+        ttfb: float = 0.2,
+        seconds_per_char: float = 0.06,
+        sample_rate: int = 24000,
+    ) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=sample_rate,
+            num_channels=1,
+        )
+        self.ttfb = ttfb
+        self.seconds_per_char = seconds_per_char
+        self.requests: list[str] = []
+
+    def synthesize(
+        self,
+        text: str,
+        *,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> tts.ChunkedStream:
+        self.requests.append(text)
+        return _StubChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class _StubChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        output_emitter.initialize(
+            request_id=_request_id("tts"),
+            sample_rate=self._tts.sample_rate,
+            num_channels=1,
+            mime_type="audio/pcm",
+        )
+        await asyncio.sleep(self._tts.ttfb)
+        seconds = len(self.input_text) * self._tts.seconds_per_char
+        output_emitter.push(bytes(int(seconds * self._tts.sample_rate) * 2))
+        output_emitter.flush()
+
+
+class SimulatedSpeaker(AudioOutput):
+    """Audio output that "plays" each reply for its duration / ``speed``.
+
+    The time the first frame of each reply arrived, which is when the
+    caller would start hearing it, is put on ``replies``.
+    """
+
+    def __init__(self, speed: float = 1.0) -> None:
+        super().__init__(
+            label="SimulatedSpeaker",
+            capabilities=AudioOutputCapabilities(pause=False),
+        )
+        self.speed = speed
+        self.replies: asyncio.Queue[float] = asyncio.Queue()
+        self._pushed = 0.0
+        self._capturing = False
+        self._playout: asyncio.Task | None = None
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        if not self._capturing:
+            self._capturing = True
+            self._pushed = 0.0
+            self.replies.put_nowait(time.perf_counter())
+        self._pushed += frame.duration
+
+    def flush(self) -> None:
+        super().flush()
+        if not self._capturing:
+            return
+        self._capturing = False
+        self._playout = asyncio.create_task(self._play(self._pushed))
+
+    async def _play(self, seconds: float) -> None:
+        await asyncio.sleep(seconds / self.speed)
+        self.on_playback_finished(playback_position=seconds, interrupted=False)
+
+    def clear_buffer(self) -> None:
+        playing = self._playout is not None and not self._playout.done()
+        if playing:
+            self._playout.cancel()
+        if playing or self._capturing:
+            self.on_playback_finished(playback_position=0.0, interrupted=True)
+        self._capturing = False
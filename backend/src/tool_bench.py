@@ -0,0 +1,419 @@
+"""Micro-benchmarks for the Assistant's function tools.
+
+The tools are called directly, the way the session calls them, without
+any STT, LLM or TTS around them:
+
+- ``lookup_faq`` against the real ``company_faq.json`` and synthetic corpora
+  built from its vocabulary, up to 100k entries, in both search modes. The
+  response cache is disabled, so every call pays for the search.
+- ``save_lead_info`` with and without a lead checkpoint.
+- ``generate_summary`` until the lead is on disk, into a ``leads/``
+  directory already holding 100k files, and into a SQLite store of the same
+  size with and without deduplication.
+
+Results are written as a JSON baseline, and a later run can be compared
+against it::
+
+    uv run src/tool_bench.py run --output baseline.json
+    uv run src/tool_bench.py run --output current.json
+    uv run src/tool_bench.py compare baseline.json current.json --threshold 0.2
+
+``compare`` exits non-zero if any benchmark's median got slower by more
+than the threshold. Filling the 100k-file leads directory takes a while;
+``--leads-dir`` keeps it between runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from datetime import datetime
+from pathlib import Path
+
+from agent import Assistant
+from faq_cache import FaqResultCache
+from faq_search import build_faq_index
+from faq_store import FaqStore
+from lead_checkpoint import LeadCheckpoint
+from lead_dedupe import DedupingLeadStore, LeadIndex, identity_keys, index_path_for
+from lead_store import (
+    JsonDirLeadStore,
+    Lead,
+    LeadStore,
+    SqliteLeadStore,
+    new_lead_id,
+)
+from lead_writer import LeadWriter
+
+FAQ_PATH = Path(__file__).parent / "company_faq.json"
+
+FAQ_SIZES = (12, 1_000, 10_000, 100_000)
+# The semantic index holds a dense 2048-float row per entry (800 MB at 100k)
+SEMANTIC_MAX_SIZE = 10_000
+LEAD_COUNT = 100_000
+
+QUERIES = (
+    "What does Razorpay do?",
+    "pricing",
+    "how much are the transaction fees for international cards",
+    "do you support UPI and wallets",
+    "how long does integration take",
+    "is my data secure",
+    "can I get a refund on a failed payment",
+    "do you have a free plan",
+)
+
+_OPENERS = ("What", "How", "Can", "Do", "Does", "Is", "Which", "When", "Why")
+
+
+def synthetic_faqs(size: int, seed: int = 0) -> list[dict]:
+    """The real FAQs followed by generated ones, ``size`` entries in all.
+
+    Generated entries reuse the vocabulary of the real ones so query terms
+    match a realistic share of the corpus.
+    """
+    with open(FAQ_PATH) as f:
+        real = json.load(f)["faqs"]
+    vocab = sorted(
+        {
+            word
+            for faq in real
+            for word in (faq["question"] + " " + faq["answer"]).split()
+        }
+    )
+    rng = random.Random(seed)
+    faqs = real[:size]
+    for i in range(len(faqs), size):
+        question = " ".join(rng.choices(vocab, k=rng.randint(4, 9)))
+        answer = " ".join(rng.choices(vocab, k=rng.randint(25, 60)))
+        faqs.append(
+            {
+                "question": f"{rng.choice(_OPENERS)} {question} (#{i})?",
+                "answer": answer,
+            }
+        )
+    return faqs
+
+
+def _synthetic_lead(i: int, rng: random.Random) -> Lead:
+    return {
+        "lead_id": f"bench_{i:06d}",
+        "name": f"Caller {i}",
+        "company": f"Company {rng.randrange(LEAD_COUNT // 4)}",
+        "email": f"caller{i}@example.com",
+        "role": rng.choice(["CTO", "Founder", "Finance lead", None]),
+        "use_case": rng.choice(["online payments", "payouts", "invoicing", None]),
+        "team_size": rng.choice(["5", "50", "500", None]),
+        "timeline": rng.choice(["this month", "next quarter", None]),
+        "conversation_notes": [],
+        "conversation_summary": "Asked about pricing and UPI support.",
+        "timestamp": datetime(2025, 1, 1, rng.randrange(24)).isoformat(),
+    }
+
+
+def synthetic_leads(count: int, seed: int = 0) -> Iterator[Lead]:
+    rng = random.Random(seed)
+    return (_synthetic_lead(i, rng) for i in range(count))
+
+
+def fill_leads_dir(leads_dir: Path, count: int) -> None:
+    """Make sure ``leads_dir`` holds at least ``count`` lead files."""
+    leads_dir.mkdir(parents=True, exist_ok=True)
+    existing = sum(1 for _ in leads_dir.glob("lead_*.json"))
+    if existing >= count:
+        return
+    leads = list(synthetic_leads(count))[existing:]
+    JsonDirLeadStore(leads_dir).save(leads)
+
+
+def fill_sqlite_store(path: Path, count: int) -> None:
+    """A SQLite store and dedupe index at ``path`` holding ``count`` leads."""
+    store = SqliteLeadStore(path)
+    index = LeadIndex(index_path_for(path))
+    try:
+        batch: list[Lead] = []
+        for lead in synthetic_leads(count):
+            batch.append(lead)
+            index.add(lead["lead_id"], [f"id:{lead['lead_id']}", *identity_keys(lead)])
+            if len(batch) == 1000:
+                store.save(batch)
+                batch.clear()
+        store.save(batch)
+        index.flush()
+    finally:
+        store.close()
+
+
+def _stats(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def at(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1e6, 2)
+
+    return {
+        "ops": len(ordered),
+        "mean_us": round(sum(ordered) / len(ordered) * 1e6, 2),
+        "p50_us": at(0.5),
+        "p95_us": at(0.95),
+        "max_us": at(1.0),
+    }
+
+
+async def measure(
+    call: Callable[[int], Awaitable[object]],
+    repeat: int,
+    setup: Callable[[int], Awaitable[object]] | None = None,
+    warmup: int = 3,
+) -> dict[str, float]:
+    """Time ``repeat`` calls of ``call(i)``; ``setup(i)`` runs untimed first."""
+    samples = []
+    for i in range(warmup + repeat):
+        if setup is not None:
+            await setup(i)
+        start = time.perf_counter()
+        await call(i)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return _stats(samples)
+
+
+def _faq_store(faqs: list[dict], mode: str) -> FaqStore:
+    with open(FAQ_PATH) as f:
+        data = json.load(f)
+    data["faqs"] = faqs
+    # A zero-size cache misses on every call, so each lookup runs the search
+    return FaqStore(data, build_faq_index(faqs, mode=mode), FaqResultCache(max_size=0))
+
+
+async def bench_lookup_faq(
+    sizes: Sequence[int], repeat: int, semantic_max: int
+) -> dict[str, dict]:
+    results = {}
+    for size in sizes:
+        faqs = synthetic_faqs(size)
+        for mode in ("keyword", "semantic"):
+            if mode == "semantic" and size > semantic_max:
+                continue
+            start = time.perf_counter()
+            faq_store = _faq_store(faqs, mode)
+            build_seconds = time.perf_counter() - start
+            assistant = Assistant(faq_store=faq_store)
+
+            async def lookup(i: int, assistant: Assistant = assistant) -> None:
+                await assistant.lookup_faq(None, QUERIES[i % len(QUERIES)])
+
+            stats = await measure(lookup, repeat)
+            stats["index_build_s"] = round(build_seconds, 3)
+            results[f"lookup_faq/{mode}/n={size}"] = stats
+    return results
+
+
+async def bench_save_lead_info(repeat: int, tmp: Path) -> dict[str, dict]:
+    faq_store = _faq_store(synthetic_faqs(12), "keyword")
+    fields = ("name", "company", "email", "role", "use_case", "team_size", "timeline")
+
+    def save(assistant: Assistant) -> Callable[[int], Awaitable[object]]:
+        async def call(i: int) -> None:
+            await assistant.save_lead_info(None, fields[i % len(fields)], f"value {i}")
+
+        return call
+
+    results = {}
+    # Neither benchmark reaches generate_summary, so the default lead writer
+    # never touches disk
+    assistant = Assistant(faq_store=faq_store)
+    results["save_lead_info/plain"] = await measure(save(assistant), repeat)
+
+    lead_id = new_lead_id()
+    checkpoint = LeadCheckpoint(tmp / "wal" / f"{lead_id}.wal", lead_id, delay=0.01)
+    assistant = Assistant(faq_store=faq_store, lead_checkpoint=checkpoint)
+    store = SqliteLeadStore(tmp / "checkpoint.db")
+    try:
+        results["save_lead_info/checkpoint"] = await measure(save(assistant), repeat)
+    finally:
+        await checkpoint.aclose(store)
+        store.close()
+    return results
+
+
+async def _bench_summary(
+    store: LeadStore, repeat: int, existing: int
+) -> tuple[dict[str, float], list[str]]:
+    """Time generate_summary into ``store``, which holds ``existing`` leads.
+
+    Also returns the ids of the leads it wrote.
+    """
+    faq_store = _faq_store(synthetic_faqs(12), "keyword")
+    writer = LeadWriter(store)
+    rng = random.Random(1)
+    assistant = Assistant(faq_store=faq_store, lead_writer=writer)
+    written = []
+
+    async def setup(i: int) -> None:
+        nonlocal assistant
+        assistant = Assistant(faq_store=faq_store, lead_writer=writer)
+        lead = _synthetic_lead(existing + i, rng)
+        # Every other caller is someone already in the store
+        if i % 2 and existing:
+            lead["email"] = f"caller{rng.randrange(existing)}@example.com"
+        del lead["lead_id"], lead["timestamp"], lead["conversation_summary"]
+        assistant.lead_data.update(lead)
+
+    async def summary(i: int) -> None:
+        await assistant.generate_summary(None, "Asked about UPI pricing.")
+        # Until the lead is in the store, not just queued
+        await writer.flush()
+        written.append(assistant.lead_data["lead_id"])
+
+    try:
+        return await measure(summary, repeat, setup=setup), written
+    finally:
+        await writer.aclose()
+
+
+async def bench_generate_summary(
+    leads: int, repeat: int, leads_dir: Path | None, tmp: Path
+) -> dict[str, dict]:
+    results = {}
+    workdir = leads_dir or tmp / "leads"
+    fill_leads_dir(workdir, leads)
+    stats, written = await _bench_summary(JsonDirLeadStore(workdir), repeat, leads)
+    results[f"generate_summary/json/n={leads}"] = stats
+    # Leave a kept directory as it was for the next run
+    for lead_id in written:
+        (workdir / f"lead_{lead_id}.json").unlink(missing_ok=True)
+
+    for name, dedupe in (("sqlite", False), ("sqlite+dedupe", True)):
+        db = tmp / f"{name}.db"
+        fill_sqlite_store(db, leads)
+        store: LeadStore = SqliteLeadStore(db)
+        if dedupe:
+            store = DedupingLeadStore(store, LeadIndex(index_path_for(db)))
+        stats, _ = await _bench_summary(store, repeat, leads)
+        results[f"generate_summary/{name}/n={leads}"] = stats
+    return results
+
+
+async def run(
+    sizes: Sequence[int] = FAQ_SIZES,
+    leads: int = LEAD_COUNT,
+    repeat: int = 200,
+    semantic_max: int = SEMANTIC_MAX_SIZE,
+    leads_dir: Path | None = None,
+) -> dict:
+    """Run every benchmark; returns the baseline document."""
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix="tool-bench-") as tmp:
+        results.update(await bench_lookup_faq(sizes, repeat, semantic_max))
+        results.update(await bench_save_lead_info(repeat, Path(tmp)))
+        results.update(
+            await bench_generate_summary(leads, repeat, leads_dir, Path(tmp))
+        )
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float, metric: str = "p50_us"
+) -> list[str]:
+    """Benchmarks whose ``metric`` grew by more than ``threshold`` (0.2 = 20%)."""
+    regressions = []
+    print(f"{'benchmark':<42} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stats in current["results"].items():
+        before = baseline["results"].get(name, {}).get(metric)
+        after = stats[metric]
+        if not before:
+            print(f"{name:<42} {'-':>10} {after:>10} {'new':>8}")
+            continue
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<42} {before:>10} {after:>10} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="run the benchmarks")
+    run_cmd.add_argument(
+        "--sizes",
+        default=",".join(map(str, FAQ_SIZES)),
+        help="comma-separated FAQ corpus sizes",
+    )
+    run_cmd.add_argument("--leads", type=int, default=LEAD_COUNT)
+    run_cmd.add_argument("--repeat", type=int, default=200, help="calls per benchmark")
+    run_cmd.add_argument(
+        "--semantic-max",
+        type=int,
+        default=SEMANTIC_MAX_SIZE,
+        help="largest corpus to run the semantic index on",
+    )
+    run_cmd.add_argument(
+        "--leads-dir", type=Path, help="keep the generated leads directory here"
+    )
+    run_cmd.add_argument("--output", type=Path, help="write the results as JSON")
+
+    compare_cmd = commands.add_parser("compare", help="compare two result files")
+    compare_cmd.add_argument("baseline", type=Path)
+    compare_cmd.add_argument("current", type=Path)
+    compare_cmd.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%"
+    )
+    compare_cmd.add_argument(
+        "--metric", default="p50_us", choices=["p50_us", "p95_us", "mean_us"]
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        document = asyncio.run(
+            run(
+                sizes=[int(n) for n in args.sizes.split(",")],
+                leads=args.leads,
+                repeat=args.repeat,
+                semantic_max=args.semantic_max,
+                leads_dir=args.leads_dir,
+            )
+        )
+        print(f"{'benchmark':<42} {'p50 us':>10} {'p95 us':>10} {'ops':>6}")
+        for name, stats in document["results"].items():
+            print(
+                f"{name:<42} {stats['p50_us']:>10} {stats['p95_us']:>10} "
+                f"{stats['ops']:>6}"
+            )
+        if args.output:
+            args.output.write_text(json.dumps(document, indent=2))
+    else:
+        regressions = compare(
+            json.loads(args.baseline.read_text()),
+            json.loads(args.current.read_text()),
+            args.threshold,
+            args.metric,
+        )
+        if regressions:
+            raise SystemExit(
+                f"{len(regressions)} benchmark(s) regressed by more than "
+                f"{args.threshold:.0%}: {', '.join(regressions)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
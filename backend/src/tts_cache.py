@@ -0,0 +1,358 @@
+"""On-disk cache of synthesized speech, one file per sentence.
+
+Much of what the agent says repeats verbatim: FAQ answers and the fixed
+parts of the ``generate_summary`` recap. ``CachedTTS`` wraps the real TTS
+and keys each sentence by (voice, style, sample rate, text hash). A hit is
+played straight from disk with no network round trip; a miss is
+synthesized by the wrapped TTS, streamed through as it arrives and saved
+for next time.
+
+``CachedTTS`` only synthesizes whole sentences, so the session uses it
+through ``tts.StreamAdapter``, which splits the LLM's streamed text with
+``sentence_tokenizer()`` and requests one sentence at a time.
+
+Entries are WAV files named by their key hash. The directory is shared by
+every job process on the host: hits bump a file's mtime, and after each
+write the least recently used files are deleted until the directory is
+back under its size budget.
+
+FAQ answers can be synthesized ahead of the first call::
+
+    uv run src/tts_cache.py prewarm
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import wave
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from dotenv import load_dotenv
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    APIConnectOptions,
+    tokenize,
+    tts,
+    utils,
+)
+
+logger = logging.getLogger("agent")
+# Hit rates are logged next to the pipeline metrics, like the FAQ cache's
+metrics_logger = logging.getLogger("livekit.agents")
+
+# Matches what the session used before the cache, so sentences (and keys)
+# come out the same whether the cache is on or not
+MIN_SENTENCE_LEN = 2
+
+
+def sentence_tokenizer() -> tokenize.SentenceTokenizer:
+    """The tokenizer sentences are split with, at runtime and in prewarm."""
+    return tokenize.basic.SentenceTokenizer(min_sentence_len=MIN_SENTENCE_LEN)
+
+
+@dataclass
+class CachedAudio:
+    pcm: bytes
+    sample_rate: int
+    num_channels: int
+
+
+class TtsAudioCache:
+    """Size-bounded LRU cache of PCM audio in ``directory``."""
+
+    def __init__(self, directory: Path, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(voice: str, style: str | None, sample_rate: int, text: str) -> str:
+        identity = json.dumps([voice, style, sample_rate, text.strip()])
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.wav"
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def get(self, key: str) -> CachedAudio | None:
+        path = self._path(key)
+        try:
+            with wave.open(str(path), "rb") as f:
+                audio = CachedAudio(
+                    f.readframes(f.getnframes()), f.getframerate(), f.getnchannels()
+                )
+            # Recently played files are the last to be evicted
+            os.utime(path)
+        except (FileNotFoundError, EOFError, wave.Error):
+            # Missing, or deleted by another process's eviction mid-read
+            self.misses += 1
+            return None
+        self.hits += 1
+        return audio
+
+    def put(self, key: str, audio: CachedAudio) -> None:
+        # Written under a temporary name so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, wave.open(raw, "wb") as f:
+                f.setnchannels(audio.num_channels)
+                f.setsampwidth(2)
+                f.setframerate(audio.sample_rate)
+                f.writeframes(audio.pcm)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self) -> list[os.DirEntry]:
+        with os.scandir(self.directory) as it:
+            return [entry for entry in it if entry.name.endswith(".wav")]
+
+    def _evict(self) -> None:
+        # Rescanned every time, since other processes write here too
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def log_stats(self, logger: logging.Logger | None = None) -> None:
+        lookups = self.hits + self.misses
+        (logger or metrics_logger).info(
+            "TTS cache metrics",
+            extra={
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 2) if lookups else 0.0,
+                "evictions": self.evictions,
+            },
+        )
+
+
+class CachedTTS(tts.TTS):
+    """Non-streaming TTS that answers repeated sentences from ``cache``."""
+
+    def __init__(
+        self,
+        wrapped: tts.TTS,
+        cache: TtsAudioCache,
+        *,
+        voice: str,
+        style: str | None = None,
+    ) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=wrapped.sample_rate,
+            num_channels=wrapped.num_channels,
+        )
+        self.wrapped = wrapped
+        self.cache = cache
+        self.voice = voice
+        self.style = style
+
+    @property
+    def model(self) -> str:
+        return self.wrapped.model
+
+    @property
+    def provider(self) -> str:
+        return self.wrapped.provider
+
+    def key(self, text: str) -> str:
+        return self.cache.key(self.voice, self.style, self.sample_rate, text)
+
+    def synthesize(
+        self,
+        text: str,
+        *,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> tts.ChunkedStream:
+        return _CachedChunkedStream(
+            tts=self, input_text=text, conn_options=conn_options
+        )
+
+    def prewarm(self) -> None:
+        self.wrapped.prewarm()
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+
+
+class _CachedChunkedStream(tts.ChunkedStream):
+    def __init__(
+        self, *, tts: CachedTTS, input_text: str, conn_options: APIConnectOptions
+    ) -> None:
+        # Retries are left to the wrapped TTS; retrying here could replay
+        # audio that was already streamed through
+        super().__init__(
+            tts=tts,
+            input_text=input_text,
+            conn_options=APIConnectOptions(max_retry=0, timeout=conn_options.timeout),
+        )
+        self._tts: CachedTTS = tts
+        self._wrapped_conn_options = conn_options
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        key = self._tts.key(self.input_text)
+        cached = await asyncio.to_thread(self._tts.cache.get, key)
+        if cached is not None:
+            output_emitter.initialize(
+                request_id=utils.shortuuid(),
+                sample_rate=cached.sample_rate,
+                num_channels=cached.num_channels,
+                mime_type="audio/pcm",
+            )
+            output_emitter.push(cached.pcm)
+            output_emitter.flush()
+            return
+
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=self._tts.sample_rate,
+            num_channels=self._tts.num_channels,
+            mime_type="audio/pcm",
+        )
+        chunks = []
+        async with self._tts.wrapped.synthesize(
+            self.input_text, conn_options=self._wrapped_conn_options
+        ) as stream:
+            async for audio in stream:
+                data = audio.frame.data.tobytes()
+                chunks.append(data)
+                output_emitter.push(data)
+        output_emitter.flush()
+
+        # Only complete syntheses get here; an interrupted one is cancelled
+        # above and never cached
+        if chunks:
+            audio = CachedAudio(
+                b"".join(chunks), self._tts.sample_rate, self._tts.num_channels
+            )
+            await asyncio.to_thread(self._tts.cache.put, key, audio)
+
+
+async def split_sentences(
+    text: str, tokenizer: tokenize.SentenceTokenizer | None = None
+) -> list[str]:
+    """Sentences of ``text`` exactly as ``tts.StreamAdapter`` would send them."""
+    stream = (tokenizer or sentence_tokenizer()).stream()
+    stream.push_text(text)
+    stream.end_input()
+    sentences = [ev.token.strip() async for ev in stream]
+    await stream.aclose()
+    return [sentence for sentence in sentences if sentence]
+
+
+async def prewarm_cache(
+    cached_tts: CachedTTS, texts: Iterable[str], concurrency: int = 4
+) -> tuple[int, int]:
+    """Synthesize every sentence of ``texts`` that isn't cached yet.
+
+    Returns how many sentences were synthesized and how many were already
+    in the cache.
+    """
+    sentences: dict[str, None] = {}
+    for text in texts:
+        sentences.update(dict.fromkeys(await split_sentences(text)))
+    missing = [s for s in sentences if cached_tts.key(s) not in cached_tts.cache]
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def synthesize(sentence: str) -> None:
+        async with semaphore, cached_tts.synthesize(sentence) as stream:
+            async for _ in stream:
+                pass
+
+    await asyncio.gather(*(synthesize(sentence) for sentence in missing))
+    return len(missing), len(sentences) - len(missing)
+
+
+def cache_from_env() -> TtsAudioCache | None:
+    """The cache configured by ``TTS_CACHE``, ``TTS_CACHE_DIR`` and
+    ``TTS_CACHE_MAX_MB``, or None if it is disabled."""
+    if os.getenv("TTS_CACHE") != "1":
+        return None
+    return TtsAudioCache(
+        Path(os.getenv("TTS_CACHE_DIR") or "tts_cache"),
+        max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB") or 256) * 1024 * 1024),
+    )
+
+
+async def _prewarm(faq_path: Path, cache: TtsAudioCache, concurrency: int) -> None:
+    import aiohttp
+    from livekit.plugins import murf
+
+    # Imported here because agent.py itself imports this module
+    from agent import RECAP_CLOSING, TTS_STYLE, TTS_VOICE
+
+    with open(faq_path) as f:
+        faqs = json.load(f).get("faqs", [])
+    async with aiohttp.ClientSession() as http_session:
+        cached_tts = CachedTTS(
+            murf.TTS(voice=TTS_VOICE, style=TTS_STYLE, http_session=http_session),
+            cache,
+            voice=TTS_VOICE,
+            style=TTS_STYLE,
+        )
+        synthesized, cached = await prewarm_cache(
+            cached_tts, [*(faq["answer"] for faq in faqs), RECAP_CLOSING], concurrency
+        )
+    print(
+        f"Synthesized {synthesized} sentence(s), {cached} already cached; "
+        f"{cache.size() / 1024 / 1024:.1f} MB in {cache.directory}"
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    load_dotenv(".env.local")
+    parser = argparse.ArgumentParser(description="Manage the on-disk TTS cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+    prewarm = commands.add_parser(
+        "prewarm", help="synthesize every FAQ answer into the cache"
+    )
+    prewarm.add_argument(
+        "--faq", type=Path, default=Path(__file__).parent / "company_faq.json"
+    )
+    prewarm.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(os.getenv("TTS_CACHE_DIR") or "tts_cache"),
+    )
+    prewarm.add_argument(
+        "--max-mb", type=float, default=float(os.getenv("TTS_CACHE_MAX_MB") or 256)
+    )
+    prewarm.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    cache = TtsAudioCache(args.cache_dir, max_bytes=int(args.max_mb * 1024 * 1024))
+    asyncio.run(_prewarm(args.faq, cache, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Per-turn latency histograms for the voice pipeline and the agent's tools.
+
+``metrics.log_metrics`` logs every pipeline event and ``UsageCollector``
+only sums usage, so neither answers "what is our p95 time to first audio?".
+The histograms below are fed from ``metrics_collected`` events and from
+timing around the function tools, labelled by room, and exported through
+the worker's Prometheus endpoint::
+
+    METRICS_PORT=9100 PROMETHEUS_MULTIPROC_DIR=/tmp/agent-metrics \\
+        uv run src/agent.py start
+    curl localhost:9100/metrics
+
+Sessions run in separate job processes, so ``PROMETHEUS_MULTIPROC_DIR``
+must be set (to an empty, existing directory) in the environment the
+worker is started from; ``prometheus_client`` only reads it at import.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import time
+from typing import Any, Callable, TypeVar
+
+from livekit.agents import get_job_context
+from livekit.agents.metrics import (
+    AgentMetrics,
+    EOUMetrics,
+    LLMMetrics,
+    STTMetrics,
+    TTSMetrics,
+)
+from prometheus_client import Counter, Histogram
+
+from loop_watchdog import tool_running
+
+# Pipeline stages take tens of milliseconds to seconds, tools far less
+PIPELINE_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+TOOL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+TOKEN_BUCKETS = (250, 500, 1000, 2000, 3000, 4000, 6000, 8000, 12000, 16000, 32000)
+
+STT_DURATION = Histogram(
+    "sdr_agent_stt_duration_seconds",
+    "Time to transcribe an utterance with a non-streaming STT",
+    ["room"],
+    buckets=PIPELINE_BUCKETS,
+)
+TRANSCRIPTION_DELAY = Histogram(
+    "sdr_agent_stt_transcription_delay_seconds",
+    "Delay between the end of speech and the final transcript",
+    ["room"],
+    buckets=PIPELINE_BUCKETS,
+)
+END_OF_UTTERANCE_DELAY = Histogram(
+    "sdr_agent_end_of_utterance_delay_seconds",
+    "Delay between the end of speech and the decision that the turn ended",
+    ["room"],
+    buckets=PIPELINE_BUCKETS,
+)
+LLM_TTFT = Histogram(
+    "sdr_agent_llm_ttft_seconds",
+    "LLM time to first token",
+    ["room"],
+    buckets=PIPELINE_BUCKETS,
+)
+LLM_PROMPT_TOKENS = Histogram(
+    "sdr_agent_llm_prompt_tokens",
+    "Prompt tokens of each LLM request",
+    ["room"],
+    buckets=TOKEN_BUCKETS,
+)
+TTS_TTFB = Histogram(
+    "sdr_agent_tts_ttfb_seconds",
+    "TTS time to first audio byte",
+    ["room"],
+    buckets=PIPELINE_BUCKETS,
+)
+TOOL_DURATION = Histogram(
+    "sdr_agent_tool_duration_seconds",
+    "Time spent in each function tool",
+    ["room", "tool"],
+    buckets=TOOL_BUCKETS,
+)
+FAQ_ANSWERS = Counter(
+    "sdr_agent_faq_answers",
+    "FAQ lookups by how they were answered: spoken directly or through the LLM",
+    ["room", "path"],
+)
+FAQ_ANSWER_DELAY = Histogram(
+    "sdr_agent_faq_answer_delay_seconds",
+    "Delay between an FAQ lookup and the first audio of its answer",
+    ["room", "path"],
+    buckets=PIPELINE_BUCKETS,
+)
+FAQ_PREFETCH_LOOKUPS = Counter(
+    "sdr_agent_faq_prefetch_lookups",
+    "FAQ searches answered from transcript prefetch (hit) or run on demand (miss)",
+    ["room", "result"],
+)
+FAQ_PREFETCH_SAVED = Histogram(
+    "sdr_agent_faq_prefetch_saved_seconds",
+    "Search time a prefetched FAQ result saved its lookup",
+    ["room"],
+    buckets=TOOL_BUCKETS,
+)
+
+
+def current_room() -> str:
+    """The ``room`` log context field of the running job, or "" outside one."""
+    try:
+        return str(get_job_context().log_context_fields.get("room", ""))
+    except RuntimeError:
+        return ""
+
+
+def observe(ev_metrics: AgentMetrics, room: str) -> None:
+    """Record the latencies carried by one ``metrics_collected`` event."""
+    if isinstance(ev_metrics, EOUMetrics):
+        END_OF_UTTERANCE_DELAY.labels(room).observe(ev_metrics.end_of_utterance_delay)
+        TRANSCRIPTION_DELAY.labels(room).observe(ev_metrics.transcription_delay)
+    elif isinstance(ev_metrics, LLMMetrics):
+        # A request cancelled before its first token reports a negative TTFT
+        if ev_metrics.ttft >= 0:
+            LLM_TTFT.labels(room).observe(ev_metrics.ttft)
+        if ev_metrics.prompt_tokens:
+            LLM_PROMPT_TOKENS.labels(room).observe(ev_metrics.prompt_tokens)
+    elif isinstance(ev_metrics, TTSMetrics):
+        if ev_metrics.ttfb >= 0:
+            TTS_TTFB.labels(room).observe(ev_metrics.ttfb)
+    elif isinstance(ev_metrics, STTMetrics) and not ev_metrics.streamed:
+        STT_DURATION.labels(room).observe(ev_metrics.duration)
+
+
+class FaqAnswerTimer:
+    """Times an FAQ lookup to the moment its answer starts playing.
+
+    ``start`` is called by ``lookup_faq``; ``answer_started`` when the
+    agent next starts speaking, whichever path produced the answer.
+    """
+
+    def __init__(self) -> None:
+        self._pending: tuple[float, str, str] | None = None
+
+    def start(self, path: str, room: str) -> None:
+        FAQ_ANSWERS.labels(room, path).inc()
+        self._pending = (time.perf_counter(), path, room)
+
+    def answer_started(self) -> None:
+        if self._pending is None:
+            return
+        started, path, room = self._pending
+        self._pending = None
+        FAQ_ANSWER_DELAY.labels(room, path).observe(time.perf_counter() - started)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def timed_tool(fn: F) -> F:
+    """Record the duration of an async function tool in ``TOOL_DURATION``,
+    and mark it as running for the loop watchdog.
+
+    Apply it below ``@function_tool``; the wrapper keeps the tool's
+    signature and docstring, which the LLM schema is built from.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with tool_running(fn.__name__):
+                return await fn(*args, **kwargs)
+        finally:
+            TOOL_DURATION.labels(current_room(), fn.__name__).observe(
+                time.perf_counter() - start
+            )
+
+    return wrapper
+
+
+def metrics_port() -> int | None:
+    """Port for the worker's Prometheus endpoint, from ``METRICS_PORT``."""
+    port = os.getenv("METRICS_PORT")
+    return int(port) if port else None
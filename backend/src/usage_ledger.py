@@ -0,0 +1,356 @@
+"""Usage of each call, as rows in an append-only ledger.
+
+``UsageCollector`` only sums a session's usage for one log line at
+shutdown, so LLM tokens, TTS characters and STT audio per room, day or
+tenant could only be recovered by scraping logs. ``UsageLedger`` collects
+the same ``metrics_collected`` events and appends what the call used to a
+CSV ledger while it runs: every ``flush_interval`` seconds one row per
+component (``llm``, ``stt``, ``tts``) and model that was used since the
+last flush, written in one append off the event loop, plus a last flush
+at shutdown. A call that crashes loses at most one interval.
+
+The ledger rolls over daily (``usage-YYYY-MM-DD.csv``, by UTC date) and is
+shared by every job process on the host; each batch goes out in a single
+``write``, so rows from concurrent calls don't interleave. Summarize it
+with::
+
+    uv run src/usage_ledger.py report --by date,model
+    uv run src/usage_ledger.py report --by room --since 2026-10-01
+
+Costs come from a price table (``DEFAULT_PRICES``, or a JSON file passed
+with ``--prices``) that maps each model to its prices per million prompt,
+cached and completion tokens, per million characters and per minute of
+audio.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from livekit.agents.metrics import AgentMetrics, LLMMetrics, STTMetrics, TTSMetrics
+
+logger = logging.getLogger("agent")
+
+COLUMNS = (
+    "timestamp",
+    "date",
+    "room",
+    "tenant",
+    "kind",
+    "model",
+    "prompt_tokens",
+    "cached_tokens",
+    "completion_tokens",
+    "characters",
+    "audio_seconds",
+)
+QUANTITIES = COLUMNS[6:]
+GROUPS = ("date", "room", "tenant", "kind", "model")
+
+# USD list prices; pass --prices with a JSON file of the same shape to use
+# the ones on your contracts
+DEFAULT_PRICES = {
+    "gemini-2.5-flash": {
+        "prompt_per_million": 0.30,
+        "cached_per_million": 0.03,
+        "completion_per_million": 2.50,
+    },
+    "nova-3": {"audio_per_minute": 0.0077},
+    "FALCON": {"audio_per_minute": 0.01},
+}
+
+
+def ledger_path(directory: Path, date: str) -> Path:
+    return directory / f"usage-{date}.csv"
+
+
+def _model(ev_metrics: AgentMetrics) -> str:
+    metadata = getattr(ev_metrics, "metadata", None)
+    return (metadata.model_name if metadata else None) or ev_metrics.label
+
+
+class UsageLedger:
+    """Collects a session's usage and appends it to the ledger in batches."""
+
+    def __init__(
+        self,
+        directory: Path,
+        room: str,
+        tenant: str = "",
+        flush_interval: float = 30.0,
+    ) -> None:
+        self.directory = directory
+        self.room = room
+        self.tenant = tenant
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        # Usage since the last flush, by (kind, model)
+        self._pending: defaultdict[tuple[str, str], list[float]] = defaultdict(
+            lambda: [0.0] * len(QUANTITIES)
+        )
+        self._task: asyncio.Task | None = None
+
+    def collect(self, ev_metrics: AgentMetrics) -> None:
+        if isinstance(ev_metrics, LLMMetrics):
+            usage = self._pending["llm", _model(ev_metrics)]
+            usage[0] += ev_metrics.prompt_tokens
+            usage[1] += ev_metrics.prompt_cached_tokens
+            usage[2] += ev_metrics.completion_tokens
+        elif isinstance(ev_metrics, TTSMetrics):
+            usage = self._pending["tts", _model(ev_metrics)]
+            usage[3] += ev_metrics.characters_count
+            usage[4] += ev_metrics.audio_duration
+        elif isinstance(ev_metrics, STTMetrics):
+            usage = self._pending["stt", _model(ev_metrics)]
+            usage[4] += ev_metrics.audio_duration
+
+    def start(self) -> None:
+        """Start flushing every ``flush_interval`` on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="usage-ledger")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def take_rows(self, now: float | None = None) -> list[list[str]]:
+        """The ledger rows of the usage since the last call, which is reset."""
+        now = time.time() if now is None else now
+        date = datetime.fromtimestamp(now, timezone.utc).date().isoformat()
+        pending, self._pending = (
+            self._pending,
+            defaultdict(self._pending.default_factory),
+        )
+        return [
+            [f"{now:.3f}", date, self.room, self.tenant, kind, model]
+            + [str(int(q)) if q == int(q) else f"{q:.3f}" for q in usage]
+            for (kind, model), usage in pending.items()
+            if any(usage)
+        ]
+
+    async def flush(self) -> None:
+        rows = self.take_rows()
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(self._append, rows)
+        except Exception:
+            logger.exception(f"Failed to write {len(rows)} usage row(s)")
+
+    async def aclose(self) -> None:
+        """Stop the periodic flush and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    def _append(self, rows: list[list[str]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = ledger_path(self.directory, rows[0][1])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        # Two processes starting a file may both write the header; readers
+        # skip header rows wherever they are
+        if not path.exists() or path.stat().st_size == 0:
+            writer.writerow(COLUMNS)
+        writer.writerows(rows)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(buffer.getvalue())
+        self.rows_written += len(rows)
+
+
+def ledger_from_env(room: str, tenant: str = "") -> UsageLedger | None:
+    """The ledger configured by ``USAGE_LEDGER``, ``USAGE_LEDGER_DIR`` and
+    ``USAGE_FLUSH_INTERVAL``, or None when it is turned off."""
+    if os.getenv("USAGE_LEDGER", "1") != "1":
+        return None
+    return UsageLedger(
+        Path(os.getenv("USAGE_LEDGER_DIR") or "usage"),
+        room=room,
+        tenant=tenant,
+        flush_interval=float(os.getenv("USAGE_FLUSH_INTERVAL") or 30),
+    )
+
+
+def ledger_files(
+    directory: Path, since: str | None = None, until: str | None = None
+) -> list[Path]:
+    """The ledger's daily files, from ``since`` to ``until`` (inclusive)."""
+    files = []
+    for path in sorted(directory.glob("usage-*.csv")):
+        date = path.stem.removeprefix("usage-")
+        if (since is None or date >= since) and (until is None or date <= until):
+            files.append(path)
+    return files
+
+
+Totals = dict[tuple[str, ...], list[float]]
+
+
+def _aggregate_file(path: Path, by: Sequence[str]) -> Totals:
+    """Usage in the ledger file ``path``, summed by the ``by`` columns and
+    the model."""
+    columns = [COLUMNS.index(column) for column in (*by, "model")]
+    first = len(COLUMNS) - len(QUANTITIES)
+    totals: Totals = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) != len(COLUMNS) or row[0] == "timestamp":
+                continue
+            key = tuple([row[i] for i in columns])
+            usage = totals.get(key)
+            if usage is None:
+                usage = totals[key] = [0.0] * len(QUANTITIES)
+            # Most of a row's quantities are zero, and comparing is cheaper
+            # than parsing
+            prompt, cached, completion, characters, audio = row[first:]
+            if prompt != "0":
+                usage[0] += float(prompt)
+                usage[1] += float(cached)
+            if completion != "0":
+                usage[2] += float(completion)
+            if characters != "0":
+                usage[3] += float(characters)
+            if audio != "0":
+                usage[4] += float(audio)
+    return totals
+
+
+def aggregate(
+    files: Sequence[Path], by: Sequence[str], workers: int | None = None
+) -> dict[tuple[str, ...], dict[str, list[float]]]:
+    """Usage summed by the ``by`` columns, then by model (for pricing).
+
+    The daily files are summed in parallel, by up to ``workers`` processes
+    (one per CPU by default).
+    """
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            per_file = list(pool.map(_aggregate_file, files, [by] * len(files)))
+    else:
+        per_file = [_aggregate_file(path, by) for path in files]
+
+    totals: dict[tuple[str, ...], dict[str, list[float]]] = {}
+    for file_totals in per_file:
+        for (*key, model), usage in file_totals.items():
+            by_model = totals.setdefault(tuple(key), {})
+            if model in by_model:
+                by_model[model] = [a + b for a, b in zip(by_model[model], usage)]
+            else:
+                by_model[model] = usage
+    return totals
+
+
+def load_prices(path: Path | None) -> dict[str, dict[str, float]]:
+    if path is None:
+        return DEFAULT_PRICES
+    with open(path) as f:
+        return json.load(f)
+
+
+def cost(usage: Sequence[float], prices: dict[str, float]) -> float:
+    prompt, cached, completion, characters, audio_seconds = usage
+    return (
+        (prompt - cached) * prices.get("prompt_per_million", 0.0) / 1e6
+        + cached * prices.get("cached_per_million", 0.0) / 1e6
+        + completion * prices.get("completion_per_million", 0.0) / 1e6
+        + characters * prices.get("characters_per_million", 0.0) / 1e6
+        + audio_seconds * prices.get("audio_per_minute", 0.0) / 60
+    )
+
+
+def report(
+    totals: dict[tuple[str, ...], dict[str, list[float]]],
+    prices: dict[str, dict[str, float]],
+) -> tuple[list[dict], set[str]]:
+    """One summary per group, with its estimated cost, and the models that
+    have no price."""
+    unpriced = set()
+    summaries = []
+    for key, by_model in sorted(totals.items()):
+        usage = [sum(values) for values in zip(*by_model.values())]
+        total_cost = 0.0
+        for model, model_usage in by_model.items():
+            if model in prices:
+                total_cost += cost(model_usage, prices[model])
+            else:
+                unpriced.add(model)
+        summaries.append(
+            {"key": list(key), **dict(zip(QUANTITIES, usage)), "cost": total_cost}
+        )
+    return summaries, unpriced
+
+
+def format_report(by: Sequence[str], summaries: list[dict], unpriced: set[str]) -> str:
+    header = [*by, "llm tokens in", "cached", "out", "tts chars", "audio s", "cost $"]
+    lines = ["\t".join(header)]
+    for summary in summaries:
+        lines.append(
+            "\t".join(
+                [
+                    *summary["key"],
+                    f"{summary['prompt_tokens']:.0f}",
+                    f"{summary['cached_tokens']:.0f}",
+                    f"{summary['completion_tokens']:.0f}",
+                    f"{summary['characters']:.0f}",
+                    f"{summary['audio_seconds']:.1f}",
+                    f"{summary['cost']:.4f}",
+                ]
+            )
+        )
+    if unpriced:
+        lines.append(f"No price for: {', '.join(sorted(unpriced))}")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Summarize the usage ledger")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary = commands.add_parser("report", help="usage and cost by group")
+    summary.add_argument("--dir", type=Path, default=Path("usage"))
+    summary.add_argument(
+        "--by", default="date", help=f"comma-separated columns of {', '.join(GROUPS)}"
+    )
+    summary.add_argument("--since", help="first date (YYYY-MM-DD)")
+    summary.add_argument("--until", help="last date (YYYY-MM-DD)")
+    summary.add_argument("--prices", type=Path, help="JSON price table by model")
+    summary.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args(argv)
+
+    by = [column.strip() for column in args.by.split(",") if column.strip()]
+    unknown = [column for column in by if column not in GROUPS]
+    if unknown:
+        raise SystemExit(
+            f"Can't group by {', '.join(unknown)}; use {', '.join(GROUPS)}"
+        )
+    files = ledger_files(args.dir, args.since, args.until)
+    if not files:
+        raise SystemExit(f"No usage ledger files in {args.dir}")
+    summaries, unpriced = report(aggregate(files, by), load_prices(args.prices))
+    if args.json:
+        print(
+            json.dumps({"summaries": summaries, "unpriced": sorted(unpriced)}, indent=2)
+        )
+    else:
+        print(format_report(by, summaries, unpriced))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Worker load reporting and admission control.
+
+LiveKit's default load is the host's CPU use alone, and the worker accepts
+every job it is offered while under the threshold. A host whose calls keep
+the VAD, noise cancellation and the turn detector busy can sit just under
+it, or pass it between two load updates, and keep taking calls that then
+slow down every other call on the host.
+
+``AdmissionControl`` reports a load made of two parts, each scaled so it
+reaches the load threshold at its own limit, and the load is the higher:
+
+- active sessions, against ``MAX_SESSIONS`` (no cap when unset)
+- CPU use of the host (or its cgroup), as in LiveKit's default
+
+While the load is at or over ``WORKER_LOAD_THRESHOLD`` the worker reports
+itself full and LiveKit stops offering it jobs. Offers that arrive before
+that shows (several calls in one load update) are rejected by the request
+function, and the dispatcher offers them to another worker instead. Every
+job it accepts counts as a session from then on, not from the next update.
+
+Event-loop lag is not part of the load. Calls run in their own job
+processes, so the worker process's loop stays idle however busy they are;
+a call's own loop is watched from inside its process (``loop_watchdog``).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any
+
+from livekit.agents import JobRequest, utils
+from livekit.agents.utils.hw import get_cpu_monitor
+from livekit.agents.worker import UPDATE_LOAD_INTERVAL
+
+logger = logging.getLogger("agent")
+
+
+class AdmissionControl:
+    """The worker's ``load_fnc`` (``load``) and ``request_fnc`` (``request``)."""
+
+    def __init__(
+        self,
+        max_sessions: int | None = None,
+        threshold: float = 0.7,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.threshold = threshold
+        self.sessions = 0
+        self.rejected = 0
+        # Jobs accepted but not launched yet, so not counted in sessions
+        self._admitting = 0
+        self._cpu = utils.MovingAverage(5)
+        self._lock = threading.Lock()
+        self._cpu_thread: threading.Thread | None = None
+
+    @property
+    def cpu(self) -> float:
+        with self._lock:
+            return self._cpu.get_avg()
+
+    def components(self) -> dict[str, float]:
+        """Each part of the load, scaled to reach the threshold at its limit."""
+        parts = {"cpu": self.cpu}
+        if self.max_sessions:
+            sessions = self.sessions + self._admitting
+            parts["sessions"] = self.threshold * sessions / self.max_sessions
+        return parts
+
+    def current_load(self) -> float:
+        return max(self.components().values())
+
+    def update(self, sessions: int) -> float:
+        """Record the active ``sessions``, returning the load."""
+        self.sessions = sessions
+        return self.current_load()
+
+    def load(self, worker: Any) -> float:
+        if self._cpu_thread is None:
+            self._cpu_thread = threading.Thread(
+                target=self._sample_cpu, daemon=True, name="sdr_agent_cpu_load"
+            )
+            self._cpu_thread.start()
+        return self.update(len(worker.active_jobs))
+
+    def _sample_cpu(self) -> None:
+        monitor = get_cpu_monitor()
+        while True:
+            cpu = monitor.cpu_percent(interval=UPDATE_LOAD_INTERVAL)
+            with self._lock:
+                self._cpu.add_sample(cpu)
+
+    def admits(self) -> bool:
+        if self.max_sessions and self.sessions + self._admitting >= self.max_sessions:
+            return False
+        return self.current_load() < self.threshold
+
+    async def request(self, job_request: JobRequest) -> None:
+        if not self.admits():
+            self.rejected += 1
+            parts = ", ".join(f"{k} {v:.2f}" for k, v in self.components().items())
+            logger.warning(
+                f"Rejecting job for room {job_request.room.name}: worker full "
+                f"({self.sessions} sessions; load {parts})"
+            )
+            await job_request.reject()
+            return
+        self._admitting += 1
+        try:
+            # Returns once the job is running in its process
+            await job_request.accept()
+            # Counted as a session until the next load update counts it
+            # among the worker's active jobs
+            self.sessions += 1
+        finally:
+            self._admitting -= 1
+
+
+def admission_from_env() -> AdmissionControl:
+    """The admission control configured by ``MAX_SESSIONS`` and
+    ``WORKER_LOAD_THRESHOLD``."""
+    max_sessions = os.getenv("MAX_SESSIONS")
+    return AdmissionControl(
+        max_sessions=int(max_sessions) if max_sessions else None,
+        threshold=float(os.getenv("WORKER_LOAD_THRESHOLD") or 0.7),
+    )
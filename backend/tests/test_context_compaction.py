@@ -0,0 +1,207 @@
+import asyncio
+import json
+
+from livekit.agents import AgentSession, llm
+
+from agent import Assistant
+from context_compaction import ContextCompactor, estimate_tokens, lead_note
+from stub_plugins import (
+    ScriptedCaller,
+    SimulatedSpeaker,
+    StubLLM,
+    StubSTT,
+    StubTTS,
+    Turn,
+)
+
+FAQ_OUTPUT = (
+    "Q: What are the pricing details?\nA: Razorpay charges 2% per transaction. "
+    + "There are no setup fees. " * 10
+    + "\n\nQ: Do you have a free tier?\nA: Yes! You only pay transaction fees."
+)
+
+
+def _long_call(turns: int) -> llm.ChatContext:
+    ctx = llm.ChatContext()
+    ctx.add_message(role="system", content="You are a Razorpay SDR.")
+    ctx.add_message(role="assistant", content="Hi! What brought you here today?")
+    for i in range(turns):
+        ctx.add_message(role="user", content=f"Question {i} about pricing?")
+        call_id = f"call_{i}"
+        ctx.items.append(
+            llm.FunctionCall(
+                call_id=call_id,
+                name="lookup_faq",
+                arguments=json.dumps({"query": "pricing"}),
+            )
+        )
+        ctx.items.append(
+            llm.FunctionCallOutput(
+                call_id=call_id, name="lookup_faq", output=FAQ_OUTPUT, is_error=False
+            )
+        )
+        ctx.add_message(role="assistant", content=f"Answer {i}: it's 2%.")
+    return ctx
+
+
+def test_old_turns_and_tool_outputs_are_compacted() -> None:
+    """Only recent turns are kept, and only the current one in full."""
+    ctx = _long_call(10)
+    compactor = ContextCompactor(max_turns=3)
+
+    compacted = compactor.compact(ctx, {"name": "Priya", "email": None})
+    items = compacted.items
+
+    assert items[0].text_content == "You are a Razorpay SDR."
+    # The lead note comes right before the current turn, as user context
+    assert items[-5].role == "user"
+    assert '"name": "Priya"' in items[-5].text_content
+    assert "email" not in items[-5].text_content
+    assert items[-4].text_content == "Question 9 about pricing?"
+    users = [i.text_content for i in items if i.type == "message" and i.role == "user"]
+    assert users == [
+        "Question 7 about pricing?",
+        "Question 8 about pricing?",
+        items[-5].text_content,
+        "Question 9 about pricing?",
+    ]
+
+    outputs = [i.output for i in items if i.type == "function_call_output"]
+    assert outputs[-1] == FAQ_OUTPUT
+    assert (
+        outputs[:-1]
+        == [
+            '[Earlier FAQ lookup matched "What are the pricing details?"; '
+            '"Do you have a free tier?". Look it up again for details.]'
+        ]
+        * 2
+    )
+    calls = {i.call_id for i in items if i.type == "function_call"}
+    assert calls == {i.call_id for i in items if i.type == "function_call_output"}
+
+    stats = compactor.last_stats
+    assert stats.items == len(ctx.items) and stats.kept_items == len(items)
+    assert stats.kept_tokens == estimate_tokens(items) < stats.tokens / 3
+    # The agent's own history is untouched
+    assert len(ctx.items) == 42
+    assert ctx.items[4].output == FAQ_OUTPUT
+
+
+def _summary(item: llm.ChatItem) -> str:
+    if item.type == "message":
+        return item.text_content
+    if item.type == "function_call":
+        return item.call_id
+    return item.output
+
+
+def test_window_moves_in_blocks_and_keeps_the_prefix() -> None:
+    """The window start only moves every max_turns // 2 turns."""
+    compactor = ContextCompactor(max_turns=4)
+    lead = {"name": "Priya"}
+
+    def first_user(turns: int) -> str:
+        items = compactor.compact(_long_call(turns), lead).items
+        return next(i.text_content for i in items if i.role == "user")
+
+    assert [first_user(n) for n in (4, 5, 6, 7, 8)] == [
+        "Question 0 about pricing?",
+        "Question 2 about pricing?",
+        "Question 2 about pricing?",
+        "Question 4 about pricing?",
+        "Question 4 about pricing?",
+    ]
+
+    # The request for turn 6 repeats the one for turn 5 up to its last turn
+    before = [_summary(i) for i in compactor.compact(_long_call(5), lead).items]
+    after = [_summary(i) for i in compactor.compact(_long_call(6), lead).items]
+    common = before.index("Question 4 about pricing?") - 1
+    assert after[:common] == before[:common]
+
+
+def test_new_lead_fields_keep_the_gemini_system_instruction() -> None:
+    """The lead note never lands in system_instruction, whatever it holds."""
+    compactor = ContextCompactor(max_turns=4)
+    before, before_format = compactor.compact(_long_call(5), {}).to_provider_format(
+        "google"
+    )
+    after, after_format = compactor.compact(
+        _long_call(6), {"name": "Priya"}
+    ).to_provider_format("google")
+
+    assert after_format.system_messages == before_format.system_messages
+    assert after_format.system_messages == ["You are a Razorpay SDR."]
+
+    def turn_of(turns: list[dict], text: str) -> int:
+        return next(i for i, t in enumerate(turns) if {"text": text} in t["parts"])
+
+    # Everything before the earlier request's current turn is repeated
+    common = turn_of(before, "Question 4 about pricing?")
+    assert after[:common] == before[:common]
+    current = after[turn_of(after, "Question 5 about pricing?")]
+    assert '"name": "Priya"' in current["parts"][0]["text"]
+
+
+def test_short_calls_are_left_whole() -> None:
+    """Within the window nothing but old, long tool outputs changes."""
+    ctx = _long_call(2)
+    compacted = ContextCompactor(max_turns=8).compact(ctx, {})
+
+    assert len(compacted.items) == len(ctx.items)
+    assert compacted.items[1].text_content == "Hi! What brought you here today?"
+
+
+def test_lead_note_lists_captured_fields_only() -> None:
+    """Unset fields, ids and timestamps stay out of the note."""
+    assert lead_note({"name": None, "conversation_notes": []}) is None
+    note = lead_note({"name": "Priya", "company": "Acme", "role": None, "lead_id": "x"})
+    assert note.endswith('{"name": "Priya", "company": "Acme"}')
+
+    note = lead_note({"name": "Priya", "team_size": "40 people"}, ["team_size"])
+    captured, heard = note.split("\n")
+    assert captured.endswith('{"name": "Priya"}')
+    assert heard.startswith("Lead details heard but not confirmed")
+    assert heard.endswith('{"team_size": "40 people"}')
+
+
+async def test_llm_requests_get_the_compacted_context() -> None:
+    """The assistant's llm_node sends the compacted context to the LLM."""
+    script = [
+        Turn("Hi"),
+        Turn("I'm Priya", [("save_lead_info", {"field": "name", "value": "Priya"})]),
+        Turn("From Acme", [("save_lead_info", {"field": "company", "value": "Acme"})]),
+        Turn("Bye"),
+    ]
+    caller = ScriptedCaller(speech_seconds=0.1)
+    speaker = SimulatedSpeaker(speed=50)
+    stub_llm = StubLLM(script, ttft=0.01)
+    session = AgentSession(
+        stt=StubSTT(caller, delay=0.01),
+        llm=stub_llm,
+        tts=StubTTS(ttfb=0.01),
+        turn_detection="stt",
+        min_endpointing_delay=0.05,
+        resume_false_interruption=False,
+    )
+    session.input.audio = caller
+    session.output.audio = speaker
+    await session.start(Assistant(context_compactor=ContextCompactor(max_turns=1)))
+    try:
+        for turn in script:
+            caller.say(turn.text)
+            await asyncio.wait_for(speaker.replies.get(), 10)
+            await speaker.wait_for_playout()
+    finally:
+        await session.aclose()
+
+    last = stub_llm.requests[-1]
+    users = [
+        i.text_content for i in last.items if i.type == "message" and i.role == "user"
+    ]
+    assert users[-1] == "Bye" and len(users) == 2
+    assert '{"name": "Priya", "company": "Acme"}' in users[0]
+    assert not any(
+        "Lead details" in (i.text_content or "")
+        for i in last.items
+        if i.type == "message" and i.role == "system"
+    )
@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from agent import Assistant
+from faq_artifact import compile_artifact, load_artifact
+from faq_search import FaqIndex
+from faq_store import FaqStore
+
+FAQ_PATH = Path(__file__).parent.parent / "src" / "company_faq.json"
+
+
+@pytest.fixture
+def artifact_path(tmp_path: Path) -> Path:
+    path = tmp_path / "company_faq.faqkb"
+    compile_artifact(FAQ_PATH, path)
+    return path
+
+
+@pytest.mark.parametrize(
+    "query", ["pricing", "who is this for", "upi settlement bank", "quantum"]
+)
+def test_compiled_index_matches_in_memory_index(
+    artifact_path: Path, query: str
+) -> None:
+    """Searching the mapped postings ranks like the in-memory BM25 index."""
+    artifact = load_artifact(artifact_path, source=FAQ_PATH)
+    with open(FAQ_PATH) as f:
+        reference = FaqIndex(json.load(f)["faqs"])
+
+    compiled_hits = artifact.build_index("keyword").search(query)
+    reference_hits = reference.search(query)
+    assert [hit.faq for hit in compiled_hits] == [hit.faq for hit in reference_hits]
+    assert [hit.confidence for hit in compiled_hits] == pytest.approx(
+        [hit.confidence for hit in reference_hits], rel=1e-5
+    )
+
+
+def test_artifact_carries_metadata_and_vectors(artifact_path: Path) -> None:
+    """The company description and the semantic index come from the artifact."""
+    artifact = load_artifact(artifact_path, source=FAQ_PATH)
+    data = artifact.faq_data()
+    assert data["company_name"] == "Razorpay"
+    assert len(data["faqs"]) == 12
+
+    hits = artifact.build_index("semantic").search("integrating")
+    assert hits[0].faq["question"] == "How long does integration take?"
+
+
+def test_stale_or_invalid_artifacts_are_ignored(
+    artifact_path: Path, tmp_path: Path
+) -> None:
+    """An artifact built from another FAQ version is not used."""
+    edited = tmp_path / "company_faq.json"
+    edited.write_text(FAQ_PATH.read_text().replace("2%", "1.5%"))
+    assert load_artifact(artifact_path, source=edited) is None
+
+    garbage = tmp_path / "garbage.faqkb"
+    garbage.write_bytes(b"not an artifact")
+    assert load_artifact(garbage) is None
+    assert load_artifact(tmp_path / "missing.faqkb") is None
+
+
+async def test_assistant_answers_from_artifact(artifact_path: Path) -> None:
+    """lookup_faq works unchanged on top of the mapped artifact."""
+    artifact = load_artifact(artifact_path, source=FAQ_PATH)
+    store = FaqStore(artifact.faq_data(), artifact.build_index())
+    assistant = Assistant(faq_store=store)
+    assert "2% transaction fee" in await assistant.lookup_faq(None, "pricing")
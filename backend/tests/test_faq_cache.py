@@ -0,0 +1,61 @@
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from agent import Assistant
+from faq_cache import FaqResultCache
+
+FAQ_PATH = Path(__file__).parent.parent / "src" / "company_faq.json"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_normalize_ignores_case_order_and_filler() -> None:
+    """Rephrasings of the same question share one cache key."""
+    assert FaqResultCache.normalize("What's the PRICING of UPI?") == (
+        FaqResultCache.normalize("upi pricing")
+    )
+
+
+def test_lru_and_ttl_eviction() -> None:
+    """Entries are evicted least-recently-used first and expire after the TTL."""
+    clock = FakeClock()
+    cache = FaqResultCache(max_size=2, ttl=10.0, clock=clock)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+async def test_lookup_faq_served_from_cache(caplog: pytest.LogCaptureFixture) -> None:
+    """A repeated question is answered from the cache and counted as a hit."""
+    with open(FAQ_PATH) as f:
+        assistant = Assistant(faq_data=json.load(f))
+
+    first = await assistant.lookup_faq(None, "What are your prices?")
+    second = await assistant.lookup_faq(None, "prices, what are they")
+    assert first == second
+    assert assistant.faq_cache.hits == 1
+
+    assistant.faq_cache.invalidate()
+    assert len(assistant.faq_cache) == 0
+
+    with caplog.at_level(logging.INFO, logger="livekit.agents"):
+        assistant.faq_cache.log_stats()
+    assert caplog.records[-1].hits == 1
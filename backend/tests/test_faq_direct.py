@@ -0,0 +1,149 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from livekit.agents import AgentSession
+
+from agent import Assistant
+from faq_direct import DirectAnswerPolicy
+from faq_search import FaqHit, build_faq_index
+from faq_store import FaqStore
+from stub_plugins import (
+    ScriptedCaller,
+    SimulatedSpeaker,
+    StubLLM,
+    StubSTT,
+    StubTTS,
+    Turn,
+)
+from turn_metrics import FAQ_ANSWER_DELAY, FAQ_ANSWERS
+
+FAQ_PATH = Path(__file__).parents[1] / "src" / "company_faq.json"
+
+
+def _hit(question: str, confidence: float, score: float = 5.0) -> FaqHit:
+    return FaqHit({"question": question, "answer": "..."}, score, confidence)
+
+
+def test_only_confident_unambiguous_hits_qualify() -> None:
+    """A hit needs enough confidence and a clear lead over the runner-up."""
+    policy = DirectAnswerPolicy(min_confidence=0.8, min_margin=0.2)
+    free_tier = _hit("free tier", 0.59)
+
+    assert policy.choose("pricing", []) is None
+    assert policy.choose("pricing", [_hit("pricing", 0.7), free_tier]) is None
+    chosen = policy.choose("pricing", [_hit("pricing", 0.9), free_tier])
+    assert chosen.faq["question"] == "pricing"
+    assert policy.choose("who", [_hit("who", 1.0), _hit("secure", 0.97)]) is None
+    # Without a runner-up the floors decide
+    assert policy.choose("pricing", [_hit("pricing", 1.0)]).faq["question"] == (
+        "pricing"
+    )
+    assert policy.choose("pricing", [_hit("pricing", 1.0, 2.3)]) is None
+    # A low raw score is one rare word, not an answer
+    assert policy.choose("pricing", [_hit("pricing", 1.0, 2.3), free_tier]) is None
+    # Most of the question has to be in the entry
+    assert policy.choose("pricing in euros", [_hit("pricing", 0.9), free_tier]) is None
+
+
+@pytest.mark.parametrize(
+    ("query", "direct"),
+    [
+        ("team", False),
+        ("cost", False),
+        ("what does it cost", False),
+        ("hidden costs", False),
+        ("What are the pricing details?", True),
+        ("Do you have a free tier?", True),
+        # The only hit, with no runner-up to beat
+        ("how long does integration take", True),
+    ],
+)
+def test_generic_queries_are_not_spoken_directly(query: str, direct: bool) -> None:
+    """One-word and generic questions go to the LLM with the default policy."""
+    with open(FAQ_PATH) as f:
+        index = build_faq_index(json.load(f)["faqs"])
+    hit = DirectAnswerPolicy().choose(query, index.search(query, limit=2))
+    assert (hit is not None) is direct
+
+
+def test_spoken_answer_is_cut_at_a_sentence() -> None:
+    """Long answers keep whole sentences up to the budget."""
+    answer = "First sentence here. Second one follows! Third? Fourth and last."
+
+    assert DirectAnswerPolicy(max_chars=0).spoken(answer) == answer
+    assert DirectAnswerPolicy(max_chars=100).spoken(answer) == answer
+    assert DirectAnswerPolicy(max_chars=45).spoken(answer) == (
+        "First sentence here. Second one follows!"
+    )
+    assert DirectAnswerPolicy(max_chars=5).spoken(answer) == "First sentence here."
+
+
+def _count(metric, **labels) -> float:
+    return sum(
+        sample.value
+        for family in metric.collect()
+        for sample in family.samples
+        if sample.name.endswith(("_total", "_count"))
+        and all(sample.labels.get(k) == v for k, v in labels.items())
+    )
+
+
+async def test_confident_hit_skips_the_second_llm_request() -> None:
+    """The FAQ answer is spoken without asking the LLM to rephrase it."""
+    with open(FAQ_PATH) as f:
+        faq_data = json.load(f)
+    pricing = next(
+        faq["answer"] for faq in faq_data["faqs"] if "pricing" in faq["question"]
+    )
+    script = [
+        Turn("Hi"),
+        Turn("How much?", [("lookup_faq", {"query": "What are the pricing details?"})]),
+        Turn("What does it do?", [("lookup_faq", {"query": "What does Razorpay do?"})]),
+    ]
+    caller = ScriptedCaller(speech_seconds=0.1)
+    speaker = SimulatedSpeaker(speed=50)
+    stub_llm, stub_tts = StubLLM(script, ttft=0.01), StubTTS(ttfb=0.01)
+    session = AgentSession(
+        stt=StubSTT(caller, delay=0.01),
+        llm=stub_llm,
+        tts=stub_tts,
+        turn_detection="stt",
+        min_endpointing_delay=0.05,
+        resume_false_interruption=False,
+    )
+    session.input.audio = caller
+    session.output.audio = speaker
+    assistant = Assistant(
+        faq_store=FaqStore(faq_data, build_faq_index(faq_data["faqs"])),
+        direct_answers=DirectAnswerPolicy(max_chars=0),
+    )
+    session.on(
+        "agent_state_changed",
+        lambda ev: ev.new_state == "speaking"
+        and assistant.faq_answer_timer.answer_started(),
+    )
+    before = {
+        path: (_count(FAQ_ANSWERS, path=path), _count(FAQ_ANSWER_DELAY, path=path))
+        for path in ("direct", "llm")
+    }
+    await session.start(assistant)
+    try:
+        requests = []
+        for turn in script:
+            caller.say(turn.text)
+            await asyncio.wait_for(speaker.replies.get(), 10)
+            await speaker.wait_for_playout()
+            requests.append(len(stub_llm.requests))
+    finally:
+        await session.aclose()
+
+    # Greeting: one request. Pricing: only the request that called the tool.
+    # "What does Razorpay do?" matches two entries equally, so the LLM answers.
+    assert [b - a for a, b in zip([0, *requests], requests)] == [1, 1, 2]
+    assert pricing in " ".join(stub_tts.requests)
+    for path in ("direct", "llm"):
+        counted, timed = before[path]
+        assert _count(FAQ_ANSWERS, path=path) == counted + 1
+        assert _count(FAQ_ANSWER_DELAY, path=path) == timed + 1
@@ -0,0 +1,120 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from faq_fuzzy import FuzzyFaqIndex, QueryExpander, faq_words, load_aliases
+from faq_search import build_faq_index
+from faq_tenants import FaqTenantRegistry
+
+SRC = Path(__file__).parent.parent / "src"
+
+
+@pytest.fixture(scope="module")
+def faqs() -> list[dict]:
+    with open(SRC / "company_faq.json") as f:
+        return json.load(f)["faqs"]
+
+
+@pytest.mark.parametrize(
+    ("query", "question"),
+    [
+        ("is razor pay secure", "Is Razorpay secure?"),
+        ("can I pay with you pee eye", "What payment methods do you support?"),
+        ("what's your pricng", "What are the pricing details?"),
+        ("is it safe", "Is Razorpay secure?"),
+        ("what is the cost", "What are the pricing details?"),
+        ("what does it cost", "What are the pricing details?"),
+        ("razor pay ex products", "What other products do you offer?"),
+    ],
+)
+def test_misheard_queries_find_their_entry(
+    faqs: list[dict], query: str, question: str
+) -> None:
+    """Split, spelled-out, misspelled and aliased words are repaired."""
+    index = FuzzyFaqIndex(build_faq_index(faqs, min_confidence=0.4), faqs)
+    hits = index.search(query, limit=1)
+    assert hits and hits[0].faq["question"] == question
+
+
+def test_corrections_stay_within_a_few_edits(faqs: list[dict]) -> None:
+    """A word is never respelled into a different, shorter FAQ word."""
+    expander = QueryExpander(faq_words(faqs))
+    assert expander.correct("pricng") == "pricing"
+    assert expander.correct("refunds") is None
+    assert expander.expand("do you do refunds") == "do you refunds"
+
+    index = FuzzyFaqIndex(build_faq_index(faqs, min_confidence=0.4), faqs)
+    hits = index.search("do you do refunds")
+    assert "Do you provide settlement of funds?" not in [
+        h.faq["question"] for h in hits
+    ]
+
+
+def test_aliases_add_each_term_once(faqs: list[dict]) -> None:
+    """An alias doesn't repeat a term the query or another alias already has."""
+    expander = QueryExpander(faq_words(faqs))
+    assert expander.expand("how much does it cost") == "pricing does it"
+    assert expander.expand("is it safe and secure") == "is it secure and"
+
+
+def test_the_query_as_heard_is_searched_first(faqs: list[dict]) -> None:
+    """A confident hit for the query as heard is kept without a rewrite."""
+    index = FuzzyFaqIndex(build_faq_index(faqs), faqs)
+    searched = []
+    search = index.index.search
+    index.index.search = lambda query, limit: searched.append(query) or search(
+        query, limit
+    )
+
+    hits = index.search("What are the pricing details?")
+    assert hits[0].faq["question"] == "What are the pricing details?"
+    assert searched == ["What are the pricing details?"]
+
+    searched.clear()
+    assert index.search("is it safe")[0].faq["question"] == "Is Razorpay secure?"
+    assert searched == ["is it safe", "is it secure"]
+
+
+def test_expansion_is_sub_millisecond_and_leaves_known_words(
+    faqs: list[dict],
+) -> None:
+    """Known words pass through untouched, and a cold query takes < 1 ms."""
+    expander = QueryExpander(faq_words(faqs))
+    assert expander.expand("Do you support UPI?") == "do you support upi"
+    # Joining only repairs misheard words, never a phrase the FAQ knows
+    assert expander.expand("pay later") == "pay later"
+
+    queries = [
+        "settlment of funds via you pee eye for razer pay merchnts",
+        "how much does integration cost for startups",
+        "what paymint methods work with shopify",
+    ]
+    start = time.perf_counter()
+    for query in queries:
+        expander.expand(query)
+    assert (time.perf_counter() - start) / len(queries) < 0.001
+
+
+def test_registry_repairs_queries_and_keeps_vocabulary_on_reload(
+    tmp_path: Path,
+) -> None:
+    """Tenant indexes use the alias table, and reloads update the vocabulary."""
+    source = tmp_path / "default_faq.json"
+    faqs = [{"question": "How do refunds work?", "answer": "Within 5 days."}]
+    source.write_text(json.dumps({"faqs": faqs}))
+    aliases_file = tmp_path / "aliases.json"
+    aliases_file.write_text(json.dumps({"Money Back": "refunds"}))
+    registry = FaqTenantRegistry(
+        {"default": source}, fuzzy=True, aliases=load_aliases(aliases_file)
+    )
+
+    index = registry.get().snapshot.index
+    assert index.search("can I get my money back")[0].faq == faqs[0]
+
+    added = {"question": "Do you offer chargebacks?", "answer": "Yes."}
+    updated = index.with_changes([added], faqs)
+    assert updated.search("charge backs")[0].faq == added
+    assert "refund" not in updated.expander
+    assert "refund" in index.expander
@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+from prometheus_client import REGISTRY
+
+from agent import Assistant
+from faq_prefetch import FaqPrefetcher
+from faq_search import build_faq_index
+from faq_store import FaqStore
+
+FAQ_PATH = Path(__file__).parents[1] / "src" / "company_faq.json"
+
+
+def _store() -> FaqStore:
+    with open(FAQ_PATH) as f:
+        data = json.load(f)
+    return FaqStore(data, build_faq_index(data["faqs"]))
+
+
+def test_transcripts_are_searched_once_and_cover_shorter_queries() -> None:
+    """A transcript's terms are searched once; queries within them hit."""
+    store = _store()
+    prefetch = FaqPrefetcher(room="prefetch-room")
+    for interim in ("what's your", "what's your pricing", "what's your pricing like"):
+        prefetch.observe(interim, store.snapshot)
+    prefetch.observe("what is your pricing", store.snapshot)  # same terms
+    prefetch.observe("what payment methods do you support", store.snapshot)
+    assert prefetch.prefetches == 2
+
+    hits = prefetch.take("Pricing?", store.snapshot.version)
+    assert hits == store.snapshot.index.search("what's your pricing")
+    # The LLM's query is the caller's question cut down to its topic
+    hits = prefetch.take("payment methods", store.snapshot.version)
+    assert hits == store.snapshot.index.search("what payment methods do you support")
+    # A term the caller never said means the query asks something else
+    assert prefetch.take("pricing in euros", store.snapshot.version) is None
+    assert prefetch.take("do you support UPI", store.snapshot.version) is None
+    assert prefetch.take("pricing", store.snapshot.version + 1) is None
+    assert (prefetch.hits, prefetch.misses) == (2, 3)
+    assert prefetch.saved_seconds > 0
+    labels = {"room": "prefetch-room"}
+    assert REGISTRY.get_sample_value(
+        "sdr_agent_faq_prefetch_lookups_total", {**labels, "result": "hit"}
+    )
+    assert REGISTRY.get_sample_value(
+        "sdr_agent_faq_prefetch_saved_seconds_count", labels
+    )
+
+
+async def test_lookup_faq_answers_from_the_prefetch() -> None:
+    """A lookup within the caller's question skips the index search."""
+    store = _store()
+    prefetch = FaqPrefetcher()
+    assistant = Assistant(faq_store=store, faq_prefetch=prefetch)
+    prefetch.observe("Do you have a free tier?", store.snapshot)
+
+    searched = []
+    search = store.snapshot.index.search
+    store.snapshot.index.search = lambda *a, **k: searched.append(a) or search(*a, **k)
+    response = await assistant.lookup_faq(None, "free tier")
+
+    assert "free" in response.lower()
+    assert prefetch.hits == 1 and searched == []
+    # Found for the caller's question, the response isn't cached for the query
+    assert store.cache.get(store.cache.normalize("free tier")) is None
@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from faq_search import FaqIndex, tokenize
+
+FAQ_PATH = Path(__file__).parent.parent / "src" / "company_faq.json"
+
+
+@pytest.fixture(scope="module")
+def faq_index() -> FaqIndex:
+    with open(FAQ_PATH) as f:
+        return FaqIndex(json.load(f)["faqs"])
+
+
+def test_tokenize_drops_stopwords_and_stems() -> None:
+    """Filler words are removed and inflections collapse to one term."""
+    assert tokenize("What are the prices?") == tokenize("pricing")
+    assert tokenize("can you tell me about it") == []
+
+
+@pytest.mark.parametrize(
+    ("query", "expected_question"),
+    [
+        ("pricing", "What are the pricing details?"),
+        ("who is this for", "Who is Razorpay for?"),
+        ("is it secure", "Is Razorpay secure?"),
+        ("payment methods", "What payment methods do you support?"),
+    ],
+)
+def test_search_ranks_best_match_first(
+    faq_index: FaqIndex, query: str, expected_question: str
+) -> None:
+    """The most relevant entry comes first rather than the first in file order."""
+    hits = faq_index.search(query)
+    assert hits[0].faq["question"] == expected_question
+    assert hits == sorted(hits, key=lambda hit: hit.score, reverse=True)
+
+
+def test_search_without_matches(faq_index: FaqIndex) -> None:
+    """Unknown terms and stopword-only queries return nothing."""
+    assert faq_index.search("quantum entanglement") == []
+    assert faq_index.search("what is the") == []
+
+
+def test_confidence_threshold(faq_index: FaqIndex) -> None:
+    """A fully matched query is confident; unknown words lower the confidence."""
+    hit = faq_index.search("what are the pricing details")[0]
+    assert hit.confidence == pytest.approx(1.0)
+    partial = faq_index.search("pricing for quantum entanglement")[0]
+    assert partial.faq["question"] == "What are the pricing details?"
+    assert partial.confidence < 0.5
+
+    faq_index.min_confidence = 0.5
+    try:
+        assert faq_index.search("pricing for quantum entanglement") == []
+    finally:
+        faq_index.min_confidence = 0.0
+
+
+@pytest.mark.parametrize(
+    ("query", "confident"),
+    [
+        ("team", False),
+        ("cost", False),
+        ("what does it cost", False),
+        ("hidden costs", False),
+        ("pricing", False),
+        ("is it secure", True),
+        ("free tier", True),
+        ("how long does integration take", True),
+    ],
+)
+def test_one_word_matches_are_not_confident(
+    faq_index: FaqIndex, query: str, confident: bool
+) -> None:
+    """Matching a word of an entry's answer is not the same as asking its question."""
+    assert (faq_index.search(query)[0].confidence >= 0.8) is confident
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from agent import Assistant
+from faq_search import FaqIndex, build_faq_index
+from faq_store import FaqReloader, FaqStore, diff_faqs
+
+FAQ_PATH = Path(__file__).parent.parent / "src" / "company_faq.json"
+
+
+@pytest.fixture
+def faq_data() -> dict:
+    with open(FAQ_PATH) as f:
+        return json.load(f)
+
+
+def _edit_pricing(faqs: list[dict]) -> list[dict]:
+    edited = [dict(faq) for faq in faqs[1:]]
+    for faq in edited:
+        if faq["question"] == "What are the pricing details?":
+            faq["answer"] = "Flat 1.5% on every domestic transaction."
+    return [*edited, {"question": "Do you support crypto?", "answer": "No."}]
+
+
+def test_diff_faqs(faq_data: dict) -> None:
+    """Edits are a removal plus an addition; reordering is not a change."""
+    old = faq_data["faqs"]
+    added, removed = diff_faqs(old, _edit_pricing(old))
+    assert [faq["question"] for faq in added] == [
+        "What are the pricing details?",
+        "Do you support crypto?",
+    ]
+    assert [faq["question"] for faq in removed] == [
+        "What does Razorpay do?",
+        "What are the pricing details?",
+    ]
+    assert diff_faqs(old, list(reversed(old))) == ([], [])
+
+
+@pytest.mark.parametrize("mode", ["keyword", "semantic"])
+def test_with_changes_matches_full_rebuild(faq_data: dict, mode: str) -> None:
+    """An incrementally updated index ranks like one built from scratch."""
+    old = faq_data["faqs"]
+    new = _edit_pricing(old)
+    index = build_faq_index(old, mode=mode)
+    updated = index.with_changes(*diff_faqs(old, new))
+    rebuilt = build_faq_index(new, mode=mode)
+
+    assert len(updated) == len(new)
+    for query in ("pricing", "crypto support", "payment methods"):
+        assert [hit.faq for hit in updated.search(query)] == [
+            hit.faq for hit in rebuilt.search(query)
+        ]
+    # The original index is left untouched for sessions still using it
+    assert "1.5%" not in index.search("pricing")[0].faq["answer"]
+
+
+def test_reloader_publishes_new_snapshot(faq_data: dict, tmp_path: Path) -> None:
+    """A changed file is diffed into a new snapshot; a broken file is ignored."""
+    path = tmp_path / "faq.json"
+    path.write_text(json.dumps(faq_data))
+    store = FaqStore(faq_data, FaqIndex(faq_data["faqs"]))
+    userdata: dict = {"faq_data": faq_data}
+    reloader = FaqReloader(path, store, userdata=userdata)
+    assert not reloader.check()
+
+    path.write_text("{ not json")
+    assert not reloader.check()
+    assert store.snapshot.version == 0
+
+    new_data = dict(faq_data, faqs=_edit_pricing(faq_data["faqs"]))
+    path.write_text(json.dumps(new_data))
+    assert reloader.check()
+    assert store.snapshot.version == 1
+    assert store.snapshot.data == new_data
+    assert userdata["faq_data"] == new_data
+
+
+async def test_live_session_sees_reload(faq_data: dict) -> None:
+    """A running agent answers from the new data, not from its stale cache."""
+    store = FaqStore(faq_data, FaqIndex(faq_data["faqs"]))
+    assistant = Assistant(faq_store=store)
+    assert "1.5%" not in await assistant.lookup_faq(None, "pricing")
+
+    new_faqs = _edit_pricing(faq_data["faqs"])
+    index = store.snapshot.index.with_changes(*diff_faqs(faq_data["faqs"], new_faqs))
+    store.replace(dict(faq_data, faqs=new_faqs), index)
+
+    assert "1.5%" in await assistant.lookup_faq(None, "pricing")
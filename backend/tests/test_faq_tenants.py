@@ -0,0 +1,141 @@
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from livekit.agents.llm.utils import get_function_info
+
+from agent import Assistant
+from faq_artifact import compile_artifact
+from faq_store import load_faq_file
+from faq_tenants import (
+    INDEX_BYTES_PER_SOURCE_BYTE,
+    FaqTenantRegistry,
+    discover_tenants,
+    tenant_from_metadata,
+)
+
+SRC = Path(__file__).parent.parent / "src"
+
+
+def _tenant_file(directory: Path, name: str, company: str) -> Path:
+    path = directory / f"{name}_faq.json"
+    faqs = [
+        {"question": f"What does {company} sell?", "answer": f"{company} sells {name}."}
+    ]
+    path.write_text(json.dumps({"company_name": company, "faqs": faqs}))
+    return path
+
+
+def test_both_faq_layouts_are_normalized() -> None:
+    """razorpay_faq.json reads like company_faq.json."""
+    legacy = load_faq_file(SRC / "razorpay_faq.json")
+    current = load_faq_file(SRC / "company_faq.json")
+
+    assert legacy["company_name"] == current["company_name"] == "Razorpay"
+    assert legacy["description"].startswith("Razorpay is India's leading")
+    assert len(legacy["faqs"]) == 12
+    assert legacy["pricing"]["setup_fee"] == "Free"
+    assert "company_info" not in legacy and "faq" not in legacy
+    with open(SRC / "company_faq.json") as f:
+        assert current == json.load(f)
+
+
+def test_tenant_from_metadata() -> None:
+    """The first metadata naming a tenant wins; anything else is skipped."""
+    assert tenant_from_metadata('{"tenant": "acme"}', '{"tenant": "x"}') == "acme"
+    assert tenant_from_metadata("", "not json", '{"tenant": "acme"}') == "acme"
+    assert tenant_from_metadata(None, "[1]", '{"other": 1}') is None
+    assert set(discover_tenants(SRC)) == {"company", "razorpay"}
+
+
+def test_registry_loads_lazily_and_evicts_least_recently_used(
+    tmp_path: Path,
+) -> None:
+    """Tenants load on first use and the coldest go over the budget."""
+    sources = {
+        name: _tenant_file(tmp_path, name, name.title())
+        for name in ("default", "acme", "globex")
+    }
+    size = sources["acme"].stat().st_size * INDEX_BYTES_PER_SOURCE_BYTE
+    registry = FaqTenantRegistry(sources, max_bytes=int(size * 2.5))
+    assert registry.loads == 0
+
+    default = registry.get()
+    acme = registry.get("acme")
+    assert registry.get("unknown") is default
+    assert registry.get("acme") is acme
+    assert registry.loads == 2
+
+    hits = acme.snapshot.index.search("what does acme sell")
+    assert hits[0].faq["answer"] == "Acme sells acme."
+    globex = registry.get("globex")
+    assert "default" not in registry and "acme" in registry
+    assert registry.evictions == 1
+    # A session holding an evicted store keeps using it
+    assert default.snapshot.index.search("default sell")
+    assert registry.get() is not default
+    assert globex.snapshot.data["company_name"] == "Globex"
+
+
+def test_preload_and_concurrent_gets_load_each_tenant_once(tmp_path: Path) -> None:
+    """Hot tenants load in prewarm; a tenant asked for twice loads once."""
+    sources = {
+        name: _tenant_file(tmp_path, name, name.title())
+        for name in ("default", "acme", "globex", "initech")
+    }
+    registry = FaqTenantRegistry(sources, hot=["acme", "missing"])
+    registry.preload()
+    assert "default" in registry and "acme" in registry
+    assert registry.loads == 2
+
+    loading = threading.Event()
+    release = threading.Event()
+    load = registry._load
+
+    def slow_load(name: str):
+        if name == "globex":
+            loading.set()
+            release.wait(5)
+        return load(name)
+
+    registry._load = slow_load
+    with ThreadPoolExecutor(3) as pool:
+        first = pool.submit(registry.get, "globex")
+        assert loading.wait(5)
+        second = pool.submit(registry.get, "globex")
+        # Another tenant isn't held up by the one being loaded
+        assert pool.submit(registry.get, "initech").result(5)
+        release.set()
+        assert first.result(5) is second.result(5)
+    assert registry.loads == 4
+
+
+def test_registry_maps_compiled_artifacts(tmp_path: Path) -> None:
+    """A tenant with a fresh artifact is served from it, in either layout."""
+    source = tmp_path / "razorpay_faq.json"
+    shutil.copy(SRC / "razorpay_faq.json", source)
+    compile_artifact(source, source.with_suffix(".faqkb"), semantic=False)
+    registry = FaqTenantRegistry({"default": source})
+
+    store = registry.get()
+    assert len(store.snapshot.index) == 12
+    assert store.snapshot.data["company_name"] == "Razorpay"
+    assert registry.resident_bytes() == source.with_suffix(".faqkb").stat().st_size
+
+
+def test_assistant_persona_follows_the_tenant(tmp_path: Path) -> None:
+    """The instructions name the company of the tenant's FAQ."""
+    registry = FaqTenantRegistry(
+        {"default": _tenant_file(tmp_path, "acme", "Acme Corp")}
+    )
+    assistant = Assistant(faq_store=registry.get())
+
+    assert "SDR) for Acme Corp." in assistant.instructions
+    assert "Razorpay" not in assistant.instructions
+    # The lookup_faq description the LLM sees is the same for every tenant
+    lookup = get_function_info(assistant.lookup_faq)
+    assert "Razorpay" not in lookup.description
+    # An FAQ without a company name takes the default tenant's
+    assert "SDR) for Razorpay." in Assistant(faq_data={"faqs": []}).instructions
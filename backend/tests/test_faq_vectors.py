@@ -0,0 +1,90 @@
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from faq_search import STOPWORDS, build_faq_index
+from faq_vectors import SemanticFaqIndex
+
+FAQ_PATH = Path(__file__).parent.parent / "src" / "company_faq.json"
+
+
+@pytest.fixture(scope="module")
+def semantic_index() -> SemanticFaqIndex:
+    with open(FAQ_PATH) as f:
+        return build_faq_index(json.load(f)["faqs"], mode="semantic")
+
+
+def test_matrix_rows_are_normalized(semantic_index: SemanticFaqIndex) -> None:
+    """Question and answer vectors are stacked into one unit-norm matrix."""
+    assert semantic_index.matrix.shape[0] == 2 * len(semantic_index)
+    norms = np.linalg.norm(semantic_index.matrix, axis=1)
+    np.testing.assert_allclose(norms, 1.0, rtol=1e-5)
+
+
+@pytest.mark.parametrize(
+    ("query", "expected_question"),
+    [
+        ("integrating", "How long does integration take?"),
+        ("razor pay security", "Is Razorpay secure?"),
+        ("payment options", "What payment methods do you support?"),
+    ],
+)
+def test_search_tolerates_word_variants(
+    semantic_index: SemanticFaqIndex, query: str, expected_question: str
+) -> None:
+    """Character n-grams match inflections and split words a keyword index misses."""
+    hits = semantic_index.search(query)
+    assert hits[0].faq["question"] == expected_question
+    assert 0.0 < hits[0].confidence <= 1.0
+
+
+def test_unrelated_query_falls_below_confidence(
+    semantic_index: SemanticFaqIndex,
+) -> None:
+    """Off-topic questions return nothing so the agent can fall back."""
+    assert semantic_index.search("what is the weather in paris") == []
+
+
+@pytest.mark.parametrize(
+    ("query", "expected_question"),
+    [
+        ("upi", "What payment methods do you support?"),
+        ("what does it cost", "Do you have a free tier?"),
+        ("razorpay pricing", "What are the pricing details?"),
+    ],
+)
+def test_short_queries_clear_the_default_threshold(
+    semantic_index: SemanticFaqIndex, query: str, expected_question: str
+) -> None:
+    """A short query is not drowned out by the length of the answer it is in."""
+    hits = semantic_index.search(query)
+    assert expected_question in [hit.faq["question"] for hit in hits]
+    if query == "razorpay pricing":
+        assert hits[0].faq["question"] == expected_question
+
+
+def test_threshold_fits_the_faq_vocabulary(semantic_index: SemanticFaqIndex) -> None:
+    """Every word of the FAQ clears the threshold; words it lacks don't."""
+    with open(FAQ_PATH) as f:
+        faqs = json.load(f)["faqs"]
+    texts = [f"{faq['question']} {faq['answer']}".lower() for faq in faqs]
+    words = {
+        word
+        for text in texts
+        for word in re.findall(r"[a-z0-9]+", text)
+        if len(word) >= 3 and word not in STOPWORDS
+    }
+    for word in words:
+        hits = semantic_index.search(word, limit=1)
+        assert hits, word
+    assert semantic_index.search("refund") == []
+    assert semantic_index.search("tell me a joke") == []
+
+
+def test_unknown_mode() -> None:
+    """Misconfigured search modes fail loudly in prewarm."""
+    with pytest.raises(ValueError):
+        build_faq_index([], mode="telepathy")
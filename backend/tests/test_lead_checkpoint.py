@@ -0,0 +1,85 @@
+import asyncio
+import json
+from pathlib import Path
+
+from agent import Assistant
+from lead_checkpoint import LeadCheckpoint, recover_checkpoints
+from lead_store import SqliteLeadStore
+from lead_writer import LeadWriter
+
+
+async def test_burst_of_updates_is_one_write(tmp_path: Path) -> None:
+    """Updates made within the delay are appended to the log together."""
+    checkpoint = LeadCheckpoint(tmp_path / "a.wal", "a", room="room-1", delay=0.05)
+    writes = []
+    append = checkpoint._append
+    checkpoint._append = lambda lines: (writes.append(len(lines)), append(lines))
+
+    checkpoint.record("name", "Priya")
+    checkpoint.record("company", "Acme")
+    checkpoint.record("email", "priya@acme.com")
+    await asyncio.sleep(0.1)
+
+    assert writes == [4]  # header plus three updates
+    lines = [json.loads(line) for line in checkpoint.path.read_text().splitlines()]
+    assert lines[0]["room"] == "room-1"
+    assert [line["field"] for line in lines[1:]] == ["name", "company", "email"]
+    await checkpoint.aclose(SqliteLeadStore(tmp_path / "leads.db"))
+
+
+async def test_hang_up_without_summary_keeps_lead(tmp_path: Path) -> None:
+    """Closing the session compacts the log into the store and deletes it."""
+    store = SqliteLeadStore(tmp_path / "leads.db")
+    checkpoint = LeadCheckpoint(tmp_path / "a.wal", "a", delay=10)
+    assistant = Assistant(lead_writer=LeadWriter(store), lead_checkpoint=checkpoint)
+    await assistant.save_lead_info(None, "name", "Priya")
+    await assistant.save_lead_info(None, "email", "priya@acme.com")
+
+    lead = await checkpoint.aclose(store)
+    assert lead["lead_id"] == "a"
+    assert store.by_email("priya@acme.com") == [lead]
+    assert lead["name"] == "Priya"
+    assert "conversation_summary" not in lead
+    assert not checkpoint.path.exists()
+
+
+async def test_compaction_keeps_summary_and_later_fields(tmp_path: Path) -> None:
+    """The checkpoint and the summary write the same lead, not two."""
+    store = SqliteLeadStore(tmp_path / "leads.db")
+    writer = LeadWriter(store)
+    checkpoint = LeadCheckpoint(tmp_path / "a.wal", "a")
+    assistant = Assistant(lead_writer=writer, lead_checkpoint=checkpoint)
+    await assistant.save_lead_info(None, "name", "Priya")
+    await assistant.generate_summary(None, "Asked about UPI.")
+    await assistant.save_lead_info(None, "timeline", "next month")
+
+    await writer.flush()
+    await checkpoint.aclose(store)
+    await writer.aclose()
+
+    (lead,) = SqliteLeadStore(tmp_path / "leads.db").between(None, None)
+    assert lead["conversation_summary"] == "Asked about UPI."
+    assert lead["timeline"] == "next month"
+
+
+async def test_recover_abandoned_logs(tmp_path: Path) -> None:
+    """Logs of dead sessions are recovered; live and empty ones are not saved."""
+    store = SqliteLeadStore(tmp_path / "leads.db")
+    wal_dir = tmp_path / "wal"
+    live = LeadCheckpoint(wal_dir / "live.wal", "live")
+    live.record("name", "Still talking")
+    await live.flush()
+
+    (wal_dir / "crashed.wal").write_text(
+        '{"lead_id": "crashed", "room": "r", "started": "2025-11-26T10:00:00"}\n'
+        '{"field": "name", "value": "Rahul", "at": "2025-11-26T10:01:00"}\n'
+        '{"field": "email", "val'
+    )
+    (wal_dir / "empty.wal").write_text('{"lead_id": "empty"}\n')
+
+    assert recover_checkpoints(wal_dir, store) == 2
+    (lead,) = store.between(None, None)
+    assert lead["name"] == "Rahul"
+    assert lead["timestamp"] == "2025-11-26T10:01:00"
+    assert sorted(p.name for p in wal_dir.iterdir()) == ["live.wal"]
+    await live.aclose(store)
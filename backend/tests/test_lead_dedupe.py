@@ -0,0 +1,96 @@
+import json
+from pathlib import Path
+
+from lead_dedupe import DedupingLeadStore, LeadIndex, identity_keys, main
+from lead_store import SqliteLeadStore
+
+
+def _session(lead_id: str, timestamp: str, **fields) -> dict:
+    return {
+        "lead_id": lead_id,
+        "name": None,
+        "company": None,
+        "email": None,
+        "timeline": None,
+        "conversation_notes": [],
+        "timestamp": timestamp,
+        **fields,
+    }
+
+
+FIRST = _session(
+    "a",
+    "2025-11-24T09:00:00",
+    name="Priya Shah",
+    company="Acme Pvt Ltd",
+    email="priya@acme.com",
+    conversation_notes=["Uses UPI"],
+    conversation_summary="Asked about pricing.",
+)
+SECOND = _session(
+    "b",
+    "2025-11-26T10:00:00",
+    email=" PRIYA@acme.com",
+    timeline="next month",
+    conversation_notes=["Wants card payments"],
+    conversation_summary="Ready to integrate.",
+)
+
+
+def _store(tmp_path: Path) -> DedupingLeadStore:
+    return DedupingLeadStore(
+        SqliteLeadStore(tmp_path / "leads.db"), LeadIndex(tmp_path / "index.jsonl")
+    )
+
+
+def test_identity_keys_are_normalized() -> None:
+    assert identity_keys(FIRST) == ["email:priya@acme.com", "name:priya shah|acme"]
+    assert identity_keys(_session("c", "", name="PRIYA  shah", company="ACME")) == [
+        "name:priya shah|acme"
+    ]
+    assert identity_keys(_session("d", "", name="Priya")) == []
+
+
+def test_repeat_caller_is_merged(tmp_path: Path) -> None:
+    """A second session with the same email updates the first lead."""
+    store = _store(tmp_path)
+    store.save([FIRST])
+    store.save([SECOND])
+    store.save([dict(SECOND)])  # the checkpoint re-saving the same session
+
+    (lead,) = store.between(None, None)
+    assert lead["lead_id"] == "a"
+    assert lead["name"] == "Priya Shah"
+    assert lead["timeline"] == "next month"
+    assert lead["conversation_summary"] == "Ready to integrate."
+    assert lead["conversation_notes"] == ["Uses UPI", "Wants card payments"]
+    assert [s["lead_id"] for s in lead["sessions"]] == ["a", "b"]
+    assert store.get("b")["lead_id"] == "a"
+
+
+def test_index_is_shared_between_processes(tmp_path: Path) -> None:
+    """An index opened later picks up the entries another process appended."""
+    _store(tmp_path).save([FIRST])
+    other = _store(tmp_path)
+    other.save(
+        [_session("c", "2025-11-27T10:00:00", name="priya shah", company="ACME")]
+    )
+
+    (lead,) = other.between(None, None)
+    assert [s["lead_id"] for s in lead["sessions"]] == ["a", "c"]
+
+
+def test_bulk_dedupe(tmp_path: Path, capsys) -> None:
+    """The CLI streams a lead directory into deduplicated leads."""
+    leads_dir = tmp_path / "leads"
+    leads_dir.mkdir()
+    sessions = [FIRST, SECOND, _session("c", "2025-11-25T09:00:00")]
+    for session in sessions:
+        (leads_dir / f"lead_{session['lead_id']}.json").write_text(json.dumps(session))
+
+    main([str(leads_dir), str(tmp_path / "leads.db"), "--batch-size", "2"])
+    assert "Filed 3 session(s)" in capsys.readouterr().out
+
+    leads = SqliteLeadStore(tmp_path / "leads.db").between(None, None)
+    assert sorted(lead["lead_id"] for lead in leads) == ["a", "c"]
+    assert (tmp_path / "leads.index.jsonl").exists()
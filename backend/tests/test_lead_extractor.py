@@ -0,0 +1,68 @@
+from agent import Assistant
+from lead_extractor import LeadExtractor
+
+
+def _fields(text: str, min_confidence: float = 0.8) -> dict[str, str]:
+    extractor = LeadExtractor(min_confidence=min_confidence)
+    return {e.field: e.value for e in extractor.extract(text)}
+
+
+def test_patterns_find_emails_team_sizes_and_timelines() -> None:
+    """Literal and spelled-out emails, sizes and buying timelines are found."""
+    assert _fields("Sure, it's Priya.Sharma@Acme.co.in and we're about 40 people") == {
+        "email": "priya.sharma@acme.co.in",
+        "team_size": "about 40 people",
+    }
+    assert _fields("My email is priya dot sharma at acme dot com") == {
+        "email": "priya.sharma@acme.com"
+    }
+    assert _fields("We're a team of 12 and want to go live by Q3") == {
+        "team_size": "team of 12",
+        "timeline": "by Q3",
+    }
+    assert _fields("We plan to start next quarter")["timeline"] == "next quarter"
+
+
+def test_uncertain_matches_stay_under_the_threshold() -> None:
+    """Common words and offhand dates aren't taken as lead fields."""
+    assert _fields("I was looking at acme dot com yesterday") == {}
+    assert _fields("I'm on vacation next week") == {}
+    assert _fields("I'm on vacation next week", min_confidence=0.5) == {
+        "timeline": "next week"
+    }
+    assert _fields("We have 3 products and 2 offices") == {}
+
+
+def test_spoken_emails_and_head_counts_need_their_context() -> None:
+    """An address must follow "my email is"; a size must be the caller's team."""
+    assert _fields("I used to work at google dot com, you can email me later") == {}
+    assert _fields("I was at acme dot com for my email") == {}
+    assert _fields("My email? It's priya at acme dot com") == {
+        "email": "priya@acme.com"
+    }
+    assert _fields("it's nice at acme dot com, email me") == {}
+    assert _fields("We are 2 people on the call") == {}
+    assert _fields("Last month we processed 3,000 people") == {}
+    assert _fields("We're a 40-person startup")["team_size"] == "40-person startup"
+    assert _fields("Our team is 8 engineers")["team_size"] == "8 engineers"
+
+
+async def test_extractions_never_override_values_the_llm_saved() -> None:
+    """LLM-saved values win; extractions replace only less certain ones."""
+    assistant = Assistant(lead_extractor=LeadExtractor())
+
+    await assistant.save_lead_info(None, "email", "priya@acme.com")
+    applied = assistant.note_transcript("email is p@other.com, we're about 40 people")
+    assert [e.field for e in applied] == ["team_size"]
+    assert assistant.lead_data["email"] == "priya@acme.com"
+    assert assistant.lead_data["team_size"] == "about 40 people"
+
+    # The caller corrects themselves; an equally sure extraction replaces it
+    assistant.note_transcript("sorry, actually we're 45 people")
+    assert assistant.lead_data["team_size"] == "45 people"
+    assert assistant.note_transcript("yes, 45 people") == []
+
+    await assistant.save_lead_details(None, team_size="about 50 people")
+    assistant.note_transcript("we're 60 people")
+    assert assistant.lead_data["team_size"] == "about 50 people"
+    assert Assistant().note_transcript("me@acme.com") == []
@@ -0,0 +1,98 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from lead_store import (
+    JsonDirLeadStore,
+    SqliteLeadStore,
+    main,
+    new_lead_id,
+    open_lead_store,
+)
+
+LEADS = [
+    {
+        "lead_id": "20251124_090000_000000_aaaa",
+        "name": "Priya",
+        "company": "Acme",
+        "email": "Priya@Acme.com",
+        "timestamp": "2025-11-24T09:00:00",
+    },
+    {
+        "lead_id": "20251125_100000_000000_bbbb",
+        "name": "Rahul",
+        "company": "acme ",
+        "email": "rahul@acme.com",
+        "timestamp": "2025-11-25T10:00:00",
+    },
+    {
+        "lead_id": "20251126_110000_000000_cccc",
+        "name": "Anita",
+        "company": "Globex",
+        "email": None,
+        "timestamp": "2025-11-26T11:00:00",
+    },
+]
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def store(request: pytest.FixtureRequest, tmp_path: Path):
+    path = tmp_path / ("leads.db" if request.param == "sqlite" else "leads")
+    store = open_lead_store(request.param, path)
+    store.save(LEADS)
+    yield store
+    store.close()
+
+
+def test_lead_ids_do_not_collide() -> None:
+    """Leads captured within the same second still get distinct ids."""
+    now = datetime(2025, 11, 26, 1, 0, 20)
+    assert len({new_lead_id(now) for _ in range(50)}) > 45
+
+
+def test_queries(store) -> None:
+    """Lookups ignore case and whitespace; ranges are half-open, oldest first."""
+    assert [lead["name"] for lead in store.by_email("priya@acme.com")] == ["Priya"]
+    assert [lead["name"] for lead in store.by_company("ACME")] == ["Priya", "Rahul"]
+    assert store.get(LEADS[2]["lead_id"])["company"] == "Globex"
+    assert store.get("missing") is None
+
+    in_range = store.between(datetime(2025, 11, 25), datetime(2025, 11, 26, 11))
+    assert [lead["name"] for lead in in_range] == ["Rahul"]
+    assert len(store.between(None, None)) == 3
+
+
+def test_save_replaces_by_lead_id(store) -> None:
+    store.save([dict(LEADS[0], name="Priya S")])
+    assert [lead["name"] for lead in store.by_email("priya@acme.com")] == ["Priya S"]
+
+
+def test_migrate_imports_legacy_files(
+    tmp_path: Path, capsys: pytest.CaptureFixture
+) -> None:
+    """Old timestamp-named files are imported once, keyed by their file name."""
+    leads_dir = tmp_path / "leads"
+    leads_dir.mkdir()
+    for lead in LEADS:
+        legacy = {k: v for k, v in lead.items() if k != "lead_id"}
+        name = lead["lead_id"].rsplit("_", 2)[0]
+        (leads_dir / f"lead_{name}.json").write_text(json.dumps(legacy))
+    (leads_dir / "lead_broken.json").write_text("{")
+    database = tmp_path / "leads.db"
+
+    main(["migrate", str(leads_dir), str(database)])
+    main(["migrate", str(leads_dir), str(database)])
+    assert "Imported 0 new lead(s)" in capsys.readouterr().out
+
+    store = SqliteLeadStore(database)
+    assert [lead["lead_id"] for lead in store.between(None, None)] == [
+        "20251124_090000",
+        "20251125_100000",
+        "20251126_110000",
+    ]
+    assert JsonDirLeadStore(leads_dir).get("20251124_090000")["name"] == "Priya"
+
+    main(["query", str(database), "--email", "rahul@acme.com"])
+    assert json.loads(capsys.readouterr().out)["name"] == "Rahul"
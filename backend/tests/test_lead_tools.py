@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from livekit.agents.llm.utils import build_legacy_openai_schema
+
+from agent import Assistant
+from lead_checkpoint import LeadCheckpoint
+from lead_store import SqliteLeadStore
+from lead_writer import LeadWriter
+
+
+async def test_batched_capture_validates_and_checkpoints_in_one_call(
+    tmp_path: Path,
+) -> None:
+    """save_lead_details saves every valid field and reports the rest once."""
+    store = SqliteLeadStore(tmp_path / "leads.db")
+    checkpoint = LeadCheckpoint(tmp_path / "a.wal", "a", delay=10)
+    assistant = Assistant(lead_writer=LeadWriter(store), lead_checkpoint=checkpoint)
+
+    reply = await assistant.save_lead_details(
+        None,
+        name="Priya",
+        role=" CTO ",
+        company="Acme",
+        team_size="about 40 people",
+        email="priya at acme",
+        timeline="",
+        conversation_notes="Moving off a legacy gateway",
+    )
+
+    assert reply.startswith("Got it, I've noted down name: Priya, company: Acme")
+    assert "role: CTO" in reply and "the note" in reply
+    assert "Not saved: 'priya at acme' doesn't look like an email" in reply
+    assert assistant.lead_data["email"] is None
+    assert assistant.lead_data["timeline"] is None
+    assert assistant.lead_data["conversation_notes"] == ["Moving off a legacy gateway"]
+    await assistant.save_lead_details(None, email="priya@acme.com")
+
+    lead = await checkpoint.aclose(store)
+    assert (lead["name"], lead["role"], lead["email"]) == (
+        "Priya",
+        "CTO",
+        "priya@acme.com",
+    )
+    assert lead["team_size"] == "about 40 people"
+    assert await assistant.save_lead_details(None) == "Nothing new to note down."
+
+
+async def test_single_field_capture_validates_the_email() -> None:
+    """save_lead_info refuses an email that isn't one, like the batched tool."""
+    assistant = Assistant()
+
+    reply = await assistant.save_lead_info(None, "email", "priya at acme")
+    assert reply.startswith("Not saved: 'priya at acme' doesn't look like an email")
+    assert assistant.lead_data["email"] is None
+
+    reply = await assistant.save_lead_info(None, "email", "priya@acme.com")
+    assert reply == "Got it, I've noted down your email: priya@acme.com"
+    assert assistant.lead_data["email"] == "priya@acme.com"
+
+
+def test_batched_capture_schema_has_only_optional_fields() -> None:
+    """The tool schema builds from the annotations, every field optional."""
+    schema = build_legacy_openai_schema(Assistant().save_lead_details)
+    parameters = schema["function"]["parameters"]
+    assert not parameters.get("required")
+    assert parameters["properties"]["email"]["description"] == "Their email address"
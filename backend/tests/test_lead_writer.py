@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from pathlib import Path
+
+from agent import Assistant
+from lead_store import JsonDirLeadStore, SqliteLeadStore
+from lead_writer import LeadWriter
+
+
+async def test_records_are_written_in_background(tmp_path: Path) -> None:
+    """submit returns before the write; flush waits for it to land on disk."""
+    store = JsonDirLeadStore(tmp_path / "leads", fsync=True)
+    writer = LeadWriter(store)
+    record = {"lead_id": "1", "name": "Priya", "conversation_notes": []}
+    lead_id = await writer.submit(record)
+    record["name"] = "changed after submit"
+
+    await writer.aclose()
+    assert store.get(lead_id)["name"] == "Priya"
+
+
+async def test_full_queue_applies_backpressure(tmp_path: Path) -> None:
+    """With the queue full, submit waits for the writer instead of buffering."""
+    store = JsonDirLeadStore(tmp_path)
+    writer = LeadWriter(store, max_queue=1, batch_size=1)
+    release = threading.Event()
+    write_batch = writer._write_batch
+
+    def slow_write_batch(batch: list) -> None:
+        release.wait()
+        write_batch(batch)
+
+    writer._write_batch = slow_write_batch
+    await writer.submit({"lead_id": "1"})  # picked up by the writer, then blocks
+    await asyncio.sleep(0.05)
+    await writer.submit({"lead_id": "2"})  # fills the queue
+    third = asyncio.create_task(writer.submit({"lead_id": "3"}))
+    await asyncio.sleep(0.05)
+    assert not third.done()
+
+    release.set()
+    await third
+    await writer.aclose()
+    assert sorted(lead["lead_id"] for lead in store) == ["1", "2", "3"]
+
+
+async def test_generate_summary_queues_lead(tmp_path: Path) -> None:
+    """generate_summary hands the lead to the writer and still returns the recap."""
+    store = SqliteLeadStore(tmp_path / "leads.db")
+    writer = LeadWriter(store)
+    assistant = Assistant(lead_writer=writer)
+    await assistant.save_lead_info(None, "name", "Priya")
+    await assistant.save_lead_info(None, "email", "priya@acme.com")
+
+    recap = await assistant.generate_summary(None, "Asked about UPI pricing.")
+    assert "Priya" in recap
+    # Summarising again updates the same lead rather than adding another
+    await assistant.generate_summary(None, "Asked about UPI and card pricing.")
+    await writer.flush()
+
+    (lead,) = store.by_email("priya@acme.com")
+    assert lead["name"] == "Priya"
+    assert lead["conversation_summary"] == "Asked about UPI and card pricing."
+    await writer.aclose()
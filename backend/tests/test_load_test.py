@@ -0,0 +1,63 @@
+from livekit.agents import stt
+
+from load_test import LoadConfig, conversation, run_sessions
+from stub_plugins import ScriptedCaller, StubSTT
+from turn_metrics import TOOL_DURATION
+
+FAST = LoadConfig(
+    stt_delay=0.01,
+    llm_ttft=0.01,
+    llm_tokens_per_second=1000,
+    tts_ttfb=0.01,
+    speech_seconds=0.1,
+    endpointing_delay=0.05,
+    pause=0.05,
+    playback_speed=50,
+    ramp=0.1,
+    timeout=10,
+)
+
+
+def _tool_calls() -> dict[str, float]:
+    return {
+        sample.labels["tool"]: sample.value
+        for metric in TOOL_DURATION.collect()
+        for sample in metric.samples
+        if sample.name.endswith("_count")
+    }
+
+
+async def test_concurrent_sessions_complete_every_turn() -> None:
+    """Two scripted calls run through the real Assistant with stub plugins."""
+    before = _tool_calls()
+    result = await run_sessions(2, FAST)
+
+    assert result.timeouts == 0
+    assert result.turns == 2 * len(conversation(0))
+    assert len(result.turn_latencies) == result.turns
+    assert all(latency > 0 for latency in result.turn_latencies)
+    assert result.loop_lag
+    summary = result.summary()
+    assert summary["turns_per_second"] > 0
+    assert set(summary["turn_latency_ms"]) == {"p50", "p95", "p99", "max"}
+
+    calls = _tool_calls()
+    for tool, count in {
+        "lookup_faq": 4,
+        "save_lead_details": 2,
+        "save_lead_info": 2,
+        "generate_summary": 2,
+    }.items():
+        assert calls[tool] - before.get(tool, 0) == count
+
+
+async def test_stub_stt_recognizes_without_a_stream() -> None:
+    """Non-streaming recognition returns the caller's next line as final."""
+    caller = ScriptedCaller(speech_seconds=0.1)
+    caller.say("What are the pricing details?")
+    stub = StubSTT(caller, delay=0.01)
+
+    event = await stub.recognize([await caller.__anext__()])
+    assert event.type == stt.SpeechEventType.FINAL_TRANSCRIPT
+    assert event.alternatives[0].text == "What are the pricing details?"
+    assert (await stub.recognize([])).alternatives[0].text == ""
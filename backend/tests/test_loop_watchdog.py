@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from prometheus_client import REGISTRY
+
+from loop_watchdog import LoopWatchdog, tool_running
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _write_summary_synchronously() -> None:
+    time.sleep(0.25)
+
+
+async def _watch(blocker) -> LoopWatchdog:
+    watchdog = LoopWatchdog(threshold=0.1, interval=0.01)
+    watchdog.start(room="watchdog-room")
+    await asyncio.sleep(0.05)
+    await blocker()
+    await asyncio.sleep(0.05)
+    await watchdog.stop()
+    return watchdog
+
+
+def test_stall_in_a_tool_is_attributed_with_its_stack() -> None:
+    """The stack shows the blocking call and the stall names the tool."""
+
+    async def generate_summary() -> None:
+        with tool_running("generate_summary"):
+            _write_summary_synchronously()
+
+    watchdog = asyncio.run(_watch(generate_summary))
+
+    [stall] = watchdog.stalls
+    assert stall.duration >= 0.2
+    assert (stall.room, stall.tool) == ("watchdog-room", "generate_summary")
+    assert "_write_summary_synchronously" in stall.stack
+    labels = {"room": "watchdog-room", "tool": "generate_summary"}
+    assert _sample("sdr_agent_loop_stalls_total", **labels) == 1
+    assert _sample("sdr_agent_loop_stall_seconds_count", **labels) == 1
+
+
+def test_awaiting_is_not_a_stall_and_tools_are_unmarked_after() -> None:
+    """Time spent awaiting doesn't count, and a finished tool isn't blamed."""
+
+    async def tool_then_block() -> None:
+        with tool_running("lookup_faq"):
+            await asyncio.sleep(0.2)
+        time.sleep(0.15)
+
+    watchdog = asyncio.run(_watch(tool_then_block))
+
+    [stall] = watchdog.stalls
+    assert stall.tool == ""
+    assert "tool_then_block" in stall.stack
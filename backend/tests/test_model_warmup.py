@@ -0,0 +1,92 @@
+import asyncio
+import json
+import logging
+
+import numpy as np
+from livekit.agents import utils
+from livekit.plugins import silero
+
+from model_warmup import (
+    synthetic_audio,
+    warm_noise_cancellation,
+    warm_turn_detector,
+    warm_turn_detector_on_start,
+    warm_vad,
+)
+from pipeline import PipelineConfig
+
+
+class _TurnDetector:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.calls = []
+
+    async def predict_end_of_turn(self, chat_ctx, timeout=None) -> float:
+        self.calls.append(chat_ctx)
+        if self.fail:
+            raise RuntimeError("no inference executor")
+        return 0.9
+
+
+class _InferenceExecutor:
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def do_inference(self, method: str, data: bytes) -> bytes:
+        self.calls.append((method, json.loads(data)))
+        return json.dumps({"eou_probability": 0.9}).encode()
+
+
+class _Server(utils.EventEmitter):
+    def __init__(self) -> None:
+        super().__init__()
+        self._inference_executor = _InferenceExecutor()
+
+
+def test_synthetic_audio_is_silence_then_voice() -> None:
+    """The first half is silent and the second in range."""
+    audio = synthetic_audio(16000)
+    assert audio.dtype == np.float32 and len(audio) == 16000
+    assert not audio[:8000].any()
+    assert 0 < np.abs(audio[8000:]).max() <= 1
+
+
+def test_warm_vad_runs_the_shared_session() -> None:
+    """Every whole window of the audio goes through the real Silero model."""
+    vad = silero.VAD.load()
+    assert warm_vad(vad) == 16000 // 512
+    assert warm_noise_cancellation("none") == 0
+    assert warm_noise_cancellation("bvc-telephony") > 1024 * 1024
+
+
+def test_turn_detector_warm_up_logs_and_survives_failure(caplog) -> None:
+    """A prediction is timed, and a failed one is logged rather than raised."""
+    detector = _TurnDetector()
+    with caplog.at_level(logging.INFO, logger="agent"):
+        assert asyncio.run(warm_turn_detector(detector)) >= 0
+        assert asyncio.run(warm_turn_detector(_TurnDetector(fail=True))) is None
+    assert [m.role for m in detector.calls[0].items] == ["assistant", "user"]
+    assert "Turn detector warmed up in" in caplog.text
+    assert "warm-up failed" in caplog.text
+
+
+async def test_worker_warms_the_turn_detector_once_it_starts() -> None:
+    """The worker's inference process makes one prediction, on start only."""
+    server = _Server()
+    warm_turn_detector_on_start(server, PipelineConfig())
+    executor = server._inference_executor
+    assert executor.calls == []
+
+    server.emit("worker_started")
+    for _ in range(10):
+        await asyncio.sleep(0)
+    ((method, data),) = executor.calls
+    assert "multilingual" in method
+    assert [m["role"] for m in data["chat_ctx"]] == ["assistant", "user"]
+
+    # Without the turn detector model there is nothing to warm
+    lean = _Server()
+    warm_turn_detector_on_start(lean, PipelineConfig(turn_detection="stt"))
+    lean.emit("worker_started")
+    await asyncio.sleep(0)
+    assert lean._inference_executor.calls == []
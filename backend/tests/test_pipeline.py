@@ -0,0 +1,45 @@
+import pytest
+
+from pipeline import PipelineConfig
+
+
+def test_only_configured_plugins_are_imported() -> None:
+    """Unused providers never make it into the module list."""
+    default = PipelineConfig()
+    assert default.modules() == [
+        "livekit.plugins.silero",
+        "livekit.plugins.deepgram",
+        "livekit.plugins.google",
+        "livekit.plugins.murf",
+        "livekit.plugins.turn_detector.multilingual",
+        "livekit.plugins.noise_cancellation",
+    ]
+    assert default.main_process_modules() == [
+        "livekit.plugins.turn_detector.multilingual"
+    ]
+    assert default.main_process_modules(download_files=True) == default.modules()
+
+    lean = PipelineConfig(
+        stt_provider="assemblyai", turn_detection="stt", noise_cancellation="none"
+    )
+    assert "livekit.plugins.deepgram" not in lean.modules()
+    assert "livekit.plugins.assemblyai" in lean.modules()
+    assert lean.main_process_modules() == []
+    assert lean.turn_detector() == "stt"
+    assert lean.noise_canceller() is None
+
+
+def test_config_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Providers come from the environment and are checked up front."""
+    monkeypatch.setenv("STT_PROVIDER", "assemblyai")
+    monkeypatch.setenv("LLM_MODEL", "gemini-2.5-flash-lite")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    config = PipelineConfig.from_env()
+
+    assert config.stt_provider == "assemblyai"
+    assert config.llm().model == "gemini-2.5-flash-lite"
+    monkeypatch.setenv("STT_PROVIDER", "whisper")
+    with pytest.raises(ValueError, match="Unknown STT provider 'whisper'"):
+        PipelineConfig.from_env()
+    with pytest.raises(ValueError, match="Unknown turn detection"):
+        PipelineConfig(turn_detection="semantic")
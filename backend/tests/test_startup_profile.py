@@ -0,0 +1,61 @@
+from startup_profile import (
+    PHASE_MARKER,
+    StepTimer,
+    parse_importtime,
+    profile,
+    slowest_imports,
+)
+
+IMPORTTIME = f"""import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     json.decoder
+import time:       300 |        420 |   json
+import time:      1000 |       5000 |   livekit.agents
+import time:        50 |       5470 | agent
+{PHASE_MARKER}
+import time:      9000 |       9000 | livekit.plugins.google
+"""
+
+
+def test_parse_importtime() -> None:
+    """Import lines are parsed with their depth, up to prewarm."""
+    imports = parse_importtime(IMPORTTIME)
+
+    assert [(i.module, i.depth) for i in imports] == [
+        ("json.decoder", 2),
+        ("json", 1),
+        ("livekit.agents", 1),
+        ("agent", 0),
+    ]
+    assert [i.module for i in slowest_imports(imports, top=2)] == [
+        "agent",
+        "livekit.agents",
+    ]
+
+
+def test_step_timer() -> None:
+    """Every step is recorded under its name."""
+    timer = StepTimer("prewarm")
+    with timer.step("vad"):
+        pass
+    with timer.step("faq"):
+        pass
+    assert list(timer.steps) == ["vad", "faq"]
+    assert all(seconds >= 0 for seconds in timer.steps.values())
+
+
+def test_profile_cold_start() -> None:
+    """Importing agent leaves the provider plugins to prewarm."""
+    report = profile(top=50)
+
+    imported = {i["module"] for i in report["imports"]}
+    assert "agent" in imported and "pipeline" in imported
+    assert not any(module.startswith("livekit.plugins") for module in imported)
+    assert "livekit.plugins.google" in report["plugin_imports"]
+    assert list(report["prewarm_steps"]) == [
+        "plugins",
+        "vad",
+        "vad warm-up",
+        "noise cancellation",
+        "faq",
+    ]
+    assert report["prewarm_seconds"] >= sum(report["prewarm_steps"].values())
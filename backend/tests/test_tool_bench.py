@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tool_bench import compare, main, run, synthetic_faqs
+
+
+def test_synthetic_faqs_start_with_the_real_ones() -> None:
+    """Generated corpora keep the real FAQs first and are deterministic."""
+    with open(Path(__file__).parents[1] / "src" / "company_faq.json") as f:
+        real = json.load(f)["faqs"]
+
+    faqs = synthetic_faqs(50)
+    assert len(faqs) == 50
+    assert faqs[: len(real)] == real
+    assert faqs == synthetic_faqs(50)
+    assert len({faq["question"] for faq in faqs}) == 50
+    assert synthetic_faqs(5) == real[:5]
+
+
+async def test_run_covers_every_tool(tmp_path: Path) -> None:
+    """A small run times all three tools and leaves a kept leads dir as is."""
+    leads_dir = tmp_path / "leads"
+    document = await run(
+        sizes=[12, 100], leads=20, repeat=5, semantic_max=12, leads_dir=leads_dir
+    )
+
+    assert set(document["results"]) == {
+        "lookup_faq/keyword/n=12",
+        "lookup_faq/semantic/n=12",
+        "lookup_faq/keyword/n=100",
+        "save_lead_info/plain",
+        "save_lead_info/checkpoint",
+        "generate_summary/json/n=20",
+        "generate_summary/sqlite/n=20",
+        "generate_summary/sqlite+dedupe/n=20",
+    }
+    for stats in document["results"].values():
+        assert stats["ops"] == 5
+        assert 0 < stats["p50_us"] <= stats["p95_us"] <= stats["max_us"]
+    assert len(list(leads_dir.glob("lead_*.json"))) == 20
+
+
+def _results(**p50: float) -> dict:
+    return {"results": {name: {"p50_us": value} for name, value in p50.items()}}
+
+
+def test_compare_flags_slowdowns_beyond_threshold() -> None:
+    """Only benchmarks slower than the threshold allows are regressions."""
+    baseline = _results(fast=100.0, slow=100.0, steady=100.0)
+    current = _results(fast=50.0, slow=130.0, steady=115.0, new=10.0)
+
+    assert compare(baseline, current, threshold=0.2) == ["slow"]
+    assert compare(baseline, current, threshold=0.1) == ["slow", "steady"]
+
+
+def test_compare_command_fails_on_regression(tmp_path: Path) -> None:
+    """``compare`` exits non-zero when something regressed."""
+    baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline.write_text(json.dumps(_results(lookup=100.0)))
+    current.write_text(json.dumps(_results(lookup=150.0)))
+
+    main(["compare", str(baseline), str(baseline)])
+    with pytest.raises(SystemExit, match="lookup"):
+        main(["compare", str(baseline), str(current)])
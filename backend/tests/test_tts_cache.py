@@ -0,0 +1,102 @@
+import os
+from pathlib import Path
+
+from livekit.agents import tts
+
+from stub_plugins import StubTTS
+from tts_cache import (
+    CachedAudio,
+    CachedTTS,
+    TtsAudioCache,
+    prewarm_cache,
+    sentence_tokenizer,
+    split_sentences,
+)
+
+
+def _cached_tts(tmp_path: Path, max_bytes: int = 10**8) -> tuple[CachedTTS, StubTTS]:
+    stub = StubTTS(ttfb=0, seconds_per_char=0.01)
+    cache = TtsAudioCache(tmp_path / "tts", max_bytes=max_bytes)
+    return CachedTTS(stub, cache, voice="en-US-matthew", style="Conversation"), stub
+
+
+async def _synthesize(cached_tts: tts.TTS, text: str) -> bytes:
+    async with cached_tts.synthesize(text) as stream:
+        return b"".join([audio.frame.data.tobytes() async for audio in stream])
+
+
+def test_keys_depend_on_voice_style_and_text() -> None:
+    """Each part of the key gets its own entry; surrounding spaces don't."""
+    key = TtsAudioCache.key("en-US-matthew", "Conversation", 24000, "Hello.")
+    assert key == TtsAudioCache.key("en-US-matthew", "Conversation", 24000, " Hello. ")
+    assert key != TtsAudioCache.key("en-US-natalie", "Conversation", 24000, "Hello.")
+    assert key != TtsAudioCache.key("en-US-matthew", "Promo", 24000, "Hello.")
+    assert key != TtsAudioCache.key("en-US-matthew", "Conversation", 16000, "Hello.")
+    assert key != TtsAudioCache.key("en-US-matthew", "Conversation", 24000, "Hi.")
+
+
+async def test_repeated_sentence_is_served_from_disk(tmp_path: Path) -> None:
+    """The wrapped TTS is only asked for a sentence the first time."""
+    cached_tts, stub = _cached_tts(tmp_path)
+
+    first = await _synthesize(cached_tts, "Razorpay charges 2% per transaction.")
+    second = await _synthesize(cached_tts, "Razorpay charges 2% per transaction.")
+
+    assert first and first == second
+    assert stub.requests == ["Razorpay charges 2% per transaction."]
+    assert (cached_tts.cache.hits, cached_tts.cache.misses) == (1, 1)
+
+    # Another process (or a restart) reads the same files
+    other, other_stub = _cached_tts(tmp_path)
+    assert await _synthesize(other, "Razorpay charges 2% per transaction.") == first
+    assert other_stub.requests == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    """Writes past the size budget delete the entries played longest ago."""
+    audio = CachedAudio(bytes(24000), 24000, 1)
+    probe = TtsAudioCache(tmp_path / "probe")
+    probe.put("probe", audio)
+    entry_size = probe.size()
+
+    cache = TtsAudioCache(tmp_path / "tts", max_bytes=2 * entry_size)
+    cache.put("a", audio)
+    cache.put("b", audio)
+    os.utime(cache.directory / "a.wav", (1, 1))
+    os.utime(cache.directory / "b.wav", (2, 2))
+    assert cache.get("a") is not None  # now the most recently used
+
+    cache.put("c", audio)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
+    assert cache.size() <= cache.max_bytes
+
+
+async def test_prewarm_caches_each_sentence_once(tmp_path: Path) -> None:
+    """Prewarmed sentences are replayed when the adapter streams them later."""
+    cached_tts, stub = _cached_tts(tmp_path)
+    answers = [
+        "Yes! Razorpay offers a free plan. You only pay transaction fees.",
+        "Most businesses integrate in less than a day. You only pay transaction fees.",
+    ]
+
+    assert await prewarm_cache(cached_tts, answers) == (4, 0)
+    assert await prewarm_cache(cached_tts, answers) == (0, 4)
+    assert len(stub.requests) == 4
+
+    adapter = tts.StreamAdapter(tts=cached_tts, sentence_tokenizer=sentence_tokenizer())
+    stream = adapter.stream()
+    stream.push_text(answers[0] + " Anything else?")
+    stream.end_input()
+    async for _ in stream:
+        pass
+    await stream.aclose()
+
+    assert stub.requests[4:] == ["Anything else?"]
+    assert await split_sentences(answers[0]) == [
+        "Yes!",
+        "Razorpay offers a free plan.",
+        "You only pay transaction fees.",
+    ]
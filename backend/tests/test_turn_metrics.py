@@ -0,0 +1,77 @@
+import time
+
+from livekit.agents.metrics import EOUMetrics, LLMMetrics, TTSMetrics
+from prometheus_client import REGISTRY
+
+from agent import Assistant
+from turn_metrics import observe
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_pipeline_latencies_are_recorded_per_room() -> None:
+    room = "metrics-room"
+    observe(
+        EOUMetrics(
+            timestamp=time.time(),
+            end_of_utterance_delay=0.4,
+            transcription_delay=0.25,
+            on_user_turn_completed_delay=0.0,
+        ),
+        room=room,
+    )
+    llm_metrics = {
+        "label": "llm",
+        "request_id": "r",
+        "timestamp": time.time(),
+        "duration": 1.0,
+        "cancelled": False,
+        "completion_tokens": 1,
+        "prompt_tokens": 1,
+        "prompt_cached_tokens": 0,
+        "total_tokens": 2,
+        "tokens_per_second": 1.0,
+    }
+    observe(LLMMetrics(ttft=0.3, **llm_metrics), room=room)
+    observe(LLMMetrics(ttft=-1, **llm_metrics), room=room)  # cancelled, ignored
+    observe(
+        TTSMetrics(
+            label="tts",
+            request_id="r",
+            timestamp=time.time(),
+            ttfb=0.2,
+            duration=1.0,
+            audio_duration=2.0,
+            cancelled=False,
+            characters_count=10,
+            streamed=True,
+        ),
+        room=room,
+    )
+
+    assert _sample("sdr_agent_end_of_utterance_delay_seconds_sum", room=room) == 0.4
+    assert (
+        _sample("sdr_agent_stt_transcription_delay_seconds_bucket", room=room, le="0.3")
+        == 1
+    )
+    assert _sample("sdr_agent_llm_ttft_seconds_count", room=room) == 1
+    assert _sample("sdr_agent_tts_ttfb_seconds_sum", room=room) == 0.2
+
+
+async def test_tool_durations_are_recorded() -> None:
+    """Tools are timed even when called outside a job (empty room label)."""
+    before = _sample(
+        "sdr_agent_tool_duration_seconds_count", room="", tool="lookup_faq"
+    )
+    assistant = Assistant()
+    await assistant.lookup_faq(None, "pricing")
+    await assistant.save_lead_info(None, "name", "Priya")
+    assert (
+        _sample("sdr_agent_tool_duration_seconds_count", room="", tool="lookup_faq")
+        == before + 1
+    )
+    assert _sample(
+        "sdr_agent_tool_duration_seconds_count", room="", tool="save_lead_info"
+    )
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pytest
+from livekit.agents.metrics import LLMMetrics, STTMetrics, TTSMetrics
+from livekit.agents.metrics.base import Metadata
+
+from usage_ledger import (
+    COLUMNS,
+    UsageLedger,
+    aggregate,
+    ledger_files,
+    load_prices,
+    main,
+    report,
+)
+
+
+def _llm(prompt: int, cached: int, completion: int) -> LLMMetrics:
+    return LLMMetrics(
+        label="livekit.plugins.google.llm.LLM",
+        request_id="r",
+        timestamp=time.time(),
+        duration=1.0,
+        ttft=0.3,
+        cancelled=False,
+        completion_tokens=completion,
+        prompt_tokens=prompt,
+        prompt_cached_tokens=cached,
+        total_tokens=prompt + completion,
+        tokens_per_second=1.0,
+        metadata=Metadata(model_name="gemini-2.5-flash", model_provider="Google"),
+    )
+
+
+def _tts(characters: int, audio: float) -> TTSMetrics:
+    return TTSMetrics(
+        label="livekit.plugins.murf.tts.TTS",
+        request_id="r",
+        timestamp=time.time(),
+        ttfb=0.2,
+        duration=1.0,
+        audio_duration=audio,
+        cancelled=False,
+        characters_count=characters,
+        streamed=True,
+        metadata=Metadata(model_name="FALCON", model_provider="Murf"),
+    )
+
+
+def _stt(audio: float) -> STTMetrics:
+    return STTMetrics(
+        label="livekit.plugins.deepgram.stt.STT",
+        request_id="r",
+        timestamp=time.time(),
+        duration=0.0,
+        audio_duration=audio,
+        streamed=True,
+    )
+
+
+def test_usage_is_appended_in_batches(tmp_path: Path) -> None:
+    """Each flush writes one row per component and model used since the last."""
+    ledger = UsageLedger(tmp_path, room="room-a", tenant="acme")
+
+    async def call() -> None:
+        ledger.collect(_llm(1000, 200, 50))
+        ledger.collect(_llm(1500, 1000, 40))
+        ledger.collect(_tts(120, 7.5))
+        await ledger.flush()
+        await ledger.flush()  # nothing new, nothing written
+        ledger.collect(_stt(30.25))
+        await ledger.aclose()
+
+    asyncio.run(call())
+
+    [path] = ledger_files(tmp_path)
+    lines = path.read_text().splitlines()
+    assert lines[0] == ",".join(COLUMNS)
+    assert [line.split(",")[4:] for line in lines[1:]] == [
+        ["llm", "gemini-2.5-flash", "2500", "1200", "90", "0", "0"],
+        ["tts", "FALCON", "0", "0", "0", "120", "7.500"],
+        ["stt", "livekit.plugins.deepgram.stt.STT", "0", "0", "0", "0", "30.250"],
+    ]
+    assert ledger.rows_written == 3
+
+
+def test_report_sums_groups_and_prices_models(tmp_path: Path) -> None:
+    """Usage is summed per group and costed per model."""
+    for room in ("room-a", "room-b"):
+        ledger = UsageLedger(tmp_path, room=room)
+        ledger.collect(_llm(2_000_000, 1_000_000, 100_000))
+        ledger.collect(_tts(500, 120.0))
+        ledger.collect(_stt(60.0))
+        ledger._append(ledger.take_rows())
+    prices = {
+        "gemini-2.5-flash": {
+            "prompt_per_million": 0.3,
+            "cached_per_million": 0.03,
+            "completion_per_million": 2.5,
+        },
+        "FALCON": {"audio_per_minute": 0.01},
+    }
+
+    summaries, unpriced = report(aggregate(ledger_files(tmp_path), ["room"]), prices)
+
+    assert [s["key"] for s in summaries] == [["room-a"], ["room-b"]]
+    assert summaries[0]["prompt_tokens"] == 2_000_000
+    assert summaries[0]["audio_seconds"] == 180.0
+    assert summaries[0]["cost"] == pytest.approx(0.3 + 0.03 + 0.25 + 0.02)
+    assert unpriced == {"livekit.plugins.deepgram.stt.STT"}
+    prices_file = tmp_path / "prices.json"
+    prices_file.write_text(json.dumps(prices))
+    assert load_prices(prices_file) == prices
+    assert "gemini-2.5-flash" in load_prices(None)
+
+
+def test_days_are_summed_in_parallel_and_reported_by_date_and_model(
+    tmp_path: Path, capsys
+) -> None:
+    """Daily files are summed in parallel and reported by the requested columns."""
+    ledger = UsageLedger(tmp_path, room="room-a")
+    ledger.collect(_llm(100, 0, 10))
+    rows = ledger.take_rows(now=1_790_000_000.0)  # 2026-09-21
+    ledger._append(rows)
+    ledger.collect(_llm(100, 0, 5))
+    ledger._append(ledger.take_rows(now=1_790_086_400.0))  # the next day
+    files = ledger_files(tmp_path)
+    assert aggregate(files, ["model"], workers=2) == aggregate(files, ["model"], 1)
+
+    main(["report", "--dir", str(tmp_path), "--by", "date,model", "--json"])
+    output = json.loads(capsys.readouterr().out)
+    assert output["summaries"][0]["key"] == ["2026-09-21", "gemini-2.5-flash"]
+    assert output["summaries"][0]["completion_tokens"] == 10
+    assert len(output["summaries"]) == 2
+
+    with pytest.raises(SystemExit, match="No usage ledger files"):
+        main(["report", "--dir", str(tmp_path), "--since", "2026-09-23"])
+    with pytest.raises(SystemExit, match="Can't group by voice"):
+        main(["report", "--dir", str(tmp_path), "--by", "voice"])
@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from worker_load import AdmissionControl
+
+
+class _JobRequest:
+    def __init__(self, admission: AdmissionControl | None = None) -> None:
+        self.room = SimpleNamespace(name="call-1")
+        self.answer = None
+        self.admitting_during_accept = None
+        self._admission = admission
+
+    async def accept(self) -> None:
+        if self._admission is not None:
+            self.admitting_during_accept = self._admission._admitting
+        self.answer = "accepted"
+
+    async def reject(self) -> None:
+        self.answer = "rejected"
+
+
+def test_sessions_reach_the_threshold_at_the_cap() -> None:
+    """Sessions at the cap make the worker full; uncapped, only CPU counts."""
+    admission = AdmissionControl(max_sessions=4, threshold=0.8)
+    assert admission.update(2) == pytest.approx(0.4)
+    assert admission.admits()
+
+    assert admission.update(4) == pytest.approx(0.8)
+    assert not admission.admits()
+    assert set(admission.components()) == {"cpu", "sessions"}
+
+    uncapped = AdmissionControl()
+    assert uncapped.update(50) == 0.0
+    assert "sessions" not in uncapped.components()
+
+
+def test_worker_load_function_counts_active_jobs() -> None:
+    """load() takes the session count from the worker."""
+    admission = AdmissionControl(max_sessions=2, threshold=0.5)
+    worker = SimpleNamespace(active_jobs=[object()])
+    assert admission.load(worker) >= 0.25
+    assert admission.sessions == 1
+
+
+def test_full_worker_rejects_and_counts_jobs_being_admitted() -> None:
+    """Offers over the cap are rejected; accepted ones count until launched."""
+    admission = AdmissionControl(max_sessions=2)
+    admission.update(1)
+
+    request = _JobRequest(admission)
+    asyncio.run(admission.request(request))
+    assert request.answer == "accepted"
+    assert request.admitting_during_accept == 1
+    assert admission._admitting == 0
+
+    admission.update(2)
+    request = _JobRequest()
+    asyncio.run(admission.request(request))
+    assert request.answer == "rejected"
+    assert admission.rejected == 1
+
+
+async def test_back_to_back_offers_between_load_updates_respect_the_cap() -> None:
+    """Accepted jobs count against the cap before the next load update."""
+    admission = AdmissionControl(max_sessions=2)
+    admission.update(0)
+
+    requests = [_JobRequest() for _ in range(3)]
+    for request in requests:
+        await admission.request(request)
+    assert [r.answer for r in requests] == ["accepted", "accepted", "rejected"]
+    assert admission.sessions == 2
+
+    # The next update counts them from the worker's active jobs
+    assert admission.load(SimpleNamespace(active_jobs=[object()])) >= 0
+    assert admission.sessions == 1